@@ -0,0 +1,48 @@
+"""guest stats counters
+
+Revision ID: 7084190010b3
+Revises: 6492e7644857
+Create Date: 2026-10-17 04:25:25.486279
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7084190010b3'
+down_revision: Union[str, None] = '6492e7644857'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('guest_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('attending', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('not_attending', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('pending', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('plus_ones', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Seed the single counters row from the existing guest list.
+    op.execute(
+        """
+        INSERT INTO guest_stats (id, total, attending, not_attending, pending, plus_ones)
+        SELECT 1,
+               count(*),
+               count(*) FILTER (WHERE rsvp_status = 'ATTENDING'),
+               count(*) FILTER (WHERE rsvp_status = 'NOT_ATTENDING'),
+               count(*) FILTER (WHERE rsvp_status = 'PENDING'),
+               count(*) FILTER (WHERE rsvp_status = 'ATTENDING' AND plus_one_attending)
+        FROM guests
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('guest_stats')
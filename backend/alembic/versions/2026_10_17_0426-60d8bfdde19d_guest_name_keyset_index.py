@@ -0,0 +1,29 @@
+"""guest name keyset index
+
+Revision ID: 60d8bfdde19d
+Revises: 7084190010b3
+Create Date: 2026-10-17 04:26:11.137755
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '60d8bfdde19d'
+down_revision: Union[str, None] = '7084190010b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add id as the tie-breaker so keyset pagination on
+    # (last_name, first_name, id) is served entirely by the index.
+    op.drop_index('idx_guest_name', table_name='guests')
+    op.create_index('idx_guest_name', 'guests', ['last_name', 'first_name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_guest_name', table_name='guests')
+    op.create_index('idx_guest_name', 'guests', ['last_name', 'first_name'], unique=False)
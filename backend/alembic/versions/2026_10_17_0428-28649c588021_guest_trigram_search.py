@@ -0,0 +1,62 @@
+"""guest trigram search
+
+Revision ID: 28649c588021
+Revises: 60d8bfdde19d
+Create Date: 2026-10-17 04:28:19.595304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '28649c588021'
+down_revision: Union[str, None] = '60d8bfdde19d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NORMALIZE_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION wedding_search_normalize(text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS $$
+    SELECT lower(
+        translate(
+            regexp_replace(
+                public.unaccent('public.unaccent'::regdictionary, $1),
+                '[\u0640\u064B-\u065F\u0670]', '', 'g'
+            ),
+            'أإآٱىة',
+            'اااايه'
+        )
+    )
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() is only STABLE; the schema-qualified two-argument form is
+    # safe to wrap as IMMUTABLE, which generated columns and indexes require.
+    op.execute(NORMALIZE_FUNCTION)
+    op.add_column('guests', sa.Column(
+        'search_text',
+        sa.Text(),
+        sa.Computed(
+            "wedding_search_normalize(first_name || ' ' || last_name || ' ' || coalesce(email, ''))",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index(
+        'idx_guest_search_trgm', 'guests', ['search_text'], unique=False,
+        postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_guest_search_trgm', table_name='guests')
+    op.drop_column('guests', 'search_text')
+    op.execute("DROP FUNCTION IF EXISTS wedding_search_normalize(text)")
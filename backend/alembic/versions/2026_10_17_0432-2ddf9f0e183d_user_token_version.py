@@ -0,0 +1,26 @@
+"""user token version
+
+Revision ID: 2ddf9f0e183d
+Revises: 28649c588021
+Create Date: 2026-10-17 04:32:22.814799
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2ddf9f0e183d'
+down_revision: Union[str, None] = '28649c588021'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,34 @@
+"""idempotency keys
+
+Revision ID: 88804b03a710
+Revises: 2ddf9f0e183d
+Create Date: 2026-10-17 04:37:42.309381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '88804b03a710'
+down_revision: Union[str, None] = '2ddf9f0e183d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('idempotency_keys',
+    sa.Column('scope', sa.String(length=50), nullable=False),
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('request_hash', sa.String(length=64), nullable=False),
+    sa.Column('response', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('scope', 'key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('idempotency_keys')
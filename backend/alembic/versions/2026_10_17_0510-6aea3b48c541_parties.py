@@ -0,0 +1,43 @@
+"""parties
+
+Revision ID: 6aea3b48c541
+Revises: 88804b03a710
+Create Date: 2026-10-17 05:10:55.839854
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6aea3b48c541'
+down_revision: Union[str, None] = '88804b03a710'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('parties',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('rsvp_code', sa.String(length=8), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_parties_rsvp_code'), 'parties', ['rsvp_code'], unique=True)
+    op.add_column('guests', sa.Column('party_id', sa.UUID(), nullable=True))
+    op.create_index(op.f('ix_guests_party_id'), 'guests', ['party_id'], unique=False)
+    op.create_foreign_key('guests_party_id_fkey', 'guests', 'parties', ['party_id'], ['id'], ondelete='SET NULL')
+    # No backfill from group_name: a guest's code answers for their whole
+    # party, so households are only ever formed explicitly by admins.
+
+
+def downgrade() -> None:
+    op.drop_constraint('guests_party_id_fkey', 'guests', type_='foreignkey')
+    op.drop_index(op.f('ix_guests_party_id'), table_name='guests')
+    op.drop_column('guests', 'party_id')
+    op.drop_index(op.f('ix_parties_rsvp_code'), table_name='parties')
+    op.drop_table('parties')
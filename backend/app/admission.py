@@ -0,0 +1,183 @@
+"""Admission control for the public RSVP endpoints.
+
+``/api/rsvp/*`` is unauthenticated, so one scraper or a retry loop could
+otherwise take every database connection and starve the admin API. Each
+request has to pass, in order:
+
+1. a token bucket for the client IP,
+2. a token bucket for the RSVP code (from the path for lookups, from the JSON
+   body for submits),
+3. a slot among ``RSVP_MAX_IN_FLIGHT`` concurrently running public requests,
+   waited for at most ``RSVP_ADMISSION_TIMEOUT_SECONDS``.
+
+Failing 1 or 2 returns 429, failing 3 returns 503; both carry ``Retry-After``
+and are answered without touching the database. Submit bodies larger than
+``RSVP_MAX_BODY_BYTES`` get a 413 before the rest is read. Limits are per
+worker process. The client IP is the ASGI peer address, so behind a reverse
+proxy run uvicorn with ``--proxy-headers`` and ``FORWARDED_ALLOW_IPS`` set to
+the proxy's address only; trusting any peer would let clients pick their IP.
+"""
+import asyncio
+import json
+import math
+import time
+from typing import Optional
+
+from app.cache import TTLCache
+from app.config import settings
+
+PUBLIC_PREFIX = "/api/rsvp/"
+_LOOKUP_PREFIXES = (PUBLIC_PREFIX + "lookup/", PUBLIC_PREFIX + "party/")
+_SUBMIT_PATHS = (PUBLIC_PREFIX + "submit", PUBLIC_PREFIX + "party/submit")
+
+
+class TokenBucket:
+    """Token buckets keyed by client; idle buckets expire once they would be full again."""
+
+    def __init__(self, name: str, rate: float, burst: int, max_keys: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = TTLCache(name, maxsize=max_keys, ttl=burst / rate)
+
+    def take(self, key) -> float:
+        """Spend one token for ``key``; returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(self.burst), now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / self.rate
+        self._buckets.set(key, (tokens - 1, now))
+        return 0.0
+
+
+class RSVPAdmission:
+    def __init__(self):
+        self.enabled = settings.RSVP_ADMISSION_ENABLED
+        self.per_ip = TokenBucket(
+            "admission.rsvp_ip",
+            rate=settings.RSVP_IP_RATE_PER_SECOND,
+            burst=settings.RSVP_IP_BURST,
+            max_keys=settings.RSVP_RATE_LIMIT_MAX_KEYS,
+        )
+        self.per_code = TokenBucket(
+            "admission.rsvp_code",
+            rate=settings.RSVP_CODE_RATE_PER_SECOND,
+            burst=settings.RSVP_CODE_BURST,
+            max_keys=settings.RSVP_RATE_LIMIT_MAX_KEYS,
+        )
+        self.timeout = settings.RSVP_ADMISSION_TIMEOUT_SECONDS
+        self._slots = asyncio.Semaphore(settings.RSVP_MAX_IN_FLIGHT)
+        self.max_body = settings.RSVP_MAX_BODY_BYTES
+        self.rejected = {413: 0, 429: 0, 503: 0}
+
+    def limit(self, client_ip: Optional[str], rsvp_code: Optional[str]) -> float:
+        """Seconds the client has to wait, or 0 if both buckets had a token."""
+        wait = self.per_ip.take(client_ip)
+        if not wait and rsvp_code:
+            wait = self.per_code.take(rsvp_code.upper())
+        return wait
+
+    async def acquire(self) -> bool:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def release(self) -> None:
+        self._slots.release()
+
+
+rsvp_admission = RSVPAdmission()
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: Optional[float] = None) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("ascii")),
+    ]
+    if retry_after is not None:
+        headers.append((b"retry-after", str(max(1, math.ceil(retry_after))).encode("ascii")))
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _read_body(receive, limit: int) -> tuple[Optional[bytes], list]:
+    """The request body and the messages it came in; ``None`` once it exceeds ``limit`` bytes."""
+    messages, chunks, size = [], [], 0
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None, messages
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks), messages
+
+
+def _submitted_code(body: bytes) -> Optional[str]:
+    try:
+        code = json.loads(body).get("rsvp_code")
+    except (ValueError, AttributeError):
+        return None
+    return code if isinstance(code, str) else None
+
+
+class AdmissionMiddleware:
+    """Applies ``RSVPAdmission`` to requests under ``/api/rsvp/``."""
+
+    def __init__(self, app, admission: RSVPAdmission = rsvp_admission):
+        self.app = app
+        self.admission = admission
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not self.admission.enabled or not path.startswith(PUBLIC_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        code = None
+        if path in _SUBMIT_PATHS and scope["method"] == "POST":
+            body, messages = await _read_body(receive, self.admission.max_body)
+            if body is None:
+                self.admission.rejected[413] += 1
+                await _reject(send, 413, "Request body too large")
+                return
+            code = _submitted_code(body)
+            receive = _replay(messages, receive)
+        elif path.startswith(_LOOKUP_PREFIXES):
+            code = path.rsplit("/", 1)[1]
+
+        client_ip = scope["client"][0] if scope.get("client") else None
+        wait = self.admission.limit(client_ip, code)
+        if wait:
+            self.admission.rejected[429] += 1
+            await _reject(send, 429, "Too many requests", wait)
+            return
+
+        if not await self.admission.acquire():
+            self.admission.rejected[503] += 1
+            await _reject(send, 503, "Server busy, please retry", 1)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.admission.release()
+
+
+def _replay(messages: list, receive):
+    pending = list(messages)
+
+    async def replayed():
+        if pending:
+            return pending.pop(0)
+        return await receive()
+
+    return replayed
@@ -7,7 +7,10 @@ from typing import Optional
 
 from app.db.database import get_db
 from app.db.models import User, Language
-from app.auth import create_access_token, hash_password, verify_password, get_current_user
+from app.auth import (
+    create_access_token, hash_password_async, verify_password_async, needs_rehash,
+    get_current_user, revoke_user_tokens,
+)
 
 router = APIRouter()
 
@@ -45,14 +48,21 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == request.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(request.password, user.password_hash):
+    if not user or not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = create_access_token(data={"sub": str(user.id)})
+    if needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await hash_password_async(request.password)
+            await db.commit()
+        except HTTPException:
+            pass  # hashing pool saturated; upgrade on a later login
+
+    access_token = create_access_token(data={"sub": str(user.id), "tv": user.token_version})
 
     return LoginResponse(
         access_token=access_token,
@@ -86,7 +96,7 @@ async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db))
 
     new_user = User(
         email=request.email,
-        password_hash=hash_password(request.password),
+        password_hash=await hash_password_async(request.password),
         name=request.name,
         language=request.language,
     )
@@ -100,3 +110,13 @@ async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db))
         name=new_user.name,
         language=new_user.language,
     )
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Revoke every token issued to the current user, including this one."""
+    await revoke_user_tokens(db, current_user.id)
+    await db.commit()
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, update, delete, func
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Union
 from datetime import datetime
 from uuid import UUID
 
+from app.batch import MAX_BATCH_IDS, BatchResult, batch_result
+from app.cache import TTLCache
+from app.config import settings
 from app.db.database import get_db
-from app.db.models import Event
+from app.encoding import JSONRowsResponse, dumps
+from app.db.models import Event, Language
 from app.auth import get_current_user
 from app.db.models import User
 
@@ -63,6 +69,54 @@ class EventResponse(BaseModel):
         from_attributes = True
 
 
+class EventBatch(BaseModel):
+    ids: list[UUID]
+    # Either a partial update applied to all of them, or delete them.
+    update: Optional[EventUpdate] = None
+    delete: bool = False
+
+
+class EventReorder(BaseModel):
+    # Events in their new timeline order; each gets sort_order = its position (from 1).
+    ids: list[UUID]
+
+
+class LocalizedEventResponse(BaseModel):
+    id: str
+    title: str
+    description: Optional[str]
+    location: Optional[str]
+    icon: Optional[str]
+    start_time: str
+    end_time: Optional[str]
+    sort_order: int
+
+
+# Serialized public timeline per language (None = all languages), as
+# (json body, strong ETag). Cleared by every event write on this worker.
+_timeline_cache = TTLCache("events.timeline", maxsize=len(Language) + 1, ttl=settings.EVENTS_CACHE_TTL_SECONDS)
+
+# Reads select the response columns as Core rows and encode them with orjson
+# (same JSON as the response models, without ORM hydration or a Pydantic pass).
+EVENT_RESPONSE_COLUMNS = tuple(Event.__table__.c[field] for field in EventResponse.model_fields)
+TIMELINE_ORDER = (Event.sort_order, Event.start_time)
+
+
+def _localized_columns(lang: Language):
+    """``LocalizedEventResponse`` columns; empty translations fall back to French, then English."""
+    def pick(field: str):
+        return func.coalesce(
+            func.nullif(Event.__table__.c[f"{field}_{lang.value}"], ""),
+            func.nullif(Event.__table__.c[f"{field}_fr"], ""),
+            Event.__table__.c[f"{field}_en"],
+        ).label(field)
+
+    return (
+        Event.id, pick("title"), pick("description"), Event.location, Event.icon,
+        Event.start_time, Event.end_time, Event.sort_order,
+    )
+
+
 def _event_to_response(event: Event) -> EventResponse:
     return EventResponse(
         id=str(event.id),
@@ -81,13 +135,47 @@ def _event_to_response(event: Event) -> EventResponse:
     )
 
 
-@router.get("", response_model=list[EventResponse])
-async def list_events(db: AsyncSession = Depends(get_db)):
-    """Public endpoint: list visible events ordered by sort_order."""
-    result = await db.execute(
-        select(Event).where(Event.is_visible == True).order_by(Event.sort_order, Event.start_time)
-    )
-    return [_event_to_response(e) for e in result.scalars().all()]
+async def _timeline(db: AsyncSession, lang: Optional[Language]) -> tuple[bytes, str]:
+    cached = _timeline_cache.get(lang)
+    if cached is not None:
+        return cached
+
+    columns = _localized_columns(lang) if lang else EVENT_RESPONSE_COLUMNS
+    result = await db.execute(select(*columns).where(Event.is_visible == True).order_by(*TIMELINE_ORDER))
+    body = dumps([row._asdict() for row in result])
+    entry = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+    _timeline_cache.set(lang, entry)
+    return entry
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+@router.get("", response_model=Union[list[EventResponse], list[LocalizedEventResponse]])
+async def list_events(
+    lang: Optional[Language] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Public endpoint: list visible events ordered by sort_order.
+
+    With ``lang`` each event carries only that language's ``title`` and
+    ``description``. The serialized payload is cached in-process and served
+    with a strong ETag, so a matching ``If-None-Match`` gets a 304 without a
+    database round trip.
+    """
+    body, etag = await _timeline(db, lang)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.EVENTS_CACHE_MAX_AGE_SECONDS}",
+    }
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/all", response_model=list[EventResponse])
@@ -96,8 +184,8 @@ async def list_all_events(
     db: AsyncSession = Depends(get_db),
 ):
     """Admin endpoint: list all events including hidden."""
-    result = await db.execute(select(Event).order_by(Event.sort_order, Event.start_time))
-    return [_event_to_response(e) for e in result.scalars().all()]
+    result = await db.execute(select(*EVENT_RESPONSE_COLUMNS).order_by(*TIMELINE_ORDER))
+    return JSONRowsResponse([row._asdict() for row in result])
 
 
 @router.post("", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
@@ -109,10 +197,67 @@ async def create_event(
     event = Event(**data.model_dump())
     db.add(event)
     await db.commit()
+    _timeline_cache.clear()
     await db.refresh(event)
     return _event_to_response(event)
 
 
+def _check_batch_ids(ids: list[UUID]) -> None:
+    if not 0 < len(ids) <= MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"Give 1 to {MAX_BATCH_IDS} ids")
+
+
+@router.post("/batch", response_model=BatchResult)
+async def batch_events(
+    data: EventBatch,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Update or delete many events with one statement."""
+    _check_batch_ids(data.ids)
+    if data.delete == (data.update is not None):
+        raise HTTPException(status_code=400, detail="Give either update or delete")
+    if data.delete:
+        query, outcome = delete(Event).where(Event.id.in_(data.ids)), "deleted"
+    else:
+        changes = data.update.model_dump(exclude_unset=True)
+        if not changes:
+            raise HTTPException(status_code=400, detail="Nothing to update")
+        query, outcome = update(Event).where(Event.id.in_(data.ids)).values(changes), "updated"
+    affected = (await db.execute(query.returning(Event.id))).scalars().all()
+    await db.commit()
+    _timeline_cache.clear()
+    return batch_result(data.ids, affected, outcome)
+
+
+@router.post("/reorder", response_model=BatchResult)
+async def reorder_events(
+    data: EventReorder,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Set the timeline order in one UPDATE; events not listed keep their sort_order."""
+    _check_batch_ids(data.ids)
+    if len(set(data.ids)) != len(data.ids):
+        raise HTTPException(status_code=400, detail="Each event may appear only once")
+    positions = (
+        func.unnest(bindparam("event_ids", data.ids, type_=ARRAY(PG_UUID(as_uuid=True))))
+        .table_valued("id", with_ordinality="position")
+        .render_derived(name="new_order")
+    )
+    reordered = await db.execute(
+        update(Event)
+        .where(Event.id == positions.c.id)
+        .values(sort_order=positions.c.position)
+        .returning(Event.id)
+        .execution_options(synchronize_session=False)
+    )
+    affected = reordered.scalars().all()
+    await db.commit()
+    _timeline_cache.clear()
+    return batch_result(data.ids, affected, "updated")
+
+
 @router.patch("/{event_id}", response_model=EventResponse)
 async def update_event(
     event_id: UUID,
@@ -120,16 +265,17 @@ async def update_event(
     _current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Event).where(Event.id == event_id))
-    event = result.scalar_one_or_none()
+    changes = data.model_dump(exclude_unset=True)
+    if changes:
+        query = update(Event).where(Event.id == event_id).values(changes).returning(*Event.__table__.columns)
+    else:
+        query = select(*Event.__table__.columns).where(Event.id == event_id)
+    event = (await db.execute(query)).one_or_none()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    for field, value in data.model_dump(exclude_unset=True).items():
-        setattr(event, field, value)
-
     await db.commit()
-    await db.refresh(event)
+    _timeline_cache.clear()
     return _event_to_response(event)
 
 
@@ -139,9 +285,8 @@ async def delete_event(
     _current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Event).where(Event.id == event_id))
-    event = result.scalar_one_or_none()
-    if not event:
+    deleted = await db.execute(delete(Event).where(Event.id == event_id).returning(Event.id))
+    if deleted.first() is None:
         raise HTTPException(status_code=404, detail="Event not found")
-    await db.delete(event)
     await db.commit()
+    _timeline_cache.clear()
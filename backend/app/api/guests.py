@@ -1,18 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import asyncio
+import base64
+import csv
+import enum
+import json
+import zipfile
+
+from asyncpg.exceptions import UniqueViolationError
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func as sqlfunc
-from pydantic import BaseModel
-from typing import Optional
+from sqlalchemy import (
+    Integer, and_, bindparam, case, literal_column, or_, select, true, tuple_, update, func as sqlfunc,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from openpyxl.utils.exceptions import InvalidFileException
+from pydantic import BaseModel, ValidationError
+from typing import Optional, Union
+from collections import defaultdict
 from datetime import datetime
-from uuid import UUID
+from uuid import UUID, uuid4
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from app.db.database import get_db
-from app.db.models import Guest, RSVPStatus, Language
-from app.auth import get_current_user
+from app.config import settings
+from app.db.database import async_session_maker, get_db, get_read_db, stream_rows
+from app.db.models import (
+    Guest, InvitationCard, RSVPResponseLog, RSVPStatus, Language, SEARCH_NORMALIZE_FUNCTION, generate_rsvp_code,
+)
+from app.db.responses import response_counts
+from app.db.notify import notify_guest_change, notify_guests_imported, notify_guests_seated
+from app.db.stats import (
+    GuestTally, apply_stats_delta, guest_delete_statement, guest_update_statement,
+    read_guest_stats, record_guest_change,
+)
+from app.encoding import JSONRowsResponse, dumps
+from app.tabular import (
+    CSV_MEDIA_TYPE, XLSX_MEDIA_TYPE, UnsupportedFormat, iter_table_rows, stream_csv, stream_xlsx,
+)
+from app.auth import get_current_user, get_current_user_for_stream
+from app.batch import MAX_BATCH_IDS, BatchResult, batch_result
+from app.cards import ZIP_MEDIA_TYPE, CardFields, fingerprint as card_fingerprint, stream_card_archive
+from app.live import RESYNC, guest_hub
+from app.messages import rsvp_link
+from app.rsvp_index import rsvp_index
+from app.seating import SeatingGuest, solve_seating
 from app.db.models import User
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 500
+MAX_SEATING_TABLES = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
 
 class GuestCreate(BaseModel):
     first_name: str
@@ -48,6 +89,7 @@ class GuestResponse(BaseModel):
     email: Optional[str]
     phone: Optional[str]
     group_name: Optional[str]
+    party_id: Optional[str]
     rsvp_code: str
     rsvp_status: RSVPStatus
     plus_one_allowed: bool
@@ -74,6 +116,132 @@ class GuestStats(BaseModel):
     total_attending: int
 
 
+class FacetCount(BaseModel):
+    value: Union[str, int, None]
+    count: int
+
+
+class GuestFacets(BaseModel):
+    # Guests matching every filter.
+    total: int
+    rsvp_status: list[FacetCount]
+    group_name: list[FacetCount]
+    language: list[FacetCount]
+    table_number: list[FacetCount]
+    # "not_allowed", "allowed" (not coming) or "attending".
+    plus_one: list[FacetCount]
+
+
+class ResponseInterval(str, enum.Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+
+class ResponseTransition(BaseModel):
+    old_status: RSVPStatus
+    new_status: RSVPStatus
+    responses: int
+
+
+class ResponseBucket(BaseModel):
+    bucket: datetime
+    responses: int
+    # Answers from guests who had not answered before; the rest are changes.
+    first_responses: int
+    attending: int
+    not_attending: int
+    pending: int
+    transitions: list[ResponseTransition]
+
+
+class ResponseTimeline(BaseModel):
+    interval: ResponseInterval
+    tz: str
+    responses: int
+    buckets: list[ResponseBucket]
+    transitions: list[ResponseTransition]
+
+
+class GuestResponseEntry(BaseModel):
+    source: str
+    old_status: RSVPStatus
+    new_status: RSVPStatus
+    plus_one_attending: bool
+    dietary_restrictions: Optional[str]
+    message: Optional[str]
+    responded_at: datetime
+
+
+class GuestImportRowError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class GuestImportResult(BaseModel):
+    imported: int
+    errors: list[GuestImportRowError]
+
+
+class SeatingTable(BaseModel):
+    table_number: int
+    capacity: int
+
+
+class SeatingPin(BaseModel):
+    guest_id: UUID
+    table_number: int
+
+
+class SeatingRequest(BaseModel):
+    # Either explicit tables, or table_count tables numbered from 1 with table_capacity seats each.
+    tables: list[SeatingTable] = []
+    table_count: Optional[int] = None
+    table_capacity: Optional[int] = None
+    pins: list[SeatingPin] = []
+    keep_apart: list[tuple[UUID, UUID]] = []
+    dry_run: bool = False
+
+
+class SeatingTableResult(BaseModel):
+    table_number: int
+    capacity: int
+    seats_used: int
+    guest_ids: list[str]
+
+
+class SeatingPlanResult(BaseModel):
+    tables: list[SeatingTableResult]
+    seated: int
+    unseated_guest_ids: list[str]
+    warnings: list[str]
+    updated: int
+    dry_run: bool
+
+
+class SearchMode(str, enum.Enum):
+    CONTAINS = "contains"
+    FUZZY = "fuzzy"
+
+
+class GuestFilter(BaseModel):
+    search: Optional[str] = None
+    search_mode: SearchMode = SearchMode.CONTAINS
+    rsvp_status: Optional[RSVPStatus] = None
+    group_name: Optional[str] = None
+
+    def criteria(self) -> list:
+        return _guest_filters(**self.model_dump())
+
+
+class GuestBatch(BaseModel):
+    # Select guests by ids or by the guest list filters (an empty filter is every guest).
+    ids: Optional[list[UUID]] = None
+    filter: Optional[GuestFilter] = None
+    # Either a partial update applied to all of them, or delete them.
+    update: Optional[GuestUpdate] = None
+    delete: bool = False
+
+
 def _guest_to_response(guest: Guest) -> GuestResponse:
     return GuestResponse(
         id=str(guest.id),
@@ -82,6 +250,7 @@ def _guest_to_response(guest: Guest) -> GuestResponse:
         email=guest.email,
         phone=guest.phone,
         group_name=guest.group_name,
+        party_id=str(guest.party_id) if guest.party_id else None,
         rsvp_code=guest.rsvp_code,
         rsvp_status=guest.rsvp_status,
         plus_one_allowed=guest.plus_one_allowed,
@@ -97,50 +266,441 @@ def _guest_to_response(guest: Guest) -> GuestResponse:
     )
 
 
+# Read endpoints select exactly the response columns as Core rows and encode
+# them with orjson, skipping ORM hydration and FastAPI's response_model pass.
+# Column order follows GuestResponse, so the JSON is identical.
+GUEST_RESPONSE_COLUMNS = tuple(Guest.__table__.c[field] for field in GuestResponse.model_fields)
+
+
+def _encode_cursor(last_name: str, first_name: str, guest_id) -> str:
+    raw = json.dumps([last_name, first_name, str(guest_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_name, first_name, guest_id = json.loads(base64.urlsafe_b64decode(padded))
+        return last_name, first_name, UUID(guest_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+NAME_ORDER = (Guest.last_name, Guest.first_name, Guest.id)
+
+
+def _normalized(term: str):
+    return getattr(sqlfunc, SEARCH_NORMALIZE_FUNCTION)(term)
+
+
+def _search_rank(search: str):
+    return sqlfunc.word_similarity(_normalized(search), Guest.search_text)
+
+
+def _guest_filters(
+    search: Optional[str] = None,
+    rsvp_status: Optional[RSVPStatus] = None,
+    group_name: Optional[str] = None,
+    search_mode: SearchMode = SearchMode.CONTAINS,
+) -> list:
+    """WHERE clauses shared by every endpoint that takes the guest list filters.
+
+    Both search modes match against ``guests.search_text`` and are served by
+    its trigram GIN index: ``contains`` is an accent/case-insensitive
+    substring match, ``fuzzy`` a word-similarity match that tolerates typos.
+    """
+    clauses = []
+    if search:
+        if search_mode == SearchMode.FUZZY:
+            clauses.append(_normalized(search).op("<%")(Guest.search_text))
+        else:
+            clauses.append(Guest.search_text.like(sqlfunc.concat("%", _normalized(search), "%")))
+    if rsvp_status:
+        clauses.append(Guest.rsvp_status == rsvp_status)
+    if group_name:
+        clauses.append(Guest.group_name == group_name)
+    return clauses
+
+
+def build_guest_query(
+    search: Optional[str] = None,
+    rsvp_status: Optional[RSVPStatus] = None,
+    group_name: Optional[str] = None,
+    search_mode: SearchMode = SearchMode.CONTAINS,
+):
+    """Filtered guest select: name order, or best match first for fuzzy search."""
+    query = select(*GUEST_RESPONSE_COLUMNS).where(*_guest_filters(search, rsvp_status, group_name, search_mode))
+    if search and search_mode == SearchMode.FUZZY:
+        return query.order_by(_search_rank(search).desc(), *NAME_ORDER)
+    return query.order_by(*NAME_ORDER)
+
+
+def _ndjson_lines(rows) -> bytes:
+    return b"".join(dumps(row._asdict()) + b"\n" for row in rows)
+
+
 @router.get("", response_model=list[GuestResponse])
 async def list_guests(
     search: Optional[str] = None,
     rsvp_status: Optional[RSVPStatus] = None,
     group_name: Optional[str] = None,
+    search_mode: SearchMode = SearchMode.CONTAINS,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    accept: Optional[str] = Header(None),
     _current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    query = select(Guest).order_by(Guest.last_name, Guest.first_name)
+    """List guests in (last_name, first_name, id) order.
 
-    if search:
-        pattern = f"%{search}%"
-        query = query.where(
-            (Guest.first_name.ilike(pattern))
-            | (Guest.last_name.ilike(pattern))
-            | (Guest.email.ilike(pattern))
-        )
-    if rsvp_status:
-        query = query.where(Guest.rsvp_status == rsvp_status)
-    if group_name:
-        query = query.where(Guest.group_name == group_name)
+    ``search_mode=fuzzy`` instead ranks matches by similarity to ``search``
+    (typo-tolerant, best first); such results are not cursor-paginated. With
+    ``limit`` the list is paginated by keyset on ``idx_guest_name``: the
+    ``X-Next-Cursor`` response header carries an opaque cursor to pass back as
+    ``after``, and is absent on the last page. With
+    ``Accept: application/x-ndjson`` rows are streamed one JSON object per line
+    from a server-side cursor.
+    """
+    ranked = bool(search) and search_mode == SearchMode.FUZZY
+    query = build_guest_query(search, rsvp_status, group_name, search_mode)
+    if after:
+        if ranked:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not available for fuzzy search")
+        query = query.where(tuple_(*NAME_ORDER) > tuple_(*_decode_cursor(after)))
+
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        if limit:
+            query = query.limit(limit)
 
-    result = await db.execute(query)
-    return [_guest_to_response(g) for g in result.scalars().all()]
+        async def body():
+            async for rows in stream_rows(query):
+                yield _ndjson_lines(rows)
+
+        return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
+
+    if limit:
+        query = query.limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    headers = {}
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        if not ranked:
+            last = rows[-1]
+            headers[NEXT_CURSOR_HEADER] = _encode_cursor(last.last_name, last.first_name, last.id)
+    return JSONRowsResponse([row._asdict() for row in rows], headers=headers)
 
 
 @router.get("/stats", response_model=GuestStats)
 async def get_stats(
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    stats = await read_guest_stats(db)
+    return GuestStats(
+        **stats,
+        total_attending=stats["attending"] + stats["plus_ones"],
+    )
+
+
+_FACET_COLUMNS = {
+    "rsvp_status": Guest.rsvp_status,
+    "group_name": Guest.group_name,
+    "language": Guest.language,
+    "table_number": Guest.table_number,
+    # Literal columns, not bind parameters, so the GROUP BY expression
+    # matches the selected one.
+    "plus_one": case(
+        (~Guest.plus_one_allowed, literal_column("'not_allowed'")),
+        (Guest.plus_one_attending, literal_column("'attending'")),
+        else_=literal_column("'allowed'"),
+    ),
+}
+# GROUPING() of all facet columns is a bitmask with a bit set for every
+# column a row is not grouped by; a facet's row has only its own bit clear.
+_ALL_GROUPED_OUT = (1 << len(_FACET_COLUMNS)) - 1
+_FACET_BY_GROUPING = {
+    _ALL_GROUPED_OUT ^ (1 << (len(_FACET_COLUMNS) - 1 - position)): name
+    for position, name in enumerate(_FACET_COLUMNS)
+}
+
+
+def _facet_query(
+    search: Optional[str],
+    search_mode: SearchMode,
+    rsvp_status: Optional[RSVPStatus],
+    group_name: Optional[str],
+):
+    status_match = Guest.rsvp_status == rsvp_status if rsvp_status else true()
+    group_match = Guest.group_name == group_name if group_name else true()
+    columns = list(_FACET_COLUMNS.values())
+    query = (
+        select(
+            *(column.label(name) for name, column in _FACET_COLUMNS.items()),
+            sqlfunc.grouping(*columns).label("grouping"),
+            sqlfunc.count().filter(group_match).label("any_status"),
+            sqlfunc.count().filter(status_match).label("any_group"),
+            sqlfunc.count().filter(and_(status_match, group_match)).label("matching"),
+        )
+        .where(*_guest_filters(search, search_mode=search_mode))
+        .group_by(sqlfunc.grouping_sets(*(tuple_(column) for column in columns), tuple_()))
+    )
+    if rsvp_status and group_name:
+        # A guest matching neither filter counts nowhere; the OR is a
+        # BitmapOr over idx_guest_rsvp_status and the group_name index.
+        query = query.where(or_(status_match, group_match))
+    return query
+
+
+def _facet_counts(rows) -> dict:
+    facets = {"total": 0, **{name: [] for name in _FACET_COLUMNS}}
+    for row in rows:
+        facet = _FACET_BY_GROUPING.get(row.grouping)
+        if facet is None:
+            facets["total"] = row.matching
+            continue
+        count = {"rsvp_status": row.any_status, "group_name": row.any_group}.get(facet, row.matching)
+        if count:
+            facets[facet].append({"value": getattr(row, facet), "count": count})
+    for name in _FACET_COLUMNS:
+        facets[name].sort(key=lambda facet: (facet["value"] is None, facet["value"]))
+    return facets
+
+
+def _response_timeline(rows, interval: ResponseInterval, zone: ZoneInfo) -> ResponseTimeline:
+    buckets: dict[datetime, dict] = {}
+    totals: dict[tuple, int] = defaultdict(int)
+    for row in rows:
+        bucket = buckets.get(row.bucket)
+        if bucket is None:
+            bucket = buckets[row.bucket] = {
+                "bucket": row.bucket.astimezone(zone),
+                "responses": 0,
+                "first_responses": 0,
+                **{status.value: 0 for status in RSVPStatus},
+                "transitions": [],
+            }
+        bucket["responses"] += row.responses
+        bucket[row.new_status.value] += row.responses
+        if row.old_status == RSVPStatus.PENDING:
+            bucket["first_responses"] += row.responses
+        bucket["transitions"].append(
+            ResponseTransition(old_status=row.old_status, new_status=row.new_status, responses=row.responses)
+        )
+        totals[row.old_status, row.new_status] += row.responses
+    return ResponseTimeline(
+        interval=interval,
+        tz=zone.key,
+        responses=sum(totals.values()),
+        buckets=[ResponseBucket(**bucket) for bucket in buckets.values()],
+        transitions=[
+            ResponseTransition(old_status=old, new_status=new, responses=count)
+            for (old, new), count in sorted(totals.items())
+        ],
+    )
+
+
+@router.get("/facets", response_model=GuestFacets)
+async def get_guest_facets(
+    search: Optional[str] = None,
+    rsvp_status: Optional[RSVPStatus] = None,
+    group_name: Optional[str] = None,
+    search_mode: SearchMode = SearchMode.CONTAINS,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Guest counts per status, group, language, table and plus-one state, in one query.
+
+    Takes the guest list filters. The search applies to every facet; the
+    status and group filters apply to every facet but their own, so the
+    status counts still show what picking another status would give.
+    Values with no guests are left out.
+    """
+    rows = (await db.execute(_facet_query(search, search_mode, rsvp_status, group_name))).all()
+    return JSONRowsResponse(_facet_counts(rows))
+
+
+@router.get("/stats/responses", response_model=ResponseTimeline)
+async def get_response_timeline(
+    interval: ResponseInterval = ResponseInterval.DAY,
+    tz: str = Query("UTC", max_length=64),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
     _current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Guest))
-    guests = result.scalars().all()
+    """RSVP responses per hour or day (in ``tz``) with their status transitions.
 
-    attending = [g for g in guests if g.rsvp_status == RSVPStatus.ATTENDING]
-    plus_ones = sum(1 for g in attending if g.plus_one_attending)
+    Served from the hourly rollups of the response log, so the cost does not
+    grow with the length of the history (see ``app.db.responses``).
+    """
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown time zone: {tz}")
+    rows = await response_counts(db, interval.value, zone.key, since, until)
+    await db.commit()
+    return _response_timeline(rows, interval, zone)
 
-    return GuestStats(
-        total=len(guests),
-        attending=len(attending),
-        not_attending=sum(1 for g in guests if g.rsvp_status == RSVPStatus.NOT_ATTENDING),
-        pending=sum(1 for g in guests if g.rsvp_status == RSVPStatus.PENDING),
-        plus_ones=plus_ones,
-        total_attending=len(attending) + plus_ones,
+
+def _sse(event: str, data) -> bytes:
+    return b"event: " + event.encode("ascii") + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+def _stats_event(stats: dict[str, int]) -> bytes:
+    return _sse("stats", {**stats, "total_attending": stats["attending"] + stats["plus_ones"]})
+
+
+async def _current_stats(changes: asyncio.Queue) -> dict[str, int]:
+    """Stats to apply the changes that arrive on ``changes`` from now on.
+
+    The hub's stats already include every change it has queued, so those are
+    dropped. Without hub stats (it is not listening yet) the counters are
+    read from the database, which counts the changes queued meanwhile, so
+    they are dropped too; the hub sends a ``resync`` once it listens again.
+    """
+    if guest_hub.stats is not None:
+        stats = dict(guest_hub.stats)
+    else:
+        async with async_session_maker() as session:
+            stats = await read_guest_stats(session)
+    while not changes.empty():
+        changes.get_nowait()
+    return stats
+
+
+@router.get("/live")
+async def live_updates(_current_user: User = Depends(get_current_user_for_stream)):
+    """Server-Sent Events stream of guest changes for admin dashboards.
+
+    Sends ``stats`` (a ``GuestStats`` object) on connect and after every
+    change, ``guest`` (``{"op", "id", "delta"}``, or ``{"op": "import" |
+    "seating", "count"}`` for bulk writes) for each change, and ``resync``
+    when changes may have been missed. Changes come from the worker's shared
+    LISTEN connection; no query runs and nothing is sent while nothing
+    changes. EventSource clients pass the token as ``?access_token=``.
+    """
+    heartbeat = settings.LIVE_HEARTBEAT_SECONDS or None
+
+    async def events():
+        with guest_hub.subscribe() as changes:
+            stats = await _current_stats(changes)
+            yield _stats_event(stats)
+            while True:
+                try:
+                    change = await asyncio.wait_for(changes.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if change is RESYNC:
+                    stats = await _current_stats(changes)
+                    yield _sse("resync", {}) + _stats_event(stats)
+                    continue
+                for field, value in change["delta"].items():
+                    stats[field] += value
+                guest = {k: change[k] for k in ("op", "id", "count", "delta") if k in change}
+                yield _sse("guest", guest) + _stats_event(stats)
+
+    return StreamingResponse(
+        events(),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    XLSX = "xlsx"
+
+
+EXPORT_COLUMNS = tuple(GuestResponse.model_fields)
+_EXPORT_MEDIA_TYPES = {ExportFormat.CSV: CSV_MEDIA_TYPE, ExportFormat.XLSX: XLSX_MEDIA_TYPE}
+
+
+@router.get("/export")
+async def export_guests(
+    file_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    columns: Optional[list[str]] = Query(None, description=f"Any of: {', '.join(EXPORT_COLUMNS)}"),
+    search: Optional[str] = None,
+    rsvp_status: Optional[RSVPStatus] = None,
+    group_name: Optional[str] = None,
+    search_mode: SearchMode = SearchMode.CONTAINS,
+    _current_user: User = Depends(get_current_user),
+):
+    """Download the (filtered) guest list as CSV or XLSX.
+
+    Takes the same filters as ``GET /api/guests``. Only the requested columns
+    are selected, and rows are streamed from a server-side cursor straight
+    into the file encoder.
+    """
+    columns = columns or list(EXPORT_COLUMNS)
+    unknown = [c for c in columns if c not in EXPORT_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown export columns: {', '.join(unknown)}")
+
+    query = build_guest_query(search, rsvp_status, group_name, search_mode).with_only_columns(
+        *(Guest.__table__.c[c] for c in columns)
+    )
+    encode = stream_xlsx if file_format == ExportFormat.XLSX else stream_csv
+    filename = f"guests-{datetime.utcnow():%Y%m%d}.{file_format.value}"
+    return StreamingResponse(
+        encode(columns, stream_rows(query)),
+        media_type=_EXPORT_MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+class CardRequest(BaseModel):
+    # Guests by id, or by the guest list filters; neither means every guest.
+    ids: Optional[list[UUID]] = None
+    filter: Optional[GuestFilter] = None
+
+
+@router.post("/cards")
+async def print_cards(
+    data: CardRequest,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Download printable invitation cards (one SVG per guest) as a ZIP.
+
+    Cards are rendered in a process pool and streamed into the archive as
+    they are produced, in guest list order by file name. A guest whose
+    printed fields have not changed since their last card gets the stored
+    one; ``X-Cards-Rendered`` says how many had to be drawn.
+    """
+    if data.ids is not None and data.filter is not None:
+        raise HTTPException(status_code=400, detail="Give either ids or filter")
+    if data.ids is not None:
+        criteria = [Guest.id.in_(data.ids)]
+    else:
+        criteria = data.filter.criteria() if data.filter else []
+    rows = (await db.execute(
+        select(
+            Guest.id, Guest.first_name, Guest.last_name, Guest.plus_one_allowed, Guest.plus_one_name,
+            Guest.language, Guest.rsvp_code, InvitationCard.fingerprint,
+        )
+        .outerjoin(InvitationCard, InvitationCard.guest_id == Guest.id)
+        .where(*criteria)
+        .order_by(Guest.last_name, Guest.first_name, Guest.id)
+    )).all()
+    cards = [
+        CardFields(
+            str(row.id), row.first_name, row.last_name, row.plus_one_allowed, row.plus_one_name,
+            row.language, row.rsvp_code, rsvp_link(row.rsvp_code),
+        )
+        for row in rows
+    ]
+    stored = {str(row.id): row.fingerprint for row in rows if row.fingerprint}
+    rendered = sum(1 for card in cards if stored.get(card.guest_id) != card_fingerprint(card))
+    filename = f"invitations-{datetime.utcnow():%Y%m%d}.zip"
+    return StreamingResponse(
+        stream_card_archive(cards, stored),
+        media_type=ZIP_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Cards-Rendered": str(rendered),
+            "X-Cards-Total": str(len(cards)),
+        },
     )
 
 
@@ -152,22 +712,285 @@ async def create_guest(
 ):
     guest = Guest(**data.model_dump())
     db.add(guest)
+    await db.flush()
+    await record_guest_change(db, None, GuestTally.of(guest))
+    await notify_guest_change(db, "create", guest.id, guest.rsvp_code, None, GuestTally.of(guest))
     await db.commit()
     await db.refresh(guest)
+    rsvp_index.put(guest)
     return _guest_to_response(guest)
 
 
+IMPORT_BATCH_SIZE = 1000
+IMPORT_COPY_ATTEMPTS = 3
+_IMPORT_COLUMNS = (
+    "id", "first_name", "last_name", "email", "phone", "group_name", "plus_one_allowed",
+    "dietary_restrictions", "language", "table_number", "notes",
+    "rsvp_code", "rsvp_status", "plus_one_attending",
+)
+
+
+async def _allocate_rsvp_codes(db: AsyncSession, count: int) -> list[str]:
+    """``count`` fresh RSVP codes, unique among themselves and in the guests table."""
+    codes: set[str] = set()
+    while len(codes) < count:
+        candidates = set()
+        while len(candidates) < count - len(codes):
+            code = generate_rsvp_code()
+            if code not in codes:
+                candidates.add(code)
+        taken = await db.execute(select(Guest.rsvp_code).where(Guest.rsvp_code.in_(candidates)))
+        codes |= candidates - set(taken.scalars())
+    return list(codes)
+
+
+async def _copy_guests(db: AsyncSession, guests: list[GuestCreate]) -> None:
+    """COPY a batch of validated guests into the current transaction.
+
+    Each attempt runs in a savepoint; if a concurrent insert grabbed one of
+    the pre-allocated codes in the meantime, the batch is retried with new ones.
+    """
+    conn = await db.connection()
+    driver = (await conn.get_raw_connection()).driver_connection
+    for attempt in range(IMPORT_COPY_ATTEMPTS):
+        codes = await _allocate_rsvp_codes(db, len(guests))
+        records = [
+            (
+                uuid4(), g.first_name, g.last_name, g.email, g.phone, g.group_name, g.plus_one_allowed,
+                g.dietary_restrictions, g.language.name, g.table_number, g.notes,
+                code, RSVPStatus.PENDING.name, False,
+            )
+            for g, code in zip(guests, codes)
+        ]
+        try:
+            async with db.begin_nested():
+                await driver.copy_records_to_table(Guest.__tablename__, records=records, columns=_IMPORT_COLUMNS)
+            return
+        except UniqueViolationError:
+            if attempt == IMPORT_COPY_ATTEMPTS - 1:
+                raise
+
+
+def _read_import_batch(rows, errors: list[GuestImportRowError]) -> list[GuestCreate]:
+    """Parse and validate rows until ``IMPORT_BATCH_SIZE`` are valid or the file ends.
+
+    Blocking, run in a worker thread; invalid rows are appended to ``errors``.
+    """
+    batch: list[GuestCreate] = []
+    for row_number, values in rows:
+        try:
+            batch.append(GuestCreate.model_validate(values))
+        except ValidationError as e:
+            errors.append(GuestImportRowError(
+                row=row_number,
+                errors=[f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors()],
+            ))
+            continue
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            break
+    return batch
+
+
+@router.post("/import", response_model=GuestImportResult)
+async def import_guests(
+    file: UploadFile = File(...),
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Bulk-create guests from a CSV or XLSX upload.
+
+    Columns are matched to ``GuestCreate`` fields by header name. The file is
+    parsed and validated in a worker thread so a large upload does not block
+    the event loop; valid rows are COPYed in batches of ``IMPORT_BATCH_SIZE``,
+    all in one transaction, and invalid rows are skipped and reported with
+    their spreadsheet row number.
+    """
+    try:
+        rows = iter_table_rows(file.file, file.filename, file.content_type)
+    except UnsupportedFormat as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+
+    imported = 0
+    errors: list[GuestImportRowError] = []
+    try:
+        while batch := await run_in_threadpool(_read_import_batch, rows, errors):
+            await _copy_guests(db, batch)
+            imported += len(batch)
+    except (csv.Error, UnicodeDecodeError, InvalidFileException, zipfile.BadZipFile) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Could not read file: {e}")
+
+    await apply_stats_delta(db, {"total": imported, "pending": imported})
+    if imported:
+        await notify_guests_imported(db, imported)
+    await db.commit()
+    if imported and rsvp_index.loaded:
+        await rsvp_index.reload()
+    return GuestImportResult(imported=imported, errors=errors)
+
+
+def seating_update_statement(table_numbers: dict[UUID, Optional[int]]):
+    """One UPDATE setting many guests' ``table_number``, from two array parameters."""
+    seats = sqlfunc.unnest(
+        bindparam("seat_guest_ids", list(table_numbers), type_=ARRAY(PG_UUID(as_uuid=True))),
+        bindparam("seat_tables", list(table_numbers.values()), type_=ARRAY(Integer)),
+    ).table_valued("guest_id", "table_number").render_derived(name="seats")
+    return (
+        update(Guest)
+        .where(Guest.id == seats.c.guest_id)
+        .values(table_number=seats.c.table_number)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _seating_capacities(data: SeatingRequest) -> dict[int, int]:
+    if data.tables:
+        capacities = {table.table_number: table.capacity for table in data.tables}
+        if len(capacities) != len(data.tables):
+            raise HTTPException(status_code=400, detail="Duplicate table_number in tables")
+    elif data.table_count and data.table_capacity:
+        capacities = dict.fromkeys(range(1, data.table_count + 1), data.table_capacity)
+    else:
+        raise HTTPException(status_code=400, detail="Give either tables, or table_count and table_capacity")
+    if len(capacities) > MAX_SEATING_TABLES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SEATING_TABLES} tables")
+    if min(capacities) < 1 or min(capacities.values()) < 1:
+        raise HTTPException(status_code=400, detail="Table numbers and capacities must be positive")
+    return capacities
+
+
+@router.post("/seating", response_model=SeatingPlanResult)
+async def plan_seating(
+    data: SeatingRequest,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Assign every attending guest a table with ``app.seating``.
+
+    Groups and attending plus-ones sit together, pinned guests sit at their
+    table and ``keep_apart`` pairs at different tables. Guests who are not
+    attending lose their table number. Unless ``dry_run``, every changed
+    table number is written by a single UPDATE.
+    """
+    capacities = _seating_capacities(data)
+    pins = {pin.guest_id: pin.table_number for pin in data.pins}
+    rows = (await db.execute(select(
+        Guest.id, Guest.first_name, Guest.last_name, Guest.group_name,
+        Guest.rsvp_status, Guest.plus_one_attending, Guest.table_number,
+    ))).all()
+
+    attending = [row for row in rows if row.rsvp_status == RSVPStatus.ATTENDING]
+    seats = {row.id: 2 if row.plus_one_attending else 1 for row in attending}
+    guests = [
+        SeatingGuest(row.id, f"{row.first_name} {row.last_name}", row.group_name, seats[row.id], pins.get(row.id))
+        for row in attending
+    ]
+    try:
+        plan = solve_seating(guests, capacities, data.keep_apart)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    warnings = [f"guest {guest_id} is pinned but not attending; not seated" for guest_id in pins if guest_id not in seats]
+    warnings += plan.warnings
+
+    changed = {
+        row.id: plan.assignments.get(row.id)
+        for row in rows
+        if row.table_number != plan.assignments.get(row.id)
+    }
+    if changed and not data.dry_run:
+        await db.execute(seating_update_statement(changed))
+        await notify_guests_seated(db, len(changed))
+        await db.commit()
+
+    by_table: dict[int, list[UUID]] = {number: [] for number in capacities}
+    for guest_id, table_number in plan.assignments.items():
+        by_table[table_number].append(guest_id)
+    return SeatingPlanResult(
+        tables=[
+            SeatingTableResult(
+                table_number=number,
+                capacity=capacities[number],
+                seats_used=sum(seats[guest_id] for guest_id in guest_ids),
+                guest_ids=[str(guest_id) for guest_id in guest_ids],
+            )
+            for number, guest_ids in sorted(by_table.items())
+        ],
+        seated=len(plan.assignments),
+        unseated_guest_ids=[str(guest_id) for guest_id in plan.unseated],
+        warnings=warnings,
+        updated=len(changed),
+        dry_run=data.dry_run,
+    )
+
+
+@router.post("/batch", response_model=BatchResult)
+async def batch_guests(
+    data: GuestBatch,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Update or delete many guests with one set-based statement.
+
+    Stats counters, change notifications and the RSVP index follow as for
+    single-guest writes. Results list each requested id as ``updated``,
+    ``deleted`` or ``not_found``; with a filter, every matched guest.
+    """
+    if (data.ids is None) == (data.filter is None):
+        raise HTTPException(status_code=400, detail="Give either ids or filter")
+    if data.ids is not None and not 0 < len(data.ids) <= MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"Give 1 to {MAX_BATCH_IDS} ids")
+    if data.delete == (data.update is not None):
+        raise HTTPException(status_code=400, detail="Give either update or delete")
+    if data.ids is not None:
+        criteria = [Guest.id.in_(data.ids)]
+    else:
+        criteria = data.filter.criteria()
+
+    if data.delete:
+        deleted = (await db.execute(guest_delete_statement(criteria))).all()
+        await db.commit()
+        for guest in deleted:
+            rsvp_index.discard(guest.rsvp_code)
+        return batch_result(data.ids, (guest.id for guest in deleted), "deleted")
+
+    changes = data.update.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    updated = (await db.execute(guest_update_statement(criteria, changes))).all()
+    await db.commit()
+    for guest in updated:
+        rsvp_index.put(guest)
+    return batch_result(data.ids, (guest.id for guest in updated), "updated")
+
+
 @router.get("/{guest_id}", response_model=GuestResponse)
 async def get_guest(
     guest_id: UUID,
     _current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(select(Guest).where(Guest.id == guest_id))
-    guest = result.scalar_one_or_none()
+    guest = (await db.execute(select(*GUEST_RESPONSE_COLUMNS).where(Guest.id == guest_id))).one_or_none()
     if not guest:
         raise HTTPException(status_code=404, detail="Guest not found")
-    return _guest_to_response(guest)
+    return JSONRowsResponse(guest._asdict())
+
+
+@router.get("/{guest_id}/responses", response_model=list[GuestResponseEntry])
+async def list_guest_responses(
+    guest_id: UUID,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Every answer the guest submitted, oldest first (also after the guest was deleted)."""
+    rows = (await db.execute(
+        select(
+            RSVPResponseLog.source, RSVPResponseLog.old_status, RSVPResponseLog.new_status,
+            RSVPResponseLog.plus_one_attending, RSVPResponseLog.dietary_restrictions,
+            RSVPResponseLog.message, RSVPResponseLog.responded_at,
+        )
+        .where(RSVPResponseLog.guest_id == guest_id)
+        .order_by(RSVPResponseLog.responded_at, RSVPResponseLog.id)
+    )).all()
+    return JSONRowsResponse([row._asdict() for row in rows])
 
 
 @router.patch("/{guest_id}", response_model=GuestResponse)
@@ -177,16 +1000,17 @@ async def update_guest(
     _current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Guest).where(Guest.id == guest_id))
-    guest = result.scalar_one_or_none()
+    changes = data.model_dump(exclude_unset=True)
+    if changes:
+        query = guest_update_statement([Guest.id == guest_id], changes)
+    else:
+        query = select(*GUEST_RESPONSE_COLUMNS).where(Guest.id == guest_id)
+    guest = (await db.execute(query)).one_or_none()
     if not guest:
         raise HTTPException(status_code=404, detail="Guest not found")
 
-    for field, value in data.model_dump(exclude_unset=True).items():
-        setattr(guest, field, value)
-
     await db.commit()
-    await db.refresh(guest)
+    rsvp_index.put(guest)
     return _guest_to_response(guest)
 
 
@@ -196,9 +1020,8 @@ async def delete_guest(
     _current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(select(Guest).where(Guest.id == guest_id))
-    guest = result.scalar_one_or_none()
-    if not guest:
+    deleted = (await db.execute(guest_delete_statement([Guest.id == guest_id]))).one_or_none()
+    if not deleted:
         raise HTTPException(status_code=404, detail="Guest not found")
-    await db.delete(guest)
     await db.commit()
+    rsvp_index.discard(deleted.rsvp_code)
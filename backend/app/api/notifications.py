@@ -0,0 +1,163 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, exists, func, select, update
+from sqlalchemy.orm import aliased
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+
+from app.api.guests import GuestFilter
+from app.db.database import get_db, get_read_db
+from app.db.models import Guest, Notification, NotificationChannel, NotificationKind, NotificationStatus
+from app.dispatch import PENDING_STATUSES, dispatcher, enqueue_notifications
+from app.encoding import JSONRowsResponse
+from app.transports import get_transport
+from app.auth import get_current_user
+from app.db.models import User
+
+router = APIRouter()
+
+MAX_NOTIFICATION_PAGE = 1000
+
+
+class NotificationRequest(BaseModel):
+    kind: NotificationKind
+    channel: NotificationChannel = NotificationChannel.EMAIL
+    # Guests by id, or by the guest list filters; neither means every guest.
+    guest_ids: Optional[list[UUID]] = None
+    filter: Optional[GuestFilter] = None
+
+
+class NotificationsQueued(BaseModel):
+    queued: int
+
+
+class NotificationResponse(BaseModel):
+    id: int
+    guest_id: str
+    kind: NotificationKind
+    channel: NotificationChannel
+    recipient: str
+    status: NotificationStatus
+    attempts: int
+    last_error: Optional[str]
+    next_attempt_at: str
+    created_at: str
+    sent_at: Optional[str]
+
+
+class NotificationCount(BaseModel):
+    kind: NotificationKind
+    channel: NotificationChannel
+    status: NotificationStatus
+    count: int
+
+
+class NotificationRetry(BaseModel):
+    # Dead-lettered jobs to queue again; all of them when omitted.
+    ids: Optional[list[int]] = None
+
+
+NOTIFICATION_COLUMNS = tuple(Notification.__table__.c[field] for field in NotificationResponse.model_fields)
+
+
+@router.post("", response_model=NotificationsQueued, status_code=status.HTTP_202_ACCEPTED)
+async def queue_notifications(
+    data: NotificationRequest,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue invitations or reminders; the background workers send them.
+
+    One ``INSERT ... SELECT`` whatever the number of guests. Guests without
+    an address for the channel are skipped, reminders skip guests who have
+    answered, and a guest who already has the same message pending is not
+    queued twice.
+    """
+    if data.guest_ids is not None and data.filter is not None:
+        raise HTTPException(status_code=400, detail="Give either ids or a filter")
+    if get_transport(data.channel) is None:
+        raise HTTPException(status_code=400, detail=f"Sending by {data.channel.value} is not configured")
+    if data.guest_ids is not None:
+        criteria = [Guest.id.in_(data.guest_ids)]
+    else:
+        criteria = data.filter.criteria() if data.filter else []
+    queued = await enqueue_notifications(db, data.kind, data.channel, criteria)
+    await db.commit()
+    if queued:
+        dispatcher.wake()
+    return NotificationsQueued(queued=queued)
+
+
+@router.get("", response_model=list[NotificationResponse])
+async def list_notifications(
+    status_filter: Optional[NotificationStatus] = Query(None, alias="status"),
+    kind: Optional[NotificationKind] = None,
+    guest_id: Optional[UUID] = None,
+    limit: int = Query(100, ge=1, le=MAX_NOTIFICATION_PAGE),
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Most recent jobs first, e.g. ``?status=dead`` for the dead letters."""
+    query = select(*NOTIFICATION_COLUMNS).order_by(Notification.id.desc()).limit(limit)
+    if status_filter is not None:
+        query = query.where(Notification.status == status_filter)
+    if kind is not None:
+        query = query.where(Notification.kind == kind)
+    if guest_id is not None:
+        query = query.where(Notification.guest_id == guest_id)
+    rows = (await db.execute(query)).all()
+    return JSONRowsResponse([row._asdict() for row in rows])
+
+
+@router.get("/summary", response_model=list[NotificationCount])
+async def notification_summary(
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Job counts per kind, channel and status."""
+    rows = (await db.execute(
+        select(Notification.kind, Notification.channel, Notification.status, func.count().label("count"))
+        .group_by(Notification.kind, Notification.channel, Notification.status)
+        .order_by(Notification.kind, Notification.channel, Notification.status)
+    )).all()
+    return JSONRowsResponse([row._asdict() for row in rows])
+
+
+@router.post("/retry", response_model=NotificationsQueued)
+async def retry_notifications(
+    data: NotificationRetry,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue dead-lettered jobs again with a fresh attempt budget, in one statement.
+
+    Of several dead jobs for the same guest and message only the latest is
+    retried, and none when the guest already has that message pending.
+    """
+    other = aliased(Notification)
+    same_message = and_(
+        other.guest_id == Notification.guest_id,
+        other.kind == Notification.kind,
+        other.channel == Notification.channel,
+    )
+    retried = [other.status == NotificationStatus.DEAD]
+    if data.ids is not None:
+        retried.append(other.id.in_(data.ids))
+    criteria = [
+        Notification.status == NotificationStatus.DEAD,
+        ~exists().where(same_message, other.status.in_(PENDING_STATUSES)),
+        ~exists().where(same_message, other.id > Notification.id, *retried),
+    ]
+    if data.ids is not None:
+        criteria.append(Notification.id.in_(data.ids))
+    result = await db.execute(
+        update(Notification)
+        .where(and_(*criteria))
+        .values(status=NotificationStatus.QUEUED, attempts=0, next_attempt_at=func.now(), last_error=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if result.rowcount:
+        dispatcher.wake()
+    return NotificationsQueued(queued=result.rowcount)
@@ -0,0 +1,153 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import case, delete, exists, func, or_, select, union_all, update
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+
+from app.db.database import get_db, get_read_db
+from app.db.models import Guest, Party, generate_rsvp_code
+from app.encoding import JSONRowsResponse
+from app.rsvp_index import rsvp_index
+from app.auth import get_current_user
+from app.db.models import User
+
+router = APIRouter()
+
+
+class PartyCreate(BaseModel):
+    name: str
+    guest_ids: list[UUID] = []
+
+
+class PartyUpdate(BaseModel):
+    name: Optional[str] = None
+    # Replaces the membership when given; guests left out leave the party.
+    guest_ids: Optional[list[UUID]] = None
+
+
+class PartyResponse(BaseModel):
+    id: str
+    name: str
+    rsvp_code: str
+    guest_ids: list[str]
+    created_at: str
+
+
+def _party_query():
+    guest_ids = func.array_remove(func.array_agg(Guest.id), None)
+    return (
+        select(Party.id, Party.name, Party.rsvp_code, guest_ids.label("guest_ids"), Party.created_at)
+        .outerjoin(Guest, Guest.party_id == Party.id)
+        .group_by(Party.id)
+    )
+
+
+async def _allocate_party_code(db: AsyncSession) -> str:
+    """A fresh code that no party and no guest uses (guest codes also answer for parties)."""
+    while True:
+        code = generate_rsvp_code()
+        taken = union_all(
+            select(Party.id).where(Party.rsvp_code == code),
+            select(Guest.id).where(Guest.rsvp_code == code),
+        )
+        if not (await db.execute(select(exists(taken)))).scalar():
+            return code
+
+
+async def _set_members(db: AsyncSession, party_id: UUID, guest_ids: list[UUID]) -> list[str]:
+    """Make exactly ``guest_ids`` the party's members, in one statement.
+
+    Returns the RSVP codes of the old and new members.
+    """
+    rows = (await db.execute(
+        update(Guest)
+        .where(or_(Guest.party_id == party_id, Guest.id.in_(guest_ids)))
+        .values(party_id=case((Guest.id.in_(guest_ids), party_id), else_=None))
+        .returning(Guest.id, Guest.rsvp_code)
+        .execution_options(synchronize_session=False)
+    )).all()
+    missing = set(guest_ids) - {row.id for row in rows}
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unknown guest ids: {', '.join(sorted(map(str, missing)))}")
+    return [row.rsvp_code for row in rows]
+
+
+async def _party_or_404(db: AsyncSession, party_id: UUID):
+    party = (await db.execute(_party_query().where(Party.id == party_id))).one_or_none()
+    if not party:
+        raise HTTPException(status_code=404, detail="Party not found")
+    return party
+
+
+@router.get("", response_model=list[PartyResponse])
+async def list_parties(
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    rows = (await db.execute(_party_query().order_by(Party.name, Party.id))).all()
+    return JSONRowsResponse([row._asdict() for row in rows])
+
+
+@router.post("", response_model=PartyResponse, status_code=status.HTTP_201_CREATED)
+async def create_party(
+    data: PartyCreate,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Create a household with a new RSVP code; listed guests move into it."""
+    party = Party(name=data.name, rsvp_code=await _allocate_party_code(db))
+    db.add(party)
+    await db.flush()
+    moved = await _set_members(db, party.id, data.guest_ids) if data.guest_ids else []
+    await db.commit()
+    rsvp_index.party_changed(party.rsvp_code, moved)
+    return JSONRowsResponse((await _party_or_404(db, party.id))._asdict(), status_code=status.HTTP_201_CREATED)
+
+
+@router.get("/{party_id}", response_model=PartyResponse)
+async def get_party(
+    party_id: UUID,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return JSONRowsResponse((await _party_or_404(db, party_id))._asdict())
+
+
+@router.patch("/{party_id}", response_model=PartyResponse)
+async def update_party(
+    party_id: UUID,
+    data: PartyUpdate,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    renamed = await db.execute(
+        update(Party)
+        .where(Party.id == party_id)
+        .values(**({"name": data.name} if data.name is not None else {"updated_at": func.now()}))
+        .returning(Party.rsvp_code)
+    )
+    party_code = renamed.scalar_one_or_none()
+    if party_code is None:
+        raise HTTPException(status_code=404, detail="Party not found")
+    moved = await _set_members(db, party_id, data.guest_ids) if data.guest_ids is not None else []
+    await db.commit()
+    rsvp_index.party_changed(party_code, moved)
+    return JSONRowsResponse((await _party_or_404(db, party_id))._asdict())
+
+
+@router.delete("/{party_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_party(
+    party_id: UUID,
+    _current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete a household; its guests stay, without a party (their own codes keep working)."""
+    moved = await _set_members(db, party_id, [])
+    party_code = (await db.execute(
+        delete(Party).where(Party.id == party_id).returning(Party.rsvp_code)
+    )).scalar_one_or_none()
+    if party_code is None:
+        raise HTTPException(status_code=404, detail="Party not found")
+    await db.commit()
+    rsvp_index.party_changed(party_code, moved)
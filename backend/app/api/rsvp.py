@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Boolean, String, Text, bindparam, case, cast, exists, or_, select, func as sqlfunc
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import aliased
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+from uuid import UUID
 
 from app.db.database import get_db
-from app.db.models import Guest, RSVPStatus, Language
+from app.db.models import Guest, Party, RSVPStatus, Language
+from app.db.idempotency import (
+    IDEMPOTENCY_HEADER, IdempotencyKeyReused, claim_idempotency_key, request_fingerprint,
+)
+from app.db.stats import guest_update_statement
+from app.encoding import JSONRowsResponse
+from app.rsvp_index import GuestSnapshot, rsvp_index
 
 router = APIRouter()
 
@@ -22,6 +31,7 @@ class RSVPLookupResponse(BaseModel):
     dietary_restrictions: Optional[str]
     message: Optional[str]
     language: Language
+    party_id: Optional[str] = None
 
 
 class RSVPSubmit(BaseModel):
@@ -38,49 +48,217 @@ class RSVPResponse(BaseModel):
     message: str
 
 
+class PartyLookupResponse(BaseModel):
+    party_id: Optional[str]
+    name: str
+    rsvp_code: str
+    members: list[RSVPLookupResponse]
+
+
+class PartyMemberSubmit(BaseModel):
+    guest_id: UUID
+    rsvp_status: RSVPStatus
+    plus_one_name: Optional[str] = None
+    plus_one_attending: bool = False
+    dietary_restrictions: Optional[str] = None
+
+
+class PartySubmit(BaseModel):
+    rsvp_code: str
+    members: list[PartyMemberSubmit]
+    message: Optional[str] = None
+
+
+async def _replay_or_claim(
+    db: AsyncSession, scope: str, idempotency_key: Optional[str], data: BaseModel,
+    result: RSVPResponse, response: Response,
+) -> Optional[RSVPResponse]:
+    """The stored response for a repeated ``Idempotency-Key``, else None (key claimed)."""
+    if not idempotency_key:
+        return None
+    try:
+        replay = await claim_idempotency_key(db, scope, idempotency_key, request_fingerprint(data), result.model_dump())
+    except IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different RSVP",
+        )
+    if replay is None:
+        return None
+    response.headers["Idempotent-Replayed"] = "true"
+    return RSVPResponse.model_validate(replay)
+
+
+def party_members_clause(rsvp_code: str):
+    """Guests invited under ``rsvp_code``: a party's code, or any guest's own code.
+
+    A guest's own code answers for their whole party; a guest without a party
+    is a party of one.
+    """
+    by_guest_code = aliased(Guest)
+    party_ids = select(Party.id).where(Party.rsvp_code == rsvp_code).union(
+        select(by_guest_code.party_id).where(by_guest_code.rsvp_code == rsvp_code)
+    )
+    return or_(Guest.party_id.in_(party_ids), Guest.rsvp_code == rsvp_code)
+
+
+_PARTY_LOOKUP_COLUMNS = (
+    *(getattr(Guest, field) for field in GuestSnapshot._fields),
+    Guest.rsvp_code,
+    Party.name.label("party_name"),
+    Party.rsvp_code.label("party_code"),
+)
+
+
 @router.get("/lookup/{rsvp_code}", response_model=RSVPLookupResponse)
 async def lookup_rsvp(rsvp_code: str, db: AsyncSession = Depends(get_db)):
-    """Public endpoint: look up guest by RSVP code."""
-    result = await db.execute(
-        select(Guest).where(Guest.rsvp_code == rsvp_code.upper())
-    )
-    guest = result.scalar_one_or_none()
+    """Public endpoint: look up guest by RSVP code (served from the RSVP index)."""
+    guest = await rsvp_index.lookup(db, rsvp_code)
     if not guest:
         raise HTTPException(status_code=404, detail="RSVP code not found")
 
-    return RSVPLookupResponse(
-        id=str(guest.id),
-        first_name=guest.first_name,
-        last_name=guest.last_name,
-        rsvp_status=guest.rsvp_status,
-        plus_one_allowed=guest.plus_one_allowed,
-        plus_one_name=guest.plus_one_name,
-        plus_one_attending=guest.plus_one_attending,
-        dietary_restrictions=guest.dietary_restrictions,
-        message=guest.message,
-        language=guest.language,
-    )
+    # GuestSnapshot has RSVPLookupResponse's fields in the same order.
+    return JSONRowsResponse(guest._asdict())
 
 
 @router.post("/submit", response_model=RSVPResponse)
-async def submit_rsvp(data: RSVPSubmit, db: AsyncSession = Depends(get_db)):
-    """Public endpoint: submit RSVP response."""
-    result = await db.execute(
-        select(Guest).where(Guest.rsvp_code == data.rsvp_code.upper())
-    )
-    guest = result.scalar_one_or_none()
-    if not guest:
+async def submit_rsvp(
+    data: RSVPSubmit,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
+    db: AsyncSession = Depends(get_db),
+):
+    """Public endpoint: submit RSVP response.
+
+    The guest row, the stats counters and the response history log are
+    written by a single statement.
+    With an ``Idempotency-Key`` header, a repeated submit (double tap, retry
+    after a dropped connection) replays the first response without writing.
+    """
+    if rsvp_index.is_known_missing(data.rsvp_code):
         raise HTTPException(status_code=404, detail="RSVP code not found")
 
-    guest.rsvp_status = data.rsvp_status
-    guest.dietary_restrictions = data.dietary_restrictions
-    guest.message = data.message
-    guest.responded_at = datetime.utcnow()
+    result = RSVPResponse(success=True, message="RSVP submitted successfully")
+    replay = await _replay_or_claim(db, "rsvp.submit", idempotency_key, data, result, response)
+    if replay is not None:
+        return replay
 
-    if guest.plus_one_allowed:
-        guest.plus_one_name = data.plus_one_name
-        guest.plus_one_attending = data.plus_one_attending
+    code = data.rsvp_code.upper()
+    values = {
+        Guest.rsvp_status: data.rsvp_status,
+        Guest.dietary_restrictions: data.dietary_restrictions,
+        Guest.message: data.message,
+        Guest.responded_at: datetime.utcnow(),
+        Guest.plus_one_name: case((Guest.plus_one_allowed, data.plus_one_name), else_=Guest.plus_one_name),
+        Guest.plus_one_attending: case(
+            (Guest.plus_one_allowed, data.plus_one_attending), else_=Guest.plus_one_attending
+        ),
+    }
+    guest = (await db.execute(
+        guest_update_statement([Guest.rsvp_code == code], values, log_source="rsvp")
+    )).one_or_none()
+    if not guest:
+        rsvp_index.mark_missing(code)
+        raise HTTPException(status_code=404, detail="RSVP code not found")
 
     await db.commit()
+    rsvp_index.put(guest)
+    return result
+
+
+@router.get("/party/{rsvp_code}", response_model=PartyLookupResponse)
+async def lookup_party(rsvp_code: str, db: AsyncSession = Depends(get_db)):
+    """Public endpoint: the whole party invited under a party or guest code.
+
+    Served from the RSVP index when it knows the party, otherwise in one query.
+    """
+    code = rsvp_code.upper()
+    if rsvp_index.is_unknown_party(code):
+        raise HTTPException(status_code=404, detail="RSVP code not found")
+
+    found = rsvp_index.party(code)
+    if found is None:
+        rows = (await db.execute(
+            select(*_PARTY_LOOKUP_COLUMNS)
+            .outerjoin(Party, Guest.party_id == Party.id)
+            .where(party_members_clause(code))
+            .order_by(Guest.last_name, Guest.first_name, Guest.id)
+        )).all()
+        if not rows:
+            rsvp_index.mark_unknown_party(code)
+            raise HTTPException(status_code=404, detail="RSVP code not found")
+        found = rsvp_index.store_party(code, rows)
 
-    return RSVPResponse(success=True, message="RSVP submitted successfully")
+    party, members = found
+    return JSONRowsResponse({
+        "party_id": party.id,
+        "name": party.name,
+        "rsvp_code": party.rsvp_code,
+        "members": [member._asdict() for member in members],
+    })
+
+
+def _member_rsvp_source(members: list[PartyMemberSubmit]):
+    """The submitted answers as rows (``unnest`` of one array per field)."""
+    columns = {
+        "guest_id": (ARRAY(PG_UUID(as_uuid=True)), [m.guest_id for m in members]),
+        "rsvp_status": (ARRAY(String), [m.rsvp_status.name for m in members]),
+        "plus_one_attending": (ARRAY(Boolean), [m.plus_one_attending for m in members]),
+        "plus_one_name": (ARRAY(Text), [m.plus_one_name for m in members]),
+        "dietary_restrictions": (ARRAY(Text), [m.dietary_restrictions for m in members]),
+    }
+    return sqlfunc.unnest(*(
+        bindparam(f"member_{name}", values, type_=type_) for name, (type_, values) in columns.items()
+    )).table_valued(*columns).render_derived(name="member_rsvp")
+
+
+@router.post("/party/submit", response_model=RSVPResponse)
+async def submit_party_rsvp(
+    data: PartySubmit,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
+    db: AsyncSession = Depends(get_db),
+):
+    """Public endpoint: answer for several members of a party at once.
+
+    Every listed member's status, plus-one and dietary fields (and the shared
+    ``message``) are written by one statement, together with the stats
+    counters and the response history log; members not listed are left as they are. Fails with 422 and
+    writes nothing if a listed guest is not in the party.
+    """
+    guest_ids = [member.guest_id for member in data.members]
+    if not guest_ids or len(set(guest_ids)) != len(guest_ids):
+        raise HTTPException(status_code=422, detail="List each party member at most once")
+    code = data.rsvp_code.upper()
+    if rsvp_index.is_unknown_party(code):
+        raise HTTPException(status_code=404, detail="RSVP code not found")
+
+    result = RSVPResponse(success=True, message="RSVP submitted successfully")
+    replay = await _replay_or_claim(db, "rsvp.party_submit", idempotency_key, data, result, response)
+    if replay is not None:
+        return replay
+
+    source = _member_rsvp_source(data.members)
+    values = {
+        Guest.rsvp_status: cast(source.c.rsvp_status, Guest.rsvp_status.type),
+        Guest.dietary_restrictions: source.c.dietary_restrictions,
+        Guest.message: data.message,
+        Guest.responded_at: datetime.utcnow(),
+        Guest.plus_one_name: case((Guest.plus_one_allowed, source.c.plus_one_name), else_=Guest.plus_one_name),
+        Guest.plus_one_attending: case(
+            (Guest.plus_one_allowed, source.c.plus_one_attending), else_=Guest.plus_one_attending
+        ),
+    }
+    criteria = [party_members_clause(code), Guest.id.in_(guest_ids)]
+    guests = (await db.execute(guest_update_statement(criteria, values, source=source, log_source="party"))).all()
+    if len(guests) != len(guest_ids):
+        await db.rollback()
+        if not guests and not (await db.execute(select(exists().where(party_members_clause(code))))).scalar():
+            rsvp_index.mark_unknown_party(code)
+            raise HTTPException(status_code=404, detail="RSVP code not found")
+        raise HTTPException(status_code=422, detail="Some guests are not in this party")
+
+    await db.commit()
+    for guest in guests:
+        rsvp_index.put(guest)
+    return result
@@ -1,11 +1,19 @@
 from .jwt import create_access_token, verify_token
-from .passwords import hash_password, verify_password
-from .dependencies import get_current_user
+from .passwords import (
+    hash_password, verify_password, hash_password_async, verify_password_async, needs_rehash,
+)
+from .dependencies import get_current_user, get_current_user_for_stream, invalidate_user, revoke_user_tokens
 
 __all__ = [
     "create_access_token",
     "verify_token",
     "hash_password",
     "verify_password",
+    "hash_password_async",
+    "verify_password_async",
+    "needs_rehash",
     "get_current_user",
+    "get_current_user_for_stream",
+    "invalidate_user",
+    "revoke_user_tokens",
 ]
@@ -1,21 +1,81 @@
-from fastapi import Depends, HTTPException, status
+import hashlib
+import time
+
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from uuid import UUID
 
+from app.cache import TTLCache
+from app.config import settings
 from app.db.database import get_db
 from app.db.models import User
 from .jwt import verify_token
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# sha256(token) -> detached User. A hit skips both JWT decoding and the
+# users lookup; entries expire at the token's exp at the latest.
+_principal_cache = TTLCache(
+    "auth.principals",
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def invalidate_user(user_id: UUID) -> None:
+    """Drop every cached principal for ``user_id`` on this worker.
+
+    Call after changing a user row so the next request reloads it.
+    """
+    _principal_cache.evict_where(lambda _key, user: user.id == user_id)
+
+
+async def revoke_user_tokens(db: AsyncSession, user_id: UUID) -> None:
+    """Invalidate every token issued to ``user_id`` so far (caller commits)."""
+    await db.execute(
+        update(User).where(User.id == user_id).values(token_version=User.token_version + 1)
+    )
+    invalidate_user(user_id)
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db),
 ) -> User:
-    token = credentials.credentials
+    return await _authenticate(credentials.credentials, db)
+
+
+async def get_current_user_for_stream(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    access_token: Optional[str] = Query(None, description="Bearer token, for EventSource clients that cannot set headers"),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Like ``get_current_user``, but also accepts the token as ``?access_token=``."""
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await _authenticate(token, db)
+
+
+async def _authenticate(token: str, db: AsyncSession) -> User:
+    cache_key = _token_key(token)
+    user = _principal_cache.get(cache_key)
+    if user is not None:
+        return user
+
     payload = verify_token(token)
 
     if not payload:
@@ -50,4 +110,16 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if payload.get("tv", 0) != user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    ttl = min(settings.AUTH_CACHE_TTL_SECONDS, payload["exp"] - time.time())
+    if ttl > 0:
+        db.expunge(user)
+        _principal_cache.set(cache_key, user, ttl=ttl)
+
     return user
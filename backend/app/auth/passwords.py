@@ -1,9 +1,21 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+# loop; the semaphore caps queued work so a login burst fails fast instead of
+# piling up behind the pool.
+_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_slots = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS)
 
 
 def hash_password(password: str) -> str:
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode("utf-8")
 
@@ -12,3 +24,38 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     password_bytes = plain_password.encode("utf-8")
     hashed_bytes = hashed_password.encode("utf-8")
     return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with a cost other than ``BCRYPT_ROUNDS``."""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+async def _run_in_pool(func, *args):
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in attempts in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        _slots.release()
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
+
+
+def shutdown_password_pool() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
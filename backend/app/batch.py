@@ -0,0 +1,40 @@
+"""Response shapes shared by the batch endpoints (``/api/guests/batch``, ``/api/events/batch``).
+
+A batch runs as one set-based statement; the response reports what happened
+to each row, in request order when ids were given.
+"""
+from typing import Iterable, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+MAX_BATCH_IDS = 5000
+NOT_FOUND = "not_found"
+
+
+class BatchItemResult(BaseModel):
+    id: str
+    status: str
+
+
+class BatchResult(BaseModel):
+    matched: int
+    results: list[BatchItemResult]
+
+
+def batch_result(requested: Optional[list[UUID]], affected: Iterable[UUID], status: str) -> BatchResult:
+    """``status`` for every affected row; requested ids that matched nothing are ``not_found``."""
+    affected_ids = [str(row_id) for row_id in affected]
+    if requested is None:
+        return BatchResult(
+            matched=len(affected_ids),
+            results=[BatchItemResult(id=row_id, status=status) for row_id in affected_ids],
+        )
+    found = set(affected_ids)
+    return BatchResult(
+        matched=len(affected_ids),
+        results=[
+            BatchItemResult(id=row_id, status=status if row_id in found else NOT_FOUND)
+            for row_id in dict.fromkeys(map(str, requested))
+        ],
+    )
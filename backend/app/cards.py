@@ -0,0 +1,307 @@
+"""Printable invitation cards: one A6 SVG per guest with a QR code of their RSVP link.
+
+Drawing QR codes and laying out cards is CPU-bound, so ``stream_card_archive``
+hands batches of ``CardFields`` to a process pool (``CARD_RENDER_WORKERS``)
+and writes each card into a streamed ZIP as soon as its batch is done. The
+event loop only waits on the pool.
+
+Cards are SVG rather than PDF: browsers and print tools lay out the text
+with the printer's fonts, Arabic shaping and right-to-left runs included,
+without the server embedding fonts. Arabic cards mirror the layout.
+
+Rendered cards are kept in ``invitation_cards`` with a ``fingerprint`` of
+everything printed on them and ``CARD_TEMPLATE_VERSION``; a reprint renders
+only the guests whose fingerprint changed. Bump ``CARD_TEMPLATE_VERSION``
+whenever the layout or texts below change.
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, NamedTuple, Optional
+from xml.sax.saxutils import escape
+
+import segno
+from sqlalchemy import LargeBinary, String, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
+
+from app.config import settings
+from app.db.database import async_session_maker
+from app.db.models import Guest, InvitationCard, Language
+from app.tabular import StreamingZip
+
+CARD_TEMPLATE_VERSION = 1
+ZIP_MEDIA_TYPE = "application/zip"
+# Stored cards read, and rendered cards saved, per statement.
+CARD_DB_CHUNK = 200
+
+# Card size in millimetres (A6 landscape); the SVG user unit is 1 mm.
+_WIDTH, _HEIGHT = 148, 105
+_MARGIN = 12
+_QR_SIZE = 40
+
+_TEXTS = {
+    Language.FR: {
+        "title": "Invitation",
+        "intro": ("Nous avons la joie de vous inviter", "à célébrer notre mariage"),
+        "plus_one": "et votre invité(e)",
+        "scan": "Scannez pour répondre",
+        "code": "Code RSVP",
+    },
+    Language.EN: {
+        "title": "Invitation",
+        "intro": ("We would love you to join us", "to celebrate our wedding"),
+        "plus_one": "and guest",
+        "scan": "Scan to RSVP",
+        "code": "RSVP code",
+    },
+    Language.AR: {
+        "title": "دعوة",
+        "intro": ("يسعدنا دعوتكم", "لحضور حفل زفافنا"),
+        "plus_one": "ومرافقكم",
+        "scan": "امسحوا الرمز لتأكيد الحضور",
+        "code": "رمز الدعوة",
+    },
+}
+_FONTS = {
+    Language.AR: "'Amiri', 'Noto Naskh Arabic', 'Traditional Arabic', serif",
+    Language.FR: "'Cormorant Garamond', Georgia, serif",
+    Language.EN: "'Cormorant Garamond', Georgia, serif",
+}
+
+
+class CardFields(NamedTuple):
+    """Everything printed on a guest's card."""
+
+    guest_id: str
+    first_name: str
+    last_name: str
+    plus_one_allowed: bool
+    plus_one_name: Optional[str]
+    language: Language
+    rsvp_code: str
+    link: str
+
+
+def fingerprint(card: CardFields) -> str:
+    payload = json.dumps([CARD_TEMPLATE_VERSION, *card], default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def card_filename(position: int, card: CardFields) -> str:
+    """``0007-dupont-marie-AB12CD34.svg``: sorts in print order and names the guest."""
+    name = re.sub(r"[^\w]+", "-", f"{card.last_name} {card.first_name}".lower()).strip("-")
+    return f"{position:04d}-{name}-{card.rsvp_code}.svg"
+
+
+def _qr_path(data: str) -> tuple[str, int]:
+    """SVG path of the QR code's dark modules (one run per row segment) and its size in modules."""
+    qr = segno.make_qr(data, error="m")
+    commands = []
+    size = 0
+    for y, row in enumerate(qr.matrix_iter(scale=1, border=0)):
+        row = list(row)
+        size = len(row)
+        x = 0
+        while x < size:
+            if row[x]:
+                start = x
+                while x < size and row[x]:
+                    x += 1
+                commands.append(f"M{start} {y}h{x - start}v1h{start - x}z")
+            else:
+                x += 1
+    return "".join(commands), size
+
+
+def _names(card: CardFields, texts: dict) -> str:
+    name = f"{card.first_name} {card.last_name}"
+    if card.plus_one_name:
+        return f"{name} & {card.plus_one_name}"
+    if card.plus_one_allowed:
+        return f"{name} {texts['plus_one']}"
+    return name
+
+
+def render_card(card: CardFields) -> bytes:
+    texts = _TEXTS[card.language]
+    rtl = card.language == Language.AR
+    # Text column on the reading side, QR code on the other.
+    text_x = _WIDTH - _MARGIN if rtl else _MARGIN
+    qr_x = _MARGIN if rtl else _WIDTH - _MARGIN - _QR_SIZE
+    qr_path, modules = _qr_path(card.link)
+    names = _names(card, texts)
+    # Shrink long names so they stay clear of the QR code (about 0.5 em per character).
+    name_size = min(6.5, 2 * (_WIDTH - 2 * _MARGIN - _QR_SIZE - 8) / max(len(names), 1))
+    direction = ' direction="rtl"' if rtl else ""
+    intro = "".join(
+        f'<text x="{text_x}" y="{38 + 6 * i}" font-size="4.2"{direction} text-anchor="start">{escape(line)}</text>'
+        for i, line in enumerate(texts["intro"])
+    )
+    svg = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{_WIDTH}mm" height="{_HEIGHT}mm" '
+        f'viewBox="0 0 {_WIDTH} {_HEIGHT}" xml:lang="{card.language.value}">'
+        f'<rect width="{_WIDTH}" height="{_HEIGHT}" fill="#fffdf8"/>'
+        f'<rect x="4" y="4" width="{_WIDTH - 8}" height="{_HEIGHT - 8}" '
+        'fill="none" stroke="#b08d57" stroke-width="0.6"/>'
+        f'<g font-family="{_FONTS[card.language]}" fill="#3b2f2f">'
+        f'<text x="{text_x}" y="24" font-size="10"{direction} text-anchor="start">{escape(texts["title"])}</text>'
+        f"{intro}"
+        f'<text x="{text_x}" y="62" font-size="{name_size:.2f}" font-weight="bold"{direction} '
+        f'text-anchor="start">{escape(names)}</text>'
+        f'<text x="{text_x}" y="80" font-size="3.5"{direction} text-anchor="start">{escape(texts["code"])}</text>'
+        f'<text x="{text_x}" y="89" font-size="7" font-family="monospace" letter-spacing="1" '
+        f'direction="ltr" text-anchor="{"end" if rtl else "start"}">{escape(card.rsvp_code)}</text>'
+        f'<text x="{qr_x + _QR_SIZE / 2}" y="{28 + _QR_SIZE + 7}" font-size="3.2"{direction} '
+        f'text-anchor="middle">{escape(texts["scan"])}</text>'
+        f'<text x="{qr_x + _QR_SIZE / 2}" y="{_HEIGHT - 10}" font-size="2.6" direction="ltr" '
+        f'text-anchor="middle">{escape(card.link)}</text>'
+        "</g>"
+        f'<g transform="translate({qr_x} 28) scale({_QR_SIZE / modules:.5f})">'
+        f'<path d="{qr_path}" fill="#000"/></g>'
+        "</svg>"
+    )
+    return svg.encode("utf-8")
+
+
+def render_cards(cards: list[CardFields]) -> list[bytes]:
+    """One pool task: render a batch of cards."""
+    return [render_card(card) for card in cards]
+
+
+_renderer: Optional[ProcessPoolExecutor] = None
+
+
+def card_renderer() -> ProcessPoolExecutor:
+    """The per-process render pool, started on first use.
+
+    Workers are spawned rather than forked so they do not inherit the
+    event loop's threads and open database connections.
+    """
+    global _renderer
+    if _renderer is None:
+        _renderer = ProcessPoolExecutor(
+            max_workers=settings.CARD_RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _renderer
+
+
+def close_card_renderer() -> None:
+    global _renderer
+    if _renderer is not None:
+        _renderer.shutdown(wait=False, cancel_futures=True)
+        _renderer = None
+
+
+def _discard_card_renderer(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool that lost a worker, so the next request starts a fresh one."""
+    global _renderer
+    if _renderer is broken:
+        _renderer = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+async def _save_cards(session, rows: list[dict]) -> None:
+    """Upsert rendered cards, skipping guests deleted since the download started.
+
+    The rows are joined to ``guests`` with ``FOR KEY SHARE``, so a guest
+    deleted meanwhile drops out instead of failing the foreign key and
+    cutting the archive short.
+    """
+    cards = func.unnest(
+        bindparam("card_guest_ids", [row["guest_id"] for row in rows], type_=ARRAY(PG_UUID(as_uuid=False))),
+        bindparam("card_fingerprints", [row["fingerprint"] for row in rows], type_=ARRAY(String)),
+        bindparam("card_contents", [row["content"] for row in rows], type_=ARRAY(LargeBinary)),
+    ).table_valued("guest_id", "fingerprint", "content").render_derived(name="cards")
+    statement = pg_insert(InvitationCard).from_select(
+        ["guest_id", "fingerprint", "content"],
+        select(cards.c.guest_id, cards.c.fingerprint, cards.c.content)
+        .join(Guest, Guest.id == cards.c.guest_id)
+        .with_for_update(key_share=True, of=Guest),
+    )
+    await session.execute(statement.on_conflict_do_update(
+        index_elements=[InvitationCard.guest_id],
+        set_={
+            "fingerprint": statement.excluded.fingerprint,
+            "content": statement.excluded.content,
+            "rendered_at": func.now(),
+        },
+    ))
+    await session.commit()
+
+
+async def stream_card_archive(cards: list[CardFields], stored: dict[str, str]) -> AsyncIterator[bytes]:
+    """Stream a ZIP of ``cards``, reusing stored cards whose fingerprint is in ``stored``.
+
+    Stored cards are copied in while the pool renders the rest; a stored
+    card that has disappeared meanwhile is rendered again. Rendered cards go
+    into the archive as each batch completes and are saved every
+    ``CARD_DB_CHUNK`` cards, so a download cut short still keeps most of the
+    work done; cards of guests deleted meanwhile are not saved. If a render worker dies the download fails and the pool is
+    replaced for the next one. Uses its own session, as streaming generators
+    must.
+    """
+    loop = asyncio.get_running_loop()
+    positions = {card.guest_id: position for position, card in enumerate(cards, start=1)}
+    by_id = {card.guest_id: card for card in cards}
+    fingerprints = {card.guest_id: fingerprint(card) for card in cards}
+    cached = [guest_id for guest_id, print_ in fingerprints.items() if stored.get(guest_id) == print_]
+    cached_ids = set(cached)
+    to_render = [card for card in cards if card.guest_id not in cached_ids]
+    batch_size = settings.CARD_RENDER_BATCH_SIZE
+    renderer = card_renderer()
+    running: dict[asyncio.Future, list[CardFields]] = {}
+
+    def submit() -> None:
+        # Keep every worker busy with one batch queued behind it.
+        while to_render and len(running) < 2 * settings.CARD_RENDER_WORKERS:
+            batch = to_render[:batch_size]
+            del to_render[:batch_size]
+            running[loop.run_in_executor(renderer, render_cards, batch)] = batch
+
+    archive = StreamingZip(compression=zipfile.ZIP_DEFLATED)
+    unsaved: list[dict] = []
+    try:
+        submit()
+        async with async_session_maker() as session:
+            for i in range(0, len(cached), CARD_DB_CHUNK):
+                chunk = cached[i:i + CARD_DB_CHUNK]
+                rows = await session.execute(
+                    select(InvitationCard.guest_id, InvitationCard.content)
+                    .where(InvitationCard.guest_id.in_(chunk))
+                )
+                copied = set()
+                for guest_id, content in rows:
+                    guest_id = str(guest_id)
+                    copied.add(guest_id)
+                    archive.writestr(card_filename(positions[guest_id], by_id[guest_id]), content)
+                to_render.extend(by_id[guest_id] for guest_id in chunk if guest_id not in copied)
+                submit()
+                yield archive.drain()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    batch = running.pop(future)
+                    contents = future.result()
+                    submit()
+                    for card, content in zip(batch, contents):
+                        archive.writestr(card_filename(positions[card.guest_id], card), content)
+                        unsaved.append(
+                            {"guest_id": card.guest_id, "fingerprint": fingerprints[card.guest_id], "content": content}
+                        )
+                    yield archive.drain()
+                if len(unsaved) >= CARD_DB_CHUNK or (unsaved and not running):
+                    await _save_cards(session, unsaved)
+                    unsaved = []
+        yield archive.close()
+    except BrokenProcessPool:
+        _discard_card_renderer(renderer)
+        raise
+    finally:
+        for future in running:
+            future.cancel()
@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -8,9 +10,172 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str
     JWT_SECRET: str
+
+    # SQLAlchemy pool. DB_POOL_SIZE connections are opened and primed in the
+    # lifespan hook, before /ready reports ready; up to DB_MAX_OVERFLOW more
+    # are opened under load. Connections are replaced after
+    # DB_POOL_RECYCLE_SECONDS (-1: never).
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_WARMUP: bool = True
+    # When to test a connection with a round trip before handing it out:
+    # "always" (every checkout), "idle" (only after it sat unused for
+    # DB_POOL_PRE_PING_IDLE_SECONDS, e.g. across a database restart) or "never".
+    DB_POOL_PRE_PING: Literal["always", "idle", "never"] = "idle"
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = 60
+
+    # asyncpg: prepared statements cached per connection, and the per-statement
+    # timeout (None: no timeout). DB_PGBOUNCER=true is for PgBouncer in
+    # transaction mode: it disables the statement caches and names prepared
+    # statements uniquely. LISTEN needs a real session, so then point
+    # DB_LISTEN_URL at Postgres directly (default: DATABASE_URL).
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT_SECONDS: Optional[float] = None
+    DB_PGBOUNCER: bool = False
+    DB_LISTEN_URL: Optional[str] = None
+
+    # Read-only endpoints (get_read_db) open READ ONLY transactions on the
+    # primary, in the main pool. Set DATABASE_READ_URL to a streaming replica
+    # to serve them from there instead, through a pool of DB_READ_POOL_SIZE
+    # connections in autocommit mode with default_transaction_read_only on
+    # (no BEGIN or COMMIT round trips; with DB_PGBOUNCER, READ ONLY
+    # transactions). The replica is polled every DB_REPLICA_CHECK_SECONDS and
+    # reads go to the primary while it is unreachable or more than
+    # DB_REPLICA_MAX_LAG_SECONDS behind.
+    DATABASE_READ_URL: Optional[str] = None
+    DB_READ_POOL_SIZE: int = 5
+    DB_READ_MAX_OVERFLOW: int = 10
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5
+    DB_REPLICA_CHECK_SECONDS: float = 2
+
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
 
+    # Verified-principal cache used by get_current_user. Entries never outlive
+    # the token's exp; the TTL bounds how long another worker may keep
+    # accepting a token after its user was revoked.
+    AUTH_CACHE_TTL_SECONDS: float = 300.0
+    AUTH_CACHE_MAX_ENTRIES: int = 1024
+
+    # bcrypt cost for new hashes; existing hashes with another cost are
+    # re-hashed on the next successful login.
+    BCRYPT_ROUNDS: int = 12
+    # Password hashing runs in this many threads; requests waiting longer
+    # than the queue timeout for a slot get a 503.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+
+    # Serve /api/guests/stats from the guest_stats counters row instead of
+    # aggregating the guests table on every call.
+    GUEST_STATS_USE_COUNTERS: bool = True
+
+    # Public timeline (GET /api/events): how long a worker serves its cached
+    # payload before re-reading events written on other workers, and the
+    # browser/CDN max-age sent with it.
+    EVENTS_CACHE_TTL_SECONDS: float = 30.0
+    EVENTS_CACHE_MAX_AGE_SECONDS: int = 60
+
+    # In-memory RSVP code index for the public lookup/submit endpoints. Each
+    # worker reloads it from the database every RSVP_INDEX_REFRESH_SECONDS to
+    # pick up writes made by other workers; unknown codes are remembered for
+    # RSVP_NEGATIVE_CACHE_TTL_SECONDS.
+    RSVP_INDEX_ENABLED: bool = True
+    RSVP_INDEX_REFRESH_SECONDS: float = 60.0
+    RSVP_NEGATIVE_CACHE_TTL_SECONDS: float = 30.0
+    RSVP_NEGATIVE_CACHE_MAX_ENTRIES: int = 10_000
+    # Parties for GET /api/rsvp/party/{code}, as their members' codes; a party
+    # renamed or joined on another worker is seen here within the TTL.
+    RSVP_PARTY_CACHE_TTL_SECONDS: float = 60.0
+    RSVP_PARTY_CACHE_MAX_ENTRIES: int = 10_000
+
+    # Admission control for the public /api/rsvp/* endpoints (per worker).
+    # Token buckets per client IP and per RSVP code answer 429 when empty;
+    # at most RSVP_MAX_IN_FLIGHT public requests run at once (keep it below
+    # the pool size so admin requests always find a connection) and the rest
+    # get a 503 after waiting RSVP_ADMISSION_TIMEOUT_SECONDS for a slot.
+    RSVP_ADMISSION_ENABLED: bool = True
+    RSVP_IP_RATE_PER_SECOND: float = 2.0
+    RSVP_IP_BURST: int = 30
+    RSVP_CODE_RATE_PER_SECOND: float = 0.5
+    RSVP_CODE_BURST: int = 10
+    RSVP_RATE_LIMIT_MAX_KEYS: int = 10_000
+    RSVP_MAX_IN_FLIGHT: int = 8
+    RSVP_ADMISSION_TIMEOUT_SECONDS: float = 0.25
+    # Larger submit bodies are answered 413 without being read to the end.
+    RSVP_MAX_BODY_BYTES: int = 65_536
+
+    # GET /api/guests/live sends an SSE comment this often when idle, for
+    # proxies that close silent connections; 0 sends nothing while idle.
+    LIVE_HEARTBEAT_SECONDS: float = 0
+
+    # Per-request SQL instrumentation: a Server-Timing header with each
+    # response's statement count and database time, and a warning when one
+    # request repeats a statement N_PLUS_ONE_THRESHOLD times. Statements
+    # slower than SLOW_QUERY_MS are logged without their parameter values
+    # (0 disables the slow-query log).
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SLOW_QUERY_MS: float = 250
+    N_PLUS_ONE_THRESHOLD: int = 10
+
+    # Serve Prometheus metrics (request latency, DB pool, caches) at /metrics.
+    # Keep the path internal: expose it to the scraper, not through the ingress.
+    METRICS_ENABLED: bool = True
+
+    # Response analytics fold each hour of the RSVP response log into the
+    # hourly rollup once it has been closed this long, so a submission that
+    # commits a little after the hour turns still lands in its bucket.
+    RSVP_ROLLUP_GRACE_SECONDS: int = 300
+
+    # Invitation and reminder dispatch (app/dispatch.py). Each API process
+    # runs NOTIFICATION_WORKERS asyncio workers that claim up to
+    # NOTIFICATION_BATCH_SIZE due jobs at a time from the notifications
+    # table. A failed send is retried after NOTIFICATION_RETRY_BASE_SECONDS *
+    # 2^(attempt - 1), jittered and capped at NOTIFICATION_RETRY_MAX_SECONDS,
+    # and dead-lettered after NOTIFICATION_MAX_ATTEMPTS; a job whose worker
+    # died is retried when its NOTIFICATION_LEASE_SECONDS lease runs out.
+    NOTIFICATIONS_ENABLED: bool = True
+    NOTIFICATION_WORKERS: int = 2
+    NOTIFICATION_BATCH_SIZE: int = 100
+    NOTIFICATION_POLL_SECONDS: float = 5.0
+    NOTIFICATION_LEASE_SECONDS: float = 300
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_RETRY_BASE_SECONDS: float = 30
+    NOTIFICATION_RETRY_MAX_SECONDS: float = 3600
+    # Messages link to PUBLIC_SITE_URL + /rsvp/<code>.
+    PUBLIC_SITE_URL: str = "http://localhost:5173"
+
+    # Email over SMTP; leave SMTP_HOST unset to disable email. For local
+    # testing point it at the mailpit service in docker-compose or at
+    # `python -m benchmarks.smtp_sink`. SMTP_CONCURRENCY connections per
+    # process are kept open and reused across messages.
+    SMTP_HOST: Optional[str] = None
+    SMTP_PORT: int = 25
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_STARTTLS: bool = False
+    SMTP_FROM: str = "Wedding <noreply@localhost>"
+    SMTP_TIMEOUT_SECONDS: float = 10
+    SMTP_CONCURRENCY: int = 4
+
+    # SMS through an HTTP gateway that takes POST {"to", "from", "body"} as
+    # JSON with a bearer token; leave SMS_GATEWAY_URL unset to disable SMS.
+    SMS_GATEWAY_URL: Optional[str] = None
+    SMS_GATEWAY_TOKEN: Optional[str] = None
+    SMS_SENDER: Optional[str] = None
+    SMS_TIMEOUT_SECONDS: float = 10
+    SMS_CONCURRENCY: int = 4
+
+    # Printable invitation cards (app/cards.py) are rendered in a pool of
+    # CARD_RENDER_WORKERS processes per API process, started on first use,
+    # CARD_RENDER_BATCH_SIZE cards per task.
+    CARD_RENDER_WORKERS: int = 2
+    CARD_RENDER_BATCH_SIZE: int = 25
+
+    # How long an Idempotency-Key on POST /api/rsvp/submit is remembered.
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+
     CORS_ORIGINS: list[str] = [
         "http://localhost:5173",
         "http://localhost:5174",
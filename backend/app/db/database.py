@@ -1,16 +1,151 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import time
+import uuid
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from typing import AsyncGenerator, AsyncIterator, Optional, Sequence
 
-from app.config import settings
+from sqlalchemy import Executable, Row, event, text
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-)
+from app.config import Settings, settings
+from app.metrics import DB_POOL_TIMEOUTS, DB_POOL_WAIT
+from .instrumentation import instrument_engine
+
+
+PRIMARY = "primary"
+REPLICA = "replica"
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    target = PRIMARY
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait = DB_POOL_WAIT.labels(self.target)
+        self._timeouts = DB_POOL_TIMEOUTS.labels(self.target)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self._timeouts.inc()
+            raise
+        finally:
+            self._wait.observe(time.perf_counter() - started)
+
+
+class ReplicaPool(InstrumentedPool):
+    """``InstrumentedPool`` for the ``DATABASE_READ_URL`` engine, labelled ``pool="replica"``."""
+
+    target = REPLICA
+
+
+def _pgbouncer_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def _connect_args(config: Settings, read_only: bool = False) -> dict:
+    if config.DB_PGBOUNCER:
+        return {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": _pgbouncer_statement_name,
+            "command_timeout": config.DB_COMMAND_TIMEOUT_SECONDS,
+        }
+    args = {
+        "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        "command_timeout": config.DB_COMMAND_TIMEOUT_SECONDS,
+    }
+    if read_only:
+        args["server_settings"] = {"default_transaction_read_only": "on"}
+    return args
+
+
+def _ping_idle_connections(engine: AsyncEngine, idle_seconds: float) -> None:
+    """Pre-ping only connections that sat in the pool for ``idle_seconds`` or more."""
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def remember_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            dbapi_connection.ping()
+        except Exception as e:
+            # The pool discards this connection and checks out another.
+            raise DisconnectionError() from e
+
+
+def build_engine(config: Settings = settings, url: Optional[str] = None, read_only: bool = False) -> AsyncEngine:
+    """The application engine as configured by the ``DB_*`` settings.
+
+    ``read_only`` builds a ``DB_READ_*`` pool for the replica (see
+    ``get_read_db``): autocommit with read-only transactions by default, or
+    behind PgBouncer, which cannot pass that setting, explicit READ ONLY
+    transactions.
+    """
+    options = {}
+    if read_only:
+        options = (
+            {"execution_options": {"postgresql_readonly": True}} if config.DB_PGBOUNCER
+            else {"isolation_level": "AUTOCOMMIT"}
+        )
+    engine = create_async_engine(
+        url or config.DATABASE_URL,
+        echo=config.DEBUG,
+        poolclass=ReplicaPool if read_only else InstrumentedPool,
+        pool_size=config.DB_READ_POOL_SIZE if read_only else config.DB_POOL_SIZE,
+        max_overflow=config.DB_READ_MAX_OVERFLOW if read_only else config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=config.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=config.DB_POOL_PRE_PING == "always",
+        connect_args=_connect_args(config, read_only),
+        **options,
+    )
+    if config.DB_POOL_PRE_PING == "idle":
+        _ping_idle_connections(engine, config.DB_POOL_PRE_PING_IDLE_SECONDS)
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int, prime: Sequence[Executable] = ()) -> None:
+    """Open ``connections`` pooled connections at once and run ``prime`` on each.
+
+    Holding them all together forces the pool to create that many; on return
+    they stay in the pool for the first requests. asyncpg introspects each
+    non-builtin column type (our enums) on a connection's first query that
+    returns it, so priming with a query over those columns moves that cost
+    out of the first requests.
+    """
+    prime = list(prime) or [text("SELECT 1")]
+
+    async def run(connection):
+        for statement in prime:
+            await connection.execute(statement)
+
+    results = await asyncio.gather(*(engine.connect() for _ in range(connections)), return_exceptions=True)
+    opened = [result for result in results if not isinstance(result, BaseException)]
+    try:
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        await asyncio.gather(*(run(connection) for connection in opened))
+    finally:
+        for connection in opened:
+            await connection.close()
+
+
+engine = build_engine()
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -22,6 +157,95 @@ async_session_maker = async_sessionmaker(
 
 Base = declarative_base()
 
+# Seconds the server is behind its primary; 0 on a primary, and on a replica
+# that has replayed everything it received (replay timestamps only move when
+# the primary writes, so an idle primary would otherwise look like lag).
+REPLICA_LAG = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def _read_session_maker(engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+
+class ReadRouter:
+    """Hands out read-only sessions: on the replica while it keeps up, else on the primary.
+
+    ``primary`` should open READ ONLY transactions; ``read_only_engine``
+    makes one that shares a pool with a read-write engine.
+
+    ``check`` measures the replica's lag and is run every
+    ``DB_REPLICA_CHECK_SECONDS`` by ``monitor_forever``; until a check
+    succeeds, and after a connection error on a replica session, reads go to
+    the primary.
+    """
+
+    def __init__(self, primary: AsyncEngine, replica: Optional[AsyncEngine] = None):
+        self.engines = {PRIMARY: primary, **({REPLICA: replica} if replica is not None else {})}
+        self._makers = {target: _read_session_maker(engine) for target, engine in self.engines.items()}
+        self.replica_healthy = False
+        self.lag: Optional[float] = None
+        self.sessions = {target: 0 for target in self.engines}
+
+    @property
+    def target(self) -> str:
+        return REPLICA if self.replica_healthy else PRIMARY
+
+    def session(self) -> AsyncSession:
+        target = self.target
+        self.sessions[target] += 1
+        session = self._makers[target]()
+        session.info["read_target"] = target
+        return session
+
+    def _set_healthy(self, healthy: bool, reason: str) -> None:
+        if healthy != self.replica_healthy:
+            print(f"Read replica {'in use' if healthy else 'bypassed, reading from the primary'}: {reason}")
+        self.replica_healthy = healthy
+
+    async def _measure_lag(self) -> Optional[float]:
+        async with self._makers[REPLICA]() as session:
+            lag = (await session.execute(REPLICA_LAG)).scalar_one()
+        return None if lag is None else float(lag)
+
+    async def check(self) -> bool:
+        """Measure the replica's lag and route reads accordingly; False while it is not used."""
+        if REPLICA not in self.engines:
+            return False
+        try:
+            self.lag = await asyncio.wait_for(self._measure_lag(), settings.DB_REPLICA_CHECK_SECONDS)
+        except Exception as e:
+            self.lag = None
+            self._set_healthy(False, f"unreachable: {e!r}")
+            return False
+        if self.lag is None:
+            self._set_healthy(False, "nothing replayed yet")
+        else:
+            self._set_healthy(self.lag <= settings.DB_REPLICA_MAX_LAG_SECONDS, f"{self.lag:.1f}s behind")
+        return self.replica_healthy
+
+    def replica_failed(self, error: BaseException) -> None:
+        """A replica session lost its connection: read from the primary until the next good check."""
+        self._set_healthy(False, f"connection error: {error!r}")
+
+    async def monitor_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.check()
+
+
+def read_only_engine(engine: AsyncEngine) -> AsyncEngine:
+    """``engine``'s pool, with every transaction opened as READ ONLY."""
+    return engine.execution_options(postgresql_readonly=True)
+
+
+read_router = ReadRouter(
+    read_only_engine(engine),
+    build_engine(url=settings.DATABASE_READ_URL, read_only=True) if settings.DATABASE_READ_URL else None,
+)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
@@ -33,3 +257,37 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Read-only session for endpoints that never write, from ``read_router``.
+
+    On the primary it runs one READ ONLY transaction in the main pool and is
+    rolled back, never committed. On the replica each statement runs in its
+    own read-only transaction (autocommit), saving the BEGIN and COMMIT round
+    trips, so statements do not share a snapshot. Either way a stray write
+    fails instead of landing. Reads that fill a cache must not come from a
+    lagging replica and use ``get_db``, as do endpoints that need a
+    server-side cursor.
+    """
+    session = read_router.session()
+    try:
+        yield session
+    except (OperationalError, InterfaceError, OSError) as e:
+        if session.info["read_target"] == REPLICA:
+            read_router.replica_failed(e)
+        raise
+    finally:
+        await session.close()
+
+
+async def stream_rows(statement: Executable, chunk_size: int = 500) -> AsyncIterator[Sequence[Row]]:
+    """Yield the rows of ``statement`` in chunks from a server-side cursor.
+
+    Uses its own session: request-scoped ``get_db`` sessions are closed before
+    a StreamingResponse starts sending, so generators must not borrow them.
+    """
+    async with async_session_maker() as session:
+        result = await session.stream(statement.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions(chunk_size):
+            yield rows
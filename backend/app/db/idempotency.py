@@ -0,0 +1,70 @@
+"""Idempotency keys for retry-safe writes.
+
+A client sends an ``Idempotency-Key`` header with a write; the first request
+claims the key in its own transaction together with the response to replay,
+so the claim only becomes visible if the write commits. A retry with the same
+key and body gets the stored response instead of repeating the write, and a
+concurrent duplicate waits on the key's primary key until the first request
+has committed or rolled back. Keys expire after ``IDEMPOTENCY_KEY_TTL_HOURS``.
+"""
+import hashlib
+from datetime import timedelta
+from typing import Optional
+
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used with a different request body."""
+
+
+def request_fingerprint(payload: BaseModel) -> str:
+    return hashlib.sha256(payload.model_dump_json().encode("utf-8")).hexdigest()
+
+
+async def claim_idempotency_key(
+    db: AsyncSession,
+    scope: str,
+    key: str,
+    request_hash: str,
+    response: dict,
+) -> Optional[dict]:
+    """Reserve ``key`` in the caller's transaction.
+
+    Returns None if the key is now ours (perform the write and commit), or the
+    stored response if the same request already succeeded. Raises
+    ``IdempotencyKeyReused`` if the key was used with another request.
+    """
+    insert = pg_insert(IdempotencyKey).values(
+        scope=scope, key=key, request_hash=request_hash, response=response,
+    )
+    expired = IdempotencyKey.created_at < func.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    claimed = await db.execute(
+        insert.on_conflict_do_update(
+            index_elements=[IdempotencyKey.scope, IdempotencyKey.key],
+            set_={
+                "request_hash": insert.excluded.request_hash,
+                "response": insert.excluded.response,
+                "created_at": func.now(),
+            },
+            where=expired,
+        ).returning(IdempotencyKey.key)
+    )
+    if claimed.first() is not None:
+        return None
+
+    stored = (await db.execute(
+        select(IdempotencyKey.request_hash, IdempotencyKey.response)
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+    )).one()
+    if stored.request_hash != request_hash:
+        raise IdempotencyKeyReused(key)
+    return stored.response
@@ -0,0 +1,154 @@
+"""Per-request SQL instrumentation.
+
+Engine event hooks attribute every statement to the ``QueryTracker`` of the
+current request (held in a context variable, so concurrent requests never
+mix), which counts statements and sums their database time:
+
+* ``QueryTimingMiddleware`` reports both in a ``Server-Timing`` header
+  (``db;desc="3 queries";dur=4.2``) and logs a warning when one request ran
+  the same statement ``N_PLUS_ONE_THRESHOLD`` times or more -- usually a
+  query inside a loop;
+* statements slower than ``SLOW_QUERY_MS`` are logged as one JSON line on the
+  ``app.sql`` logger, with parameter values redacted (only their types are
+  kept), whether or not they ran in a request;
+* ``assert_max_queries`` fails when a block runs more statements than its
+  budget (see ``benchmarks.query_budgets``).
+"""
+import contextlib
+import contextvars
+import json
+import logging
+import time
+from collections import Counter
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger("app.sql")
+
+_MAX_LOGGED_STATEMENT = 2000
+
+
+class QueryTracker:
+    """Statements run in one request (or ``track_queries`` block)."""
+
+    def __init__(self, parent: Optional["QueryTracker"] = None):
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        tracker = self
+        while tracker is not None:
+            tracker.count += 1
+            tracker.seconds += seconds
+            tracker.statements[statement] += 1
+            tracker = tracker.parent
+
+    def most_repeated(self) -> tuple[Optional[str], int]:
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+    def server_timing(self) -> str:
+        return f'db;desc="{self.count} queries";dur={self.seconds * 1000:.1f}'
+
+
+_current: contextvars.ContextVar[Optional[QueryTracker]] = contextvars.ContextVar("query_tracker", default=None)
+
+
+@contextlib.contextmanager
+def track_queries() -> Iterator[QueryTracker]:
+    """Attribute statements run by this task (and tasks it starts) to a new tracker.
+
+    Nested trackers also count towards the enclosing ones.
+    """
+    tracker = QueryTracker(parent=_current.get())
+    token = _current.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryTracker]:
+    """Fail with ``AssertionError`` if the block runs more than ``max_queries`` statements."""
+    with track_queries() as tracker:
+        yield tracker
+    if tracker.count > max_queries:
+        statements = "\n".join(f"  {n} x {sql}" for sql, n in tracker.statements.most_common())
+        raise AssertionError(f"expected at most {max_queries} queries, ran {tracker.count}:\n{statements}")
+
+
+def _redacted(parameters) -> object:
+    """The shape of ``parameters`` with each value replaced by its type name."""
+    if isinstance(parameters, dict):
+        return {key: _redacted(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redacted(value) for value in parameters]
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - context._query_started
+    tracker = _current.get()
+    if tracker is not None:
+        tracker.record(statement, seconds)
+    if settings.SLOW_QUERY_MS and seconds * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(seconds * 1000, 1),
+            "statement": statement[:_MAX_LOGGED_STATEMENT],
+            # Only the first row of an executemany; the rest have the same shape.
+            "parameters": _redacted(parameters[0] if executemany and parameters else parameters),
+            "executemany": executemany,
+        }, ensure_ascii=False))
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Install the hooks on a (sync) engine; pass ``async_engine.sync_engine``."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryTimingMiddleware:
+    """Tracks each HTTP request's statements; adds ``Server-Timing`` and N+1 warnings."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as tracker:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", tracker.server_timing().encode("ascii")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+        statement, repeats = tracker.most_repeated()
+        if repeats >= settings.N_PLUS_ONE_THRESHOLD:
+            route = scope.get("route")
+            logger.warning(json.dumps({
+                "event": "n_plus_one",
+                "method": scope["method"],
+                "route": getattr(route, "path", scope["path"]),
+                "repeats": repeats,
+                "queries": tracker.count,
+                "statement": statement[:_MAX_LOGGED_STATEMENT],
+            }, ensure_ascii=False))
@@ -5,12 +5,12 @@ import string
 from datetime import datetime
 
 from sqlalchemy import (
-    Column, String, Boolean, Integer, Text, DateTime,
-    ForeignKey, Enum as SQLEnum, Index,
+    Column, String, Boolean, Integer, BigInteger, Text, DateTime,
+    ForeignKey, Enum as SQLEnum, Index, Computed, Identity, LargeBinary,
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.sql import func, text
 
 from .database import Base
 
@@ -27,6 +27,32 @@ class RSVPStatus(str, enum.Enum):
     NOT_ATTENDING = "not_attending"
 
 
+class NotificationKind(str, enum.Enum):
+    INVITATION = "invitation"
+    REMINDER = "reminder"
+
+
+class NotificationChannel(str, enum.Enum):
+    EMAIL = "email"
+    SMS = "sms"
+
+
+class NotificationStatus(str, enum.Enum):
+    QUEUED = "queued"
+    SENDING = "sending"
+    SENT = "sent"
+    # Given up on: a permanent delivery error or too many attempts.
+    DEAD = "dead"
+    # A reminder whose guest answered before it went out.
+    CANCELLED = "cancelled"
+
+
+# Immutable SQL function (created by migration) that lowercases, strips Latin
+# accents and Arabic diacritics/tatweel, and folds Arabic letter variants, so
+# "Hélène", "helene" and "HELENE" (or "أحمد" / "احمد") normalise identically.
+SEARCH_NORMALIZE_FUNCTION = "wedding_search_normalize"
+
+
 def generate_rsvp_code() -> str:
     alphabet = string.ascii_uppercase + string.digits
     return "".join(secrets.choice(alphabet) for _ in range(8))
@@ -40,6 +66,8 @@ class User(Base):
     password_hash = Column(String(255), nullable=False)
     name = Column(String(255), nullable=False)
     language = Column(SQLEnum(Language), nullable=False, default=Language.FR)
+    # Embedded in issued JWTs as "tv"; bumping it revokes every outstanding token.
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -48,6 +76,22 @@ class User(Base):
         return f"<User {self.email}>"
 
 
+class Party(Base):
+    """A household invited together: one RSVP code answers for all its guests."""
+
+    __tablename__ = "parties"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(255), nullable=False)
+    rsvp_code = Column(String(8), unique=True, nullable=False, default=generate_rsvp_code, index=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<Party {self.name}>"
+
+
 class Guest(Base):
     __tablename__ = "guests"
 
@@ -58,6 +102,8 @@ class Guest(Base):
     email = Column(String(255), nullable=True)
     phone = Column(String(50), nullable=True)
     group_name = Column(String(255), nullable=True, index=True)
+    # The guest's household; their own rsvp_code keeps working and answers for it.
+    party_id = Column(UUID(as_uuid=True), ForeignKey("parties.id", ondelete="SET NULL"), nullable=True, index=True)
 
     rsvp_code = Column(String(8), unique=True, nullable=False, default=generate_rsvp_code, index=True)
     rsvp_status = Column(SQLEnum(RSVPStatus), nullable=False, default=RSVPStatus.PENDING, index=True)
@@ -73,19 +119,39 @@ class Guest(Base):
     table_number = Column(Integer, nullable=True)
     notes = Column(Text, nullable=True)
 
+    # Normalised "first last email" haystack for index-backed search.
+    search_text = deferred(Column(
+        Text,
+        Computed(
+            f"{SEARCH_NORMALIZE_FUNCTION}("
+            "first_name || ' ' || last_name || ' ' || coalesce(email, ''))",
+            persisted=True,
+        ),
+    ))
+
     responded_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     __table_args__ = (
-        Index("idx_guest_name", "last_name", "first_name"),
+        Index("idx_guest_name", "last_name", "first_name", "id"),
         Index("idx_guest_rsvp_status", "rsvp_status"),
+        Index(
+            "idx_guest_search_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
     )
 
     def __repr__(self):
         return f"<Guest {self.first_name} {self.last_name}>"
 
 
+# Every guest column except the deferred search_text, for Core selects and RETURNING.
+GUEST_COLUMNS = tuple(c for c in Guest.__table__.columns if c.key != "search_text")
+
+
 class Event(Base):
     __tablename__ = "events"
 
@@ -114,3 +180,142 @@ class Event(Base):
 
     def __repr__(self):
         return f"<Event {self.title_en}>"
+
+
+class GuestStatsCounter(Base):
+    """Single-row running RSVP totals, kept in step with every guest write."""
+
+    __tablename__ = "guest_stats"
+
+    id = Column(Integer, primary_key=True, default=1)
+
+    total = Column(Integer, nullable=False, server_default="0")
+    attending = Column(Integer, nullable=False, server_default="0")
+    not_attending = Column(Integer, nullable=False, server_default="0")
+    pending = Column(Integer, nullable=False, server_default="0")
+    plus_ones = Column(Integer, nullable=False, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<GuestStatsCounter total={self.total}>"
+
+
+class RSVPResponseLog(Base):
+    """One answer submitted through the public RSVP form; rows are never updated.
+
+    ``guest_id`` is deliberately not a foreign key: the history outlives the guest.
+    """
+
+    __tablename__ = "rsvp_responses"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    guest_id = Column(UUID(as_uuid=True), nullable=False)
+    source = Column(String(20), nullable=False)
+
+    old_status = Column(SQLEnum(RSVPStatus), nullable=False)
+    new_status = Column(SQLEnum(RSVPStatus), nullable=False)
+    plus_one_attending = Column(Boolean, nullable=False)
+    dietary_restrictions = Column(Text, nullable=True)
+    message = Column(Text, nullable=True)
+
+    responded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_rsvp_response_time", "responded_at"),
+        Index("idx_rsvp_response_guest", "guest_id", "responded_at"),
+    )
+
+    def __repr__(self):
+        return f"<RSVPResponseLog {self.guest_id} {self.old_status}->{self.new_status}>"
+
+
+class RSVPResponseRollup(Base):
+    """Responses per UTC hour and status transition, folded from ``rsvp_responses``."""
+
+    __tablename__ = "rsvp_response_rollups"
+
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    old_status = Column(SQLEnum(RSVPStatus), primary_key=True)
+    new_status = Column(SQLEnum(RSVPStatus), primary_key=True)
+    responses = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<RSVPResponseRollup {self.bucket} {self.old_status}->{self.new_status}={self.responses}>"
+
+
+class Notification(Base):
+    """An invitation or reminder to one guest over one channel: a job of the dispatch queue.
+
+    Workers claim due jobs (``status`` queued, or sending with an expired
+    lease) with ``FOR UPDATE SKIP LOCKED``; ``next_attempt_at`` is both the
+    retry time and the lease expiry. See ``app.dispatch``.
+    """
+
+    __tablename__ = "notifications"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    guest_id = Column(UUID(as_uuid=True), ForeignKey("guests.id", ondelete="CASCADE"), nullable=False)
+
+    kind = Column(SQLEnum(NotificationKind), nullable=False)
+    channel = Column(SQLEnum(NotificationChannel), nullable=False)
+    # Email address or phone number, as it was when the job was queued.
+    recipient = Column(String(255), nullable=False)
+
+    status = Column(SQLEnum(NotificationStatus), nullable=False, server_default="QUEUED")
+    attempts = Column(Integer, nullable=False, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("idx_notification_guest", "guest_id"),
+        Index(
+            "idx_notification_due", "next_attempt_at",
+            postgresql_where=text("status IN ('QUEUED', 'SENDING')"),
+        ),
+        # At most one pending job per guest, kind and channel: queuing twice is a no-op.
+        Index(
+            "idx_notification_pending", "guest_id", "kind", "channel", unique=True,
+            postgresql_where=text("status IN ('QUEUED', 'SENDING')"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Notification {self.kind} {self.channel} {self.status}>"
+
+
+class IdempotencyKey(Base):
+    """Replay record for a write made with an ``Idempotency-Key`` header."""
+
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String(50), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    response = Column(JSONB, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.scope}:{self.key}>"
+
+
+class InvitationCard(Base):
+    """A guest's last rendered printable invitation card (``app.cards``).
+
+    Reused as long as ``fingerprint`` -- a hash of the template version and
+    the guest fields printed on the card -- still matches.
+    """
+
+    __tablename__ = "invitation_cards"
+
+    guest_id = Column(UUID(as_uuid=True), ForeignKey("guests.id", ondelete="CASCADE"), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    content = Column(LargeBinary, nullable=False)
+    rendered_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<InvitationCard {self.guest_id} {self.fingerprint[:8]}>"
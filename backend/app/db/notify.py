@@ -0,0 +1,84 @@
+"""Postgres NOTIFY payloads for guest changes.
+
+Guest write paths publish one notification per changed guest on
+``GUEST_CHANNEL`` inside their own transaction, so listeners only hear about
+committed writes. The payload is small JSON::
+
+    {"op": "update", "id": "<uuid>", "code": "ABCD1234",
+     "before": ["PENDING", false], "after": ["ATTENDING", true], "origin": "<worker>"}
+
+``before`` / ``after`` are the ``(rsvp_status, plus_one_attending)`` tally of
+the old and new row (``null`` on create / delete), from which listeners
+derive the stats delta. Bulk writes send a single ``{"op": "import",
+"count": n}`` or ``{"op": "seating", "count": n}`` (table numbers only,
+stats unchanged). ``origin`` identifies the worker that made the change.
+"""
+import json
+import uuid
+from typing import Optional
+
+from sqlalchemy import Text, func, null, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import ColumnElement
+
+GUEST_CHANNEL = "guest_changes"
+WORKER_ID = uuid.uuid4().hex[:12]
+
+
+def _tally_json(tally: Optional[tuple[ColumnElement, ColumnElement]]) -> ColumnElement:
+    if tally is None:
+        return null()
+    rsvp_status, plus_one_attending = tally
+    return func.json_build_array(rsvp_status, plus_one_attending)
+
+
+def guest_notify_column(
+    op: str,
+    guest_id: ColumnElement,
+    rsvp_code: ColumnElement,
+    before: Optional[tuple[ColumnElement, ColumnElement]],
+    after: Optional[tuple[ColumnElement, ColumnElement]],
+) -> ColumnElement:
+    """``pg_notify(...)`` over a RETURNING CTE's columns, to add to its SELECT."""
+    payload = func.json_build_object(
+        "op", op,
+        "id", guest_id,
+        "code", rsvp_code,
+        "before", _tally_json(before),
+        "after", _tally_json(after),
+        "origin", WORKER_ID,
+    )
+    return func.pg_notify(GUEST_CHANNEL, payload.cast(Text)).label("notified")
+
+
+def _tally_value(tally):
+    return None if tally is None else [tally.rsvp_status.name, tally.plus_one_attending]
+
+
+async def notify_guest_change(
+    db: AsyncSession,
+    op: str,
+    guest_id,
+    rsvp_code: str,
+    before,
+    after,
+) -> None:
+    """Queue a notification in the caller's transaction (sent on commit).
+
+    ``before`` / ``after`` are ``GuestTally`` values or None.
+    """
+    payload = {
+        "op": op, "id": str(guest_id), "code": rsvp_code,
+        "before": _tally_value(before), "after": _tally_value(after), "origin": WORKER_ID,
+    }
+    await db.execute(select(func.pg_notify(GUEST_CHANNEL, json.dumps(payload))))
+
+
+async def notify_guests_imported(db: AsyncSession, count: int) -> None:
+    payload = {"op": "import", "count": count, "origin": WORKER_ID}
+    await db.execute(select(func.pg_notify(GUEST_CHANNEL, json.dumps(payload))))
+
+
+async def notify_guests_seated(db: AsyncSession, count: int) -> None:
+    payload = {"op": "seating", "count": count, "origin": WORKER_ID}
+    await db.execute(select(func.pg_notify(GUEST_CHANNEL, json.dumps(payload))))
@@ -0,0 +1,156 @@
+"""RSVP response history: an append-only log plus hourly rollups.
+
+The public RSVP endpoints build their write with
+``guest_update_statement(..., log_source=...)``, which appends one
+``rsvp_responses`` row per answered guest in the same statement. Nothing
+updates or deletes log rows.
+
+Analytics never scan the whole log. ``roll_up_responses`` folds each closed
+UTC hour that is not in ``rsvp_response_rollups`` yet, reading only the log
+rows after the last rolled-up hour (through the time index), and
+``response_counts`` charts the rollups plus the still open tail of the log,
+so loading the chart costs the same however long the history gets.
+
+A response committed more than ``RSVP_ROLLUP_GRACE_SECONDS`` after its hour
+was rolled up is missing from the rollups (not from the log); rebuild them
+with:
+
+    python -m app.db.responses rebuild
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import DateTime, cast, delete, func, insert, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import CTE
+
+from app.config import settings
+from .database import async_session_maker
+from .models import RSVPResponseLog, RSVPResponseRollup
+
+INTERVALS = ("hour", "day")
+
+_LOG_COLUMNS = (
+    "guest_id", "source", "old_status", "new_status",
+    "plus_one_attending", "dietary_restrictions", "message",
+)
+
+
+def response_log_cte(changed, source: str) -> CTE:
+    """``INSERT INTO rsvp_responses`` one row per guest in ``changed``.
+
+    ``changed`` is the ``changed_guest`` CTE of ``guest_update_statement``:
+    the new guest columns plus ``old_rsvp_status``.
+    """
+    return (
+        insert(RSVPResponseLog)
+        .from_select(_LOG_COLUMNS, select(
+            changed.c.id,
+            literal(source),
+            changed.c.old_rsvp_status,
+            changed.c.rsvp_status,
+            changed.c.plus_one_attending,
+            changed.c.dietary_restrictions,
+            changed.c.message,
+        ))
+        .cte("response_log")
+    )
+
+
+def _hour(timestamp):
+    return func.date_trunc("hour", timestamp, "UTC")
+
+
+def _rolled_until():
+    """Start of the first hour that is not in the rollups (``-infinity`` when there are none)."""
+    return func.coalesce(
+        select(func.max(RSVPResponseRollup.bucket) + timedelta(hours=1)).scalar_subquery(),
+        cast(literal("-infinity"), DateTime(timezone=True)),
+    )
+
+
+def _hourly_log_counts(*criteria):
+    bucket = _hour(RSVPResponseLog.responded_at).label("bucket")
+    return (
+        select(bucket, RSVPResponseLog.old_status, RSVPResponseLog.new_status, func.count().label("responses"))
+        .where(*criteria)
+        .group_by(bucket, RSVPResponseLog.old_status, RSVPResponseLog.new_status)
+    )
+
+
+async def roll_up_responses(db: AsyncSession) -> int:
+    """Fold the closed hours that are not rolled up yet; returns the rollup rows added.
+
+    Runs inside the caller's transaction. Concurrent callers compute the same
+    rows from the same log rows, so the loser's insert is simply skipped.
+    """
+    closed_before = _hour(func.now() - timedelta(seconds=settings.RSVP_ROLLUP_GRACE_SECONDS))
+    result = await db.execute(
+        pg_insert(RSVPResponseRollup)
+        .from_select(
+            ["bucket", "old_status", "new_status", "responses"],
+            _hourly_log_counts(
+                RSVPResponseLog.responded_at >= _rolled_until(),
+                RSVPResponseLog.responded_at < closed_before,
+            ),
+        )
+        .on_conflict_do_nothing()
+    )
+    return result.rowcount
+
+
+async def response_counts(
+    db: AsyncSession,
+    interval: str,
+    tz: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Responses per ``interval`` (an hour or a day in ``tz``) and status transition, oldest first.
+
+    Rolls up first, then reads the rollups and the open tail of the log in
+    one query. Only hours starting in ``[since, until)`` are counted; days
+    are built from UTC hours, so zones with a sub-hour offset are
+    approximate.
+    """
+    await roll_up_responses(db)
+    hourly = union_all(
+        select(
+            RSVPResponseRollup.bucket, RSVPResponseRollup.old_status,
+            RSVPResponseRollup.new_status, RSVPResponseRollup.responses,
+        ),
+        _hourly_log_counts(RSVPResponseLog.responded_at >= _rolled_until()),
+    ).subquery("hourly")
+    bucket = func.date_trunc(interval, hourly.c.bucket, tz).label("bucket")
+    query = (
+        select(bucket, hourly.c.old_status, hourly.c.new_status, func.sum(hourly.c.responses).label("responses"))
+        .group_by(bucket, hourly.c.old_status, hourly.c.new_status)
+        .order_by(bucket, hourly.c.old_status, hourly.c.new_status)
+    )
+    if since is not None:
+        query = query.where(hourly.c.bucket >= since)
+    if until is not None:
+        query = query.where(hourly.c.bucket < until)
+    return (await db.execute(query)).all()
+
+
+async def rebuild_rollups(db: AsyncSession) -> int:
+    """Drop the rollups and fold the whole log again; the caller commits."""
+    await db.execute(delete(RSVPResponseRollup))
+    return await roll_up_responses(db)
+
+
+async def _rebuild() -> None:
+    async with async_session_maker() as session:
+        rows = await rebuild_rollups(session)
+        await session.commit()
+    print(f"rsvp_response_rollups rebuilt: {rows} rows")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.db.responses rebuild")
+    asyncio.run(_rebuild())
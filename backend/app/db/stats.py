@@ -0,0 +1,252 @@
+"""RSVP statistics: one aggregate query plus incremental counters.
+
+Every guest write path either calls ``record_guest_change`` in its own
+transaction or is built with ``guest_update_statement`` /
+``guest_delete_statement``, which fold the counter update into the write
+itself, so the single ``guest_stats`` row stays in step with the guests
+table. Reads go
+through ``read_guest_stats``, which returns that row (one primary-key lookup)
+or falls back to a single ``count(*) FILTER (...)`` aggregate.
+
+If the counters ever drift (manual SQL, a restored dump, ...) repair them with:
+
+    python -m app.db.stats reconcile
+"""
+import asyncio
+import sys
+from typing import NamedTuple, Optional
+
+from sqlalchemy import Integer, Select, cast, delete, literal, select, update, func, text
+from sqlalchemy.sql.expression import ColumnElement, CTE
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from .database import async_session_maker
+from .models import GUEST_COLUMNS, Guest, GuestStatsCounter, RSVPStatus
+from .notify import guest_notify_column
+from .responses import response_log_cte
+
+STATS_ROW_ID = 1
+STATS_FIELDS = ("total", "attending", "not_attending", "pending", "plus_ones")
+
+_STATUS_FIELD = {
+    RSVPStatus.ATTENDING: "attending",
+    RSVPStatus.NOT_ATTENDING: "not_attending",
+    RSVPStatus.PENDING: "pending",
+}
+
+
+class GuestTally(NamedTuple):
+    """The part of a guest row that the stats depend on."""
+
+    rsvp_status: RSVPStatus
+    plus_one_attending: bool
+
+    @classmethod
+    def of(cls, guest: Guest) -> "GuestTally":
+        return cls(guest.rsvp_status, bool(guest.plus_one_attending))
+
+    def contribution(self) -> dict[str, int]:
+        counts = dict.fromkeys(STATS_FIELDS, 0)
+        counts["total"] = 1
+        counts[_STATUS_FIELD[self.rsvp_status]] = 1
+        if self.rsvp_status == RSVPStatus.ATTENDING and self.plus_one_attending:
+            counts["plus_ones"] = 1
+        return counts
+
+
+def tally_delta(before: Optional[GuestTally], after: Optional[GuestTally]) -> dict[str, int]:
+    """Counter changes for one guest going from ``before`` to ``after``.
+
+    ``None`` stands for "no row" (creation / deletion). Zero entries are omitted.
+    """
+    old = before.contribution() if before else {}
+    new = after.contribution() if after else {}
+    delta = {field: new.get(field, 0) - old.get(field, 0) for field in STATS_FIELDS}
+    return {field: value for field, value in delta.items() if value}
+
+
+def _aggregate_query():
+    attending = Guest.rsvp_status == RSVPStatus.ATTENDING
+    return select(
+        func.count().label("total"),
+        func.count().filter(attending).label("attending"),
+        func.count().filter(Guest.rsvp_status == RSVPStatus.NOT_ATTENDING).label("not_attending"),
+        func.count().filter(Guest.rsvp_status == RSVPStatus.PENDING).label("pending"),
+        func.count().filter(attending & Guest.plus_one_attending).label("plus_ones"),
+    )
+
+
+async def compute_guest_stats(db: AsyncSession) -> dict[str, int]:
+    """Aggregate the guests table in a single query."""
+    row = (await db.execute(_aggregate_query())).one()
+    return dict(row._mapping)
+
+
+async def read_guest_stats(db: AsyncSession) -> dict[str, int]:
+    if settings.GUEST_STATS_USE_COUNTERS:
+        result = await db.execute(
+            select(*(getattr(GuestStatsCounter, f) for f in STATS_FIELDS))
+            .where(GuestStatsCounter.id == STATS_ROW_ID)
+        )
+        row = result.one_or_none()
+        if row is not None:
+            return dict(row._mapping)
+    return await compute_guest_stats(db)
+
+
+async def apply_stats_delta(db: AsyncSession, delta: dict[str, int]) -> None:
+    """Add ``delta`` to the counters row inside the caller's transaction."""
+    if not delta:
+        return
+    await db.execute(
+        update(GuestStatsCounter)
+        .where(GuestStatsCounter.id == STATS_ROW_ID)
+        .values({field: getattr(GuestStatsCounter, field) + value for field, value in delta.items()})
+    )
+
+
+async def record_guest_change(
+    db: AsyncSession,
+    before: Optional[GuestTally],
+    after: Optional[GuestTally],
+) -> None:
+    await apply_stats_delta(db, tally_delta(before, after))
+
+
+def _contribution_sql(rsvp_status: ColumnElement, plus_one_attending: ColumnElement) -> dict[str, ColumnElement]:
+    """SQL counterpart of ``GuestTally.contribution`` over a row's columns."""
+    attending = rsvp_status == RSVPStatus.ATTENDING
+    return {
+        "total": literal(1),
+        "attending": cast(attending, Integer),
+        "not_attending": cast(rsvp_status == RSVPStatus.NOT_ATTENDING, Integer),
+        "pending": cast(rsvp_status == RSVPStatus.PENDING, Integer),
+        "plus_ones": cast(attending & plus_one_attending, Integer),
+    }
+
+
+def stats_change_cte(
+    changed: CTE,
+    before: Optional[tuple[ColumnElement, ColumnElement]],
+    after: Optional[tuple[ColumnElement, ColumnElement]],
+) -> CTE:
+    """Counters UPDATE for the rows of ``changed``, to run in the same statement.
+
+    ``changed`` is an ``UPDATE``/``DELETE ... RETURNING`` CTE; ``before`` and
+    ``after`` are its ``(rsvp_status, plus_one_attending)`` columns for the
+    old and new row version (``None`` for deletion / creation). Attach the
+    result with ``Select.add_cte`` so the guest write and the counter update
+    are a single round trip. Nothing is touched when ``changed`` is empty.
+    """
+    old = _contribution_sql(*before) if before else {}
+    new = _contribution_sql(*after) if after else {}
+    values = {}
+    for field in STATS_FIELDS:
+        if before and after and field == "total":
+            continue
+        delta = new.get(field, literal(0)) - old.get(field, literal(0))
+        values[field] = getattr(GuestStatsCounter, field) + (
+            select(func.coalesce(func.sum(delta), 0)).select_from(changed).scalar_subquery()
+        )
+    return (
+        update(GuestStatsCounter)
+        .where(GuestStatsCounter.id == STATS_ROW_ID, select(changed).exists())
+        .values(values)
+        .cte("stats_change")
+    )
+
+
+def guest_update_statement(criteria, values: dict, source=None, log_source: Optional[str] = None) -> Select:
+    """``UPDATE guests ... RETURNING`` that also adjusts the counters.
+
+    Locks the rows matching ``criteria``, applies ``values``, updates
+    ``guest_stats`` by the tally change and queues a change notification, all
+    in one statement. Selecting it yields the new version of each updated row
+    (``GUEST_COLUMNS`` plus the ``notified`` placeholder).
+
+    For per-guest values, pass a ``source`` selectable with one row per guest
+    keyed by its ``guest_id`` column; ``values`` may then refer to its columns.
+
+    With ``log_source`` (an RSVP submission), each updated guest's answer is
+    also appended to the ``rsvp_responses`` history log.
+    """
+    old = (
+        select(Guest.id, Guest.rsvp_status, Guest.plus_one_attending)
+        .where(*criteria)
+        .with_for_update()
+        .cte("old_guest")
+    )
+    changed = update(Guest).where(Guest.id == old.c.id)
+    if source is not None:
+        changed = changed.where(source.c.guest_id == Guest.id)
+    changed = (
+        changed
+        .values(values)
+        .returning(
+            *GUEST_COLUMNS,
+            old.c.rsvp_status.label("old_rsvp_status"),
+            old.c.plus_one_attending.label("old_plus_one_attending"),
+        )
+        .cte("changed_guest")
+    )
+    before = (changed.c.old_rsvp_status, changed.c.old_plus_one_attending)
+    after = (changed.c.rsvp_status, changed.c.plus_one_attending)
+    counters = stats_change_cte(changed, before=before, after=after)
+    statement = select(
+        *(changed.c[c.key] for c in GUEST_COLUMNS),
+        guest_notify_column("update", changed.c.id, changed.c.rsvp_code, before, after),
+    ).add_cte(counters)
+    if log_source is not None:
+        statement = statement.add_cte(response_log_cte(changed, log_source))
+    return statement
+
+
+def guest_delete_statement(criteria) -> Select:
+    """``DELETE FROM guests ... RETURNING`` that also adjusts the counters and notifies."""
+    deleted = (
+        delete(Guest)
+        .where(*criteria)
+        .returning(Guest.id, Guest.rsvp_code, Guest.rsvp_status, Guest.plus_one_attending)
+        .cte("deleted_guest")
+    )
+    before = (deleted.c.rsvp_status, deleted.c.plus_one_attending)
+    counters = stats_change_cte(deleted, before=before, after=None)
+    return select(
+        deleted.c.id,
+        deleted.c.rsvp_code,
+        guest_notify_column("delete", deleted.c.id, deleted.c.rsvp_code, before, None),
+    ).add_cte(counters)
+
+
+async def reconcile_guest_stats(db: AsyncSession) -> dict[str, int]:
+    """Recompute the counters row from the guests table.
+
+    Takes a SHARE lock on guests so no write can slip in between the
+    aggregate and the upsert; the caller commits.
+    """
+    await db.execute(text("LOCK TABLE guests IN SHARE MODE"))
+    stats = await compute_guest_stats(db)
+    await db.execute(
+        pg_insert(GuestStatsCounter)
+        .values(id=STATS_ROW_ID, **stats)
+        .on_conflict_do_update(
+            index_elements=[GuestStatsCounter.id],
+            set_={**stats, "updated_at": func.now()},
+        )
+    )
+    return stats
+
+
+async def _reconcile() -> None:
+    async with async_session_maker() as session:
+        stats = await reconcile_guest_stats(session)
+        await session.commit()
+    print("guest_stats reconciled: " + ", ".join(f"{k}={v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["reconcile"]:
+        sys.exit("usage: python -m app.db.stats reconcile")
+    asyncio.run(_reconcile())
@@ -0,0 +1,248 @@
+"""Invitation and reminder dispatch: a durable job queue in the notifications table.
+
+``enqueue_notifications`` turns a guest selection into jobs with one
+``INSERT ... SELECT`` -- queuing 2,000 invitations is a single short
+statement in the request, and queuing a guest who already has a pending job
+of the same kind and channel is a no-op. Delivery runs in the background, in
+``dispatcher``'s asyncio workers (``NOTIFICATION_WORKERS`` per process, in
+any number of processes):
+
+1. claim up to ``NOTIFICATION_BATCH_SIZE`` due jobs with one ``UPDATE``
+   (``FOR UPDATE SKIP LOCKED``) that leases them for
+   ``NOTIFICATION_LEASE_SECONDS`` and returns the guests' names, languages
+   and codes;
+2. render each message in its guest's language and send the batch through
+   the channel's transport, which caps concurrent connections;
+3. record all outcomes with one ``UPDATE ... FROM unnest(...)``: sent,
+   retried with exponential backoff, dead-lettered, or -- for a reminder to
+   a guest who has answered in the meantime -- cancelled.
+
+No database connection is held while messages are in flight, and the
+transports do their blocking I/O in their own threads, so API requests
+never wait on delivery.
+"""
+import asyncio
+import contextlib
+import random
+from collections import Counter, defaultdict
+from datetime import timedelta
+from typing import NamedTuple, Optional
+
+from sqlalchemy import BigInteger, Float, Integer, String, Text, bindparam, case, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.database import async_session_maker
+from app.db.models import (
+    Guest, Language, Notification, NotificationChannel, NotificationKind, NotificationStatus, RSVPStatus,
+)
+from app.messages import render
+from app.transports import DeliveryError, OutgoingMessage, get_transport
+
+PENDING_STATUSES = (NotificationStatus.QUEUED, NotificationStatus.SENDING)
+
+
+def recipient_column(channel: NotificationChannel):
+    return Guest.email if channel == NotificationChannel.EMAIL else Guest.phone
+
+
+async def enqueue_notifications(
+    db: AsyncSession,
+    kind: NotificationKind,
+    channel: NotificationChannel,
+    criteria: list,
+) -> int:
+    """Queue one job per guest matching ``criteria`` that has an address for ``channel``.
+
+    Reminders only go to guests who have not answered. Returns the number of
+    jobs queued; the caller commits.
+    """
+    recipient = recipient_column(channel)
+    criteria = [*criteria, recipient.is_not(None), recipient != ""]
+    if kind == NotificationKind.REMINDER:
+        criteria.append(Guest.rsvp_status == RSVPStatus.PENDING)
+    result = await db.execute(
+        pg_insert(Notification)
+        .from_select(
+            ["guest_id", "kind", "channel", "recipient"],
+            select(
+                Guest.id,
+                cast(literal(kind.name), Notification.kind.type),
+                cast(literal(channel.name), Notification.channel.type),
+                recipient,
+            ).where(*criteria),
+        )
+        .on_conflict_do_nothing()
+    )
+    return result.rowcount
+
+
+class ClaimedJob(NamedTuple):
+    id: int
+    kind: NotificationKind
+    channel: NotificationChannel
+    recipient: str
+    attempts: int
+    first_name: str
+    language: Language
+    rsvp_code: str
+    rsvp_status: RSVPStatus
+
+
+class Outcome(NamedTuple):
+    job: ClaimedJob
+    status: NotificationStatus
+    error: Optional[str] = None
+    retry_in: float = 0.0
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before attempt ``attempts + 1``: exponential, capped, with jitter."""
+    delay = min(
+        settings.NOTIFICATION_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.NOTIFICATION_RETRY_MAX_SECONDS,
+    )
+    return random.uniform(delay / 2, delay)
+
+
+def _failure(job: ClaimedJob, error: DeliveryError) -> Outcome:
+    if error.permanent or job.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+        return Outcome(job, NotificationStatus.DEAD, str(error))
+    return Outcome(job, NotificationStatus.QUEUED, str(error), retry_delay(job.attempts))
+
+
+async def claim_jobs(db: AsyncSession, limit: int) -> list[ClaimedJob]:
+    """Lease up to ``limit`` due jobs (oldest first) to this worker; the caller commits."""
+    due = (
+        select(Notification.id)
+        .where(Notification.status.in_(PENDING_STATUSES), Notification.next_attempt_at <= func.now())
+        .order_by(Notification.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    # Core UPDATE: the ORM would not map RETURNING columns from guests.
+    result = await db.execute(
+        update(Notification.__table__)
+        .where(Notification.id.in_(due.scalar_subquery()), Guest.id == Notification.guest_id)
+        .values(
+            status=NotificationStatus.SENDING,
+            attempts=Notification.attempts + 1,
+            next_attempt_at=func.now() + timedelta(seconds=settings.NOTIFICATION_LEASE_SECONDS),
+        )
+        .returning(
+            Notification.id, Notification.kind, Notification.channel, Notification.recipient,
+            Notification.attempts, Guest.first_name, Guest.language, Guest.rsvp_code, Guest.rsvp_status,
+        )
+    )
+    return [ClaimedJob(*row) for row in result]
+
+
+async def record_outcomes(db: AsyncSession, outcomes: list[Outcome]) -> None:
+    """Write every outcome in one statement; the caller commits.
+
+    A job whose lease ran out and was claimed again meanwhile (its
+    ``attempts`` moved on) is left to the newer claim.
+    """
+    columns = {
+        "id": (ARRAY(BigInteger), [o.job.id for o in outcomes]),
+        "attempts": (ARRAY(Integer), [o.job.attempts for o in outcomes]),
+        "status": (ARRAY(String), [o.status.name for o in outcomes]),
+        "error": (ARRAY(Text), [o.error for o in outcomes]),
+        "retry_in": (ARRAY(Float), [o.retry_in for o in outcomes]),
+    }
+    source = func.unnest(*(
+        bindparam(f"outcome_{name}", values, type_=type_) for name, (type_, values) in columns.items()
+    )).table_valued(*columns).render_derived(name="outcome")
+    await db.execute(
+        update(Notification)
+        .where(Notification.id == source.c.id, Notification.attempts == source.c.attempts)
+        .values(
+            status=cast(source.c.status, Notification.status.type),
+            last_error=source.c.error,
+            next_attempt_at=func.now() + source.c.retry_in * timedelta(seconds=1),
+            sent_at=case((source.c.status == NotificationStatus.SENT.name, func.now()), else_=Notification.sent_at),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def deliver(jobs: list[ClaimedJob]) -> list[Outcome]:
+    """Render and send ``jobs``, one concurrent batch per channel."""
+    outcomes = []
+    by_channel: dict[NotificationChannel, list[ClaimedJob]] = defaultdict(list)
+    for job in jobs:
+        if job.kind == NotificationKind.REMINDER and job.rsvp_status != RSVPStatus.PENDING:
+            outcomes.append(Outcome(job, NotificationStatus.CANCELLED))
+        else:
+            by_channel[job.channel].append(job)
+    for channel, channel_jobs in by_channel.items():
+        transport = get_transport(channel)
+        if transport is None:
+            error = DeliveryError(f"No transport configured for {channel.value}", permanent=True)
+            outcomes.extend(_failure(job, error) for job in channel_jobs)
+            continue
+        messages = [
+            OutgoingMessage(job.recipient, *render(job.kind, channel, job.language, job.first_name, job.rsvp_code))
+            for job in channel_jobs
+        ]
+        errors = await transport.send_many(messages)
+        outcomes.extend(
+            Outcome(job, NotificationStatus.SENT) if error is None else _failure(job, error)
+            for job, error in zip(channel_jobs, errors)
+        )
+    return outcomes
+
+
+class NotificationDispatcher:
+    """Background workers that drain the notification queue."""
+
+    def __init__(self):
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        # Outcomes since start, by status value, for /metrics.
+        self.outcomes: Counter = Counter()
+
+    def start(self, workers: int) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self) -> None:
+        """Look for due jobs now instead of at the next poll."""
+        self._wakeup.set()
+
+    async def run_once(self, limit: Optional[int] = None) -> int:
+        """Claim, send and record one batch; returns the number of jobs handled."""
+        async with async_session_maker() as session:
+            jobs = await claim_jobs(session, limit or settings.NOTIFICATION_BATCH_SIZE)
+            await session.commit()
+        if not jobs:
+            return 0
+        outcomes = await deliver(jobs)
+        async with async_session_maker() as session:
+            await record_outcomes(session, outcomes)
+            await session.commit()
+        self.outcomes.update(outcome.status.value for outcome in outcomes)
+        return len(jobs)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                handled = await self.run_once()
+            except Exception as e:
+                print(f"Notification dispatch failed: {e!r}")
+                handled = 0
+            if handled < settings.NOTIFICATION_BATCH_SIZE:
+                # Queue drained (or unreachable): wait for new jobs or the next retry.
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), settings.NOTIFICATION_POLL_SECONDS)
+
+
+dispatcher = NotificationDispatcher()
@@ -0,0 +1,27 @@
+"""orjson encoding for read endpoints that return Core rows directly.
+
+Handlers select exactly the columns of their response model and return
+``JSONRowsResponse([row._asdict() ...])``: no ORM identity map, no Pydantic
+validation of the result, one pass in C to bytes. The output matches the
+response models' JSON (UUIDs as strings, datetimes in ISO 8601).
+"""
+from uuid import UUID
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+def _default(value):
+    # asyncpg returns its own UUID subclass, which orjson does not pick up natively.
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class JSONRowsResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
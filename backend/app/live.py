@@ -0,0 +1,135 @@
+"""Live guest changes: one LISTEN connection per worker, fanned out in process.
+
+``guest_hub`` holds a dedicated asyncpg connection that LISTENs on
+``GUEST_CHANNEL`` and hands every notification to each subscriber's queue,
+so any number of dashboards cost one database connection per worker and
+nothing at all while no guest changes. The hub also keeps the current RSVP
+stats, read once when it starts listening and then advanced by each
+notification's delta, so subscribers never have to query them. Notifications
+from other workers evict the affected code from this worker's RSVP index.
+
+If the connection drops, the hub reconnects with backoff, re-reads the stats
+and sends subscribers a ``resync`` (they may have missed changes).
+"""
+import asyncio
+import contextlib
+import json
+from typing import Iterator, Optional
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+from app.db.database import async_session_maker, engine
+from app.db.models import RSVPStatus
+from app.db.notify import GUEST_CHANNEL, WORKER_ID
+from app.db.stats import GuestTally, read_guest_stats, tally_delta
+from app.rsvp_index import rsvp_index
+
+SUBSCRIBER_QUEUE_SIZE = 256
+RESYNC = {"op": "resync"}
+
+
+def _tally(value) -> Optional[GuestTally]:
+    return None if value is None else GuestTally(RSVPStatus[value[0]], bool(value[1]))
+
+
+def stats_delta(change: dict) -> dict[str, int]:
+    """Counter changes described by a guest notification."""
+    if change["op"] == "import":
+        return {"total": change["count"], "pending": change["count"]}
+    if change["op"] == "seating":
+        return {}
+    return tally_delta(_tally(change.get("before")), _tally(change.get("after")))
+
+
+class GuestChangeHub:
+    def __init__(self):
+        self._subscribers: set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Optional[dict[str, int]] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _publish(self, change: dict) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(change)
+            except asyncio.QueueFull:
+                # A stalled client: drop its backlog and make it reload.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+    def _on_notification(self, _connection, _pid, _channel, payload: str) -> None:
+        change = json.loads(payload)
+        if change.get("origin") != WORKER_ID and change.get("code"):
+            rsvp_index.invalidate(change["code"])
+        change["delta"] = stats_delta(change)
+        if self.stats is not None:
+            for field, value in change["delta"].items():
+                self.stats[field] += value
+        self._publish(change)
+
+    async def _run(self) -> None:
+        # Behind PgBouncer in transaction mode LISTEN needs a direct connection.
+        url = make_url(settings.DB_LISTEN_URL) if settings.DB_LISTEN_URL else engine.url
+        dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        backoff = 1.0
+        reconnecting = False
+        while True:
+            try:
+                connection = await asyncpg.connect(dsn)
+            except (OSError, asyncpg.PostgresError) as e:
+                print(f"Guest change listener could not connect: {e!r}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            backoff = 1.0
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _conn: closed.set())
+            try:
+                await connection.add_listener(GUEST_CHANNEL, self._on_notification)
+                async with async_session_maker() as session:
+                    self.stats = await read_guest_stats(session)
+                # Subscribers that joined while we were not listening may have missed changes.
+                self._publish(RESYNC)
+                if reconnecting and rsvp_index.loaded:
+                    await rsvp_index.reload()
+                await closed.wait()
+            except Exception as e:
+                print(f"Guest change listener failed: {e!r}")
+            finally:
+                self.stats = None
+                if not connection.is_closed():
+                    await connection.close()
+            # Changes may be missed until we listen again.
+            reconnecting = True
+            await asyncio.sleep(backoff)
+
+    @contextlib.contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue]:
+        """Queue receiving every guest change (with its ``delta``) while the block runs."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+
+guest_hub = GuestChangeHub()
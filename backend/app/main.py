@@ -1,15 +1,87 @@
-from fastapi import FastAPI
+import asyncio
+import time
+
+from fastapi import FastAPI, Response, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from prometheus_client.core import CounterMetricFamily
+from sqlalchemy import select
 
 from app.config import settings
-from app.api import auth, guests, events, rsvp
+from app.admission import AdmissionMiddleware, rsvp_admission
+from app.api import auth, guests, events, notifications, parties, rsvp
+from app.auth.passwords import shutdown_password_pool
+from app.cards import close_card_renderer
+from app.db.database import REPLICA, engine, read_router, warm_up_pool
+from app.db.instrumentation import QueryTimingMiddleware
+from app.db.models import GUEST_COLUMNS, User
+from app.dispatch import dispatcher
+from app.live import guest_hub
+from app.metrics import (
+    MetricsMiddleware, PoolCollector, ScrapedMetric, cache_collector, register_collector, render_metrics,
+)
+from app.rsvp_index import rsvp_index
+from app.transports import close_transports
+
+
+# Returns every enum-typed column, so asyncpg loads their codecs during warm-up.
+WARMUP_STATEMENTS = [select(*GUEST_COLUMNS).limit(0), select(User.language).limit(0)]
+
+
+async def _warm_up() -> bool:
+    """Open and prime the pool's connections; False if the database is unreachable."""
+    try:
+        if settings.DB_POOL_WARMUP:
+            started = time.perf_counter()
+            await warm_up_pool(engine, settings.DB_POOL_SIZE, WARMUP_STATEMENTS)
+            print(f"Database pool warmed: {settings.DB_POOL_SIZE} connections in {time.perf_counter() - started:.2f}s")
+        else:
+            await warm_up_pool(engine, 1)
+    except Exception as e:
+        print(f"Database pool warm-up failed: {e!r}")
+        return False
+    await _warm_up_read_pool()
+    return True
+
+
+async def _warm_up_read_pool() -> None:
+    """Prime the replica's pool if reads go there; best effort, reads work without it."""
+    if not settings.DB_POOL_WARMUP or not await read_router.check():
+        return
+    try:
+        await warm_up_pool(read_router.engines[REPLICA], settings.DB_READ_POOL_SIZE, WARMUP_STATEMENTS)
+    except Exception as e:
+        print(f"Replica pool warm-up failed: {e!r}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print(f"Starting Wedding App API v{settings.VERSION}")
+    app.state.ready = await _warm_up()
+    refresh_task = None
+    if settings.RSVP_INDEX_ENABLED:
+        try:
+            print(f"RSVP index loaded: {await rsvp_index.reload()} codes")
+        except Exception as e:
+            print(f"RSVP index not loaded, lookups will query the database: {e!r}")
+        refresh_task = asyncio.create_task(rsvp_index.refresh_forever(settings.RSVP_INDEX_REFRESH_SECONDS))
+    replica_task = None
+    if settings.DATABASE_READ_URL:
+        replica_task = asyncio.create_task(read_router.monitor_forever(settings.DB_REPLICA_CHECK_SECONDS))
+    guest_hub.start()
+    if settings.NOTIFICATIONS_ENABLED:
+        dispatcher.start(settings.NOTIFICATION_WORKERS)
     yield
+    await dispatcher.stop()
+    close_transports()
+    close_card_renderer()
+    await guest_hub.stop()
+    if refresh_task is not None:
+        refresh_task.cancel()
+    if replica_task is not None:
+        replica_task.cancel()
+    shutdown_password_pool()
     print("Shutting down Wedding App API")
 
 
@@ -23,17 +95,54 @@ app = FastAPI(
     openapi_url="/openapi.json" if settings.DEBUG else None,
 )
 
+# Added before CORS so that 429/503 rejections still carry CORS headers.
+app.add_middleware(AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[guests.NEXT_CURSOR_HEADER],
 )
 
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    app.add_middleware(QueryTimingMiddleware)
+
+if settings.METRICS_ENABLED:
+    # Outermost, so requests rejected by admission control are timed too.
+    app.add_middleware(MetricsMiddleware)
+    register_collector(PoolCollector(lambda: {target: pooled.pool for target, pooled in read_router.engines.items()}))
+    cache_collector.register("rsvp.index", rsvp_index)
+    register_collector(ScrapedMetric(
+        "rsvp_admission_rejected", "Public RSVP requests rejected by admission control.",
+        lambda: {(str(code),): count for code, count in rsvp_admission.rejected.items()},
+        labels=["status"], family=CounterMetricFamily,
+    ))
+    register_collector(ScrapedMetric(
+        "notifications_dispatched", "Notification jobs handled by this process's workers, by outcome.",
+        lambda: {(status,): count for status, count in dispatcher.outcomes.items()},
+        labels=["status"], family=CounterMetricFamily,
+    ))
+    register_collector(ScrapedMetric(
+        "db_read_sessions", "Read-only sessions handed out, by the database they read from.",
+        lambda: {(target,): count for target, count in read_router.sessions.items()},
+        labels=["target"], family=CounterMetricFamily,
+    ))
+    register_collector(ScrapedMetric(
+        "db_replica_lag_seconds", "Replication lag at the last replica check (NaN if unknown or no replica).",
+        lambda: float("nan") if read_router.lag is None else read_router.lag,
+    ))
+    register_collector(ScrapedMetric(
+        "live_subscribers", "Open GET /api/guests/live streams.", lambda: len(guest_hub),
+    ))
+
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(guests.router, prefix="/api/guests", tags=["Guests"])
 app.include_router(events.router, prefix="/api/events", tags=["Events"])
+app.include_router(parties.router, prefix="/api/parties", tags=["Parties"])
+app.include_router(notifications.router, prefix="/api/notifications", tags=["Notifications"])
 app.include_router(rsvp.router, prefix="/api/rsvp", tags=["RSVP"])
 
 
@@ -45,3 +154,25 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "version": settings.VERSION}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Ready once the pool is warm; retries the warm-up while it is not."""
+    if not app.state.ready:
+        app.state.ready = await _warm_up()
+    if not app.state.ready:
+        return JSONResponse({"status": "unavailable"}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    pool = engine.pool
+    return {
+        "status": "ready",
+        "pool": {"size": pool.size(), "checked_in": pool.checkedin(), "checked_out": pool.checkedout()},
+        "reads": read_router.target,
+    }
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
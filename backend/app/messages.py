@@ -0,0 +1,80 @@
+"""Invitation and reminder texts, in each guest's language.
+
+``render`` picks the template for a job's kind, channel and the guest's
+language and fills in the first name and the guest's RSVP link. Emails get
+a subject and a plain-text body, SMS one short body.
+"""
+from typing import NamedTuple, Optional
+
+from app.config import settings
+from app.db.models import Language, NotificationChannel, NotificationKind
+
+
+class RenderedMessage(NamedTuple):
+    subject: Optional[str]
+    body: str
+
+
+# (email subject, email body, SMS body) per kind and language.
+_TEMPLATES: dict[tuple[NotificationKind, Language], tuple[str, str, str]] = {
+    (NotificationKind.INVITATION, Language.FR): (
+        "Vous êtes invité(e) à notre mariage",
+        "Bonjour {first_name},\n\n"
+        "Nous avons la joie de vous inviter à notre mariage. Merci de nous "
+        "répondre ici :\n{link}\n\nVotre code RSVP : {code}\n",
+        "Bonjour {first_name}, vous êtes invité(e) à notre mariage ! Répondez ici : {link}",
+    ),
+    (NotificationKind.INVITATION, Language.EN): (
+        "You're invited to our wedding",
+        "Dear {first_name},\n\n"
+        "We would love you to join us for our wedding. Please let us know "
+        "whether you can come:\n{link}\n\nYour RSVP code: {code}\n",
+        "Dear {first_name}, you're invited to our wedding! Please RSVP: {link}",
+    ),
+    (NotificationKind.INVITATION, Language.AR): (
+        "دعوة لحضور حفل زفافنا",
+        "عزيزي/عزيزتي {first_name}،\n\n"
+        "يسعدنا دعوتكم لحضور حفل زفافنا. يرجى تأكيد حضوركم عبر الرابط:\n{link}\n\n"
+        "رمز الدعوة: {code}\n",
+        "{first_name}، يسعدنا دعوتكم لحفل زفافنا! أكدوا حضوركم: {link}",
+    ),
+    (NotificationKind.REMINDER, Language.FR): (
+        "Rappel : merci de répondre à notre invitation",
+        "Bonjour {first_name},\n\n"
+        "Nous n'avons pas encore reçu votre réponse. Pouvez-vous nous dire si "
+        "vous serez des nôtres ?\n{link}\n\nVotre code RSVP : {code}\n",
+        "Bonjour {first_name}, petit rappel : merci de répondre à notre invitation : {link}",
+    ),
+    (NotificationKind.REMINDER, Language.EN): (
+        "Reminder: please RSVP to our wedding",
+        "Dear {first_name},\n\n"
+        "We haven't heard back from you yet. Could you let us know whether "
+        "you can come?\n{link}\n\nYour RSVP code: {code}\n",
+        "Dear {first_name}, a quick reminder to RSVP to our wedding: {link}",
+    ),
+    (NotificationKind.REMINDER, Language.AR): (
+        "تذكير: يرجى تأكيد حضوركم",
+        "عزيزي/عزيزتي {first_name}،\n\n"
+        "لم نتلقَّ ردكم بعد. هل يمكنكم إخبارنا إن كنتم ستحضرون؟\n{link}\n\n"
+        "رمز الدعوة: {code}\n",
+        "{first_name}، تذكير بتأكيد حضوركم لحفل زفافنا: {link}",
+    ),
+}
+
+
+def rsvp_link(rsvp_code: str) -> str:
+    return f"{settings.PUBLIC_SITE_URL.rstrip('/')}/rsvp/{rsvp_code}"
+
+
+def render(
+    kind: NotificationKind,
+    channel: NotificationChannel,
+    language: Language,
+    first_name: str,
+    rsvp_code: str,
+) -> RenderedMessage:
+    subject, email_body, sms_body = _TEMPLATES[kind, language]
+    fields = {"first_name": first_name, "code": rsvp_code, "link": rsvp_link(rsvp_code)}
+    if channel == NotificationChannel.SMS:
+        return RenderedMessage(None, sms_body.format(**fields))
+    return RenderedMessage(subject, email_body.format(**fields))
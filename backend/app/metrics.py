@@ -0,0 +1,175 @@
+"""Prometheus metrics for this worker process, served at ``GET /metrics``.
+
+Request metrics are recorded by ``MetricsMiddleware``, labelled by route
+template (``/api/guests/{guest_id}``, never the raw path) so label sets stay
+bounded. Database pool wait time is observed by ``InstrumentedPool`` (see
+``app.db.database``); pool occupancy, cache hit ratios and the other gauges
+are read from their owners only when Prometheus scrapes, so they cost
+nothing per request.
+
+Metrics are per process, which matches one uvicorn worker per container. When
+running several workers behind one port, each scrape sees a single worker.
+"""
+import time
+from typing import Callable, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from app.cache import registered_caches
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to complete an HTTP request, by route template and status code.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.35, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served by this worker.",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the SQLAlchemy pool.",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts",
+    "Pool checkouts that gave up after the pool timeout.",
+    ["pool"],
+)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and tracks how many are in flight."""
+
+    def __init__(self, app):
+        self.app = app
+        # Resolved label children; avoids the registry lock on the hot path.
+        self._children: dict[tuple[str, str, int], Histogram] = {}
+
+    def _observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, status)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = REQUEST_DURATION.labels(method, route, str(status))
+        child.observe(seconds)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # The router stores the matched route in the shared scope.
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            self._observe(scope["method"], path, status, time.perf_counter() - started)
+
+
+class PoolCollector(Collector):
+    """Occupancy of each SQLAlchemy ``QueuePool``, labelled by ``pool``, read at scrape time."""
+
+    def __init__(self, pools_of: Callable[[], dict[str, object]]):
+        self._pools_of = pools_of
+
+    def collect(self):
+        families = {
+            "db_pool_size": ("Connections the pool keeps open.", lambda pool: pool.size()),
+            "db_pool_checked_out": ("Connections currently checked out.", lambda pool: pool.checkedout()),
+            "db_pool_checked_in": ("Idle connections in the pool.", lambda pool: pool.checkedin()),
+            "db_pool_overflow": (
+                "Connections open beyond pool_size (negative while below it).", lambda pool: pool.overflow(),
+            ),
+        }
+        pools = self._pools_of()
+        for name, (documentation, read) in families.items():
+            family = GaugeMetricFamily(name, documentation, labels=["pool"])
+            for label, pool in pools.items():
+                family.add_metric([label], read(pool))
+            yield family
+
+
+class CacheCollector(Collector):
+    """Hits, misses, size and hit ratio of every ``TTLCache`` and other named caches."""
+
+    def __init__(self):
+        self._extra: dict[str, object] = {}
+
+    def register(self, name: str, cache) -> None:
+        """Export ``cache`` (anything with ``hits``, ``misses`` and ``len()``) under ``name``."""
+        self._extra[name] = cache
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Cache lookups that found a live entry.", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache lookups that found nothing.", labels=["cache"])
+        entries = GaugeMetricFamily("cache_entries", "Entries currently held.", labels=["cache"])
+        ratio = GaugeMetricFamily("cache_hit_ratio", "hits / (hits + misses) since start.", labels=["cache"])
+        for name, cache in {**registered_caches(), **self._extra}.items():
+            lookups = cache.hits + cache.misses
+            hits.add_metric([name], cache.hits)
+            misses.add_metric([name], cache.misses)
+            entries.add_metric([name], len(cache))
+            ratio.add_metric([name], cache.hits / lookups if lookups else 0.0)
+        yield from (hits, misses, entries, ratio)
+
+
+class ScrapedMetric(Collector):
+    """A gauge or counter whose value is read from its owner at scrape time.
+
+    Without ``labels``, ``read()`` returns the value; with them, it returns a
+    dict of label-value tuples to values.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable,
+        labels: Optional[list[str]] = None,
+        family: type = GaugeMetricFamily,
+    ):
+        self._name = name
+        self._documentation = documentation
+        self._read = read
+        self._labels = labels
+        self._family = family
+
+    def collect(self):
+        if self._labels is None:
+            yield self._family(self._name, self._documentation, value=self._read())
+            return
+        family = self._family(self._name, self._documentation, labels=self._labels)
+        for labels, value in self._read().items():
+            family.add_metric(list(labels), value)
+        yield family
+
+
+cache_collector = CacheCollector()
+REGISTRY.register(cache_collector)
+
+
+def register_collector(collector: Collector) -> None:
+    REGISTRY.register(collector)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """The registry in Prometheus text format, with its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,254 @@
+"""In-memory index of RSVP codes for the public lookup and submit endpoints.
+
+Each worker keeps a dict of uppercased RSVP code -> ``GuestSnapshot`` that is
+loaded in the app's ``lifespan`` hook, so a lookup during an invitation surge
+is a dict access instead of a query. Guest and RSVP write paths update the
+index after they commit (write-through); codes that turn out not to exist are
+remembered in a short-lived negative cache so typos and scans don't reach the
+database either. The party lookup answers guests without a party from the
+index, and parties from a cache of their members' codes (``PartyEntry``)
+whose snapshots come from the index, so RSVPs never stale it; a party is
+forgotten when a guest joins or leaves it.
+
+Writes made by other workers evict the code here as soon as their change
+notification arrives (see ``app.live``); the next lookup then reads it from
+the database. Parties renamed, or joined by a guest, on another worker are
+seen within ``RSVP_PARTY_CACHE_TTL_SECONDS``. The periodic full reload every
+``RSVP_INDEX_REFRESH_SECONDS`` remains as a backstop.
+"""
+import asyncio
+from typing import Iterable, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from app.config import settings
+from app.db.database import async_session_maker
+from app.db.models import Guest, Language, RSVPStatus
+
+
+class GuestSnapshot(NamedTuple):
+    """The guest fields the public RSVP page needs."""
+
+    id: UUID
+    first_name: str
+    last_name: str
+    rsvp_status: RSVPStatus
+    plus_one_allowed: bool
+    plus_one_name: Optional[str]
+    plus_one_attending: bool
+    dietary_restrictions: Optional[str]
+    message: Optional[str]
+    language: Language
+    party_id: Optional[UUID]
+
+    @classmethod
+    def of(cls, guest) -> "GuestSnapshot":
+        """Snapshot of a Guest instance or a row carrying the same columns."""
+        return cls(*(getattr(guest, field) for field in cls._fields))
+
+
+class PartyEntry(NamedTuple):
+    """A party as the public party lookup shows it; ``id`` is None for a guest without a party."""
+
+    id: Optional[UUID]
+    name: str
+    rsvp_code: str
+    member_codes: tuple[str, ...]
+
+
+_SNAPSHOT_QUERY = select(Guest.rsvp_code, *(getattr(Guest, f) for f in GuestSnapshot._fields))
+
+
+class RSVPIndex:
+    def __init__(self):
+        self._by_code: Optional[dict[str, GuestSnapshot]] = None
+        # Changes written while a reload is in flight, re-applied on top of it.
+        self._pending: Optional[dict[str, Optional[GuestSnapshot]]] = None
+        self.hits = 0
+        self.misses = 0
+        self._unknown = TTLCache(
+            "rsvp.unknown_codes",
+            maxsize=settings.RSVP_NEGATIVE_CACHE_MAX_ENTRIES,
+            ttl=settings.RSVP_NEGATIVE_CACHE_TTL_SECONDS,
+        )
+        # Codes with no guest and no party, for the party endpoints: a party
+        # code is unknown to the per-guest lookup but valid there.
+        self._unknown_parties = TTLCache(
+            "rsvp.unknown_party_codes",
+            maxsize=settings.RSVP_NEGATIVE_CACHE_MAX_ENTRIES,
+            ttl=settings.RSVP_NEGATIVE_CACHE_TTL_SECONDS,
+        )
+        # Party code -> PartyEntry, and party id -> code to find a member's party.
+        self._parties = TTLCache(
+            "rsvp.parties",
+            maxsize=settings.RSVP_PARTY_CACHE_MAX_ENTRIES,
+            ttl=settings.RSVP_PARTY_CACHE_TTL_SECONDS,
+        )
+        self._party_codes: dict[UUID, str] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self._by_code is not None
+
+    def __len__(self) -> int:
+        return len(self._by_code or ())
+
+    async def reload(self) -> int:
+        """Replace the index with the current guests table; returns its size."""
+        self._pending = {}
+        try:
+            async with async_session_maker() as session:
+                rows = (await session.execute(_SNAPSHOT_QUERY)).all()
+            by_code = {row.rsvp_code: GuestSnapshot.of(row) for row in rows}
+            for code, snapshot in self._pending.items():
+                if snapshot is None:
+                    by_code.pop(code, None)
+                else:
+                    by_code[code] = snapshot
+        finally:
+            self._pending = None
+        self._by_code = by_code
+        self._unknown.clear()
+        self._unknown_parties.clear()
+        self._parties.clear()
+        self._party_codes.clear()
+        return len(by_code)
+
+    def _forget_party(self, party_id: Optional[UUID]) -> None:
+        code = self._party_codes.pop(party_id, None)
+        if code is not None:
+            self._parties.pop(code)
+
+    def _store(self, code: str, snapshot: Optional[GuestSnapshot]) -> None:
+        if self._pending is not None:
+            self._pending[code] = snapshot
+        if self._by_code is None:
+            return
+        old = self._by_code.get(code)
+        if old is None or snapshot is None or old.party_id != snapshot.party_id:
+            # The guest may have joined or left a party.
+            self._forget_party(old and old.party_id)
+            self._forget_party(snapshot and snapshot.party_id)
+        if snapshot is None:
+            self._by_code.pop(code, None)
+        else:
+            self._by_code[code] = snapshot
+
+    def put(self, guest) -> None:
+        """Record the committed state of ``guest``."""
+        self._unknown.pop(guest.rsvp_code)
+        self._unknown_parties.pop(guest.rsvp_code)
+        self._store(guest.rsvp_code, GuestSnapshot.of(guest))
+
+    def discard(self, rsvp_code: str) -> None:
+        """Forget a deleted guest's code."""
+        self._store(rsvp_code, None)
+
+    def invalidate(self, rsvp_code: str) -> None:
+        """Drop what this worker knows about ``rsvp_code`` (changed elsewhere).
+
+        The next lookup reads it from the database.
+        """
+        self._unknown.pop(rsvp_code)
+        self._unknown_parties.pop(rsvp_code)
+        self._store(rsvp_code, None)
+
+    def party_changed(self, rsvp_code: str, member_codes: Iterable[str] = ()) -> None:
+        """Forget a party created, renamed or deleted here, and the guests moved in or out.
+
+        Other workers forget a new party's code was unknown within
+        ``RSVP_NEGATIVE_CACHE_TTL_SECONDS``; party codes are freshly
+        generated, so they have rarely been tried.
+        """
+        self._unknown_parties.pop(rsvp_code)
+        self._parties.pop(rsvp_code)
+        for code in member_codes:
+            self.invalidate(code)
+
+    def is_known_missing(self, rsvp_code: str) -> bool:
+        return self._unknown.get(rsvp_code.upper(), False)
+
+    def mark_missing(self, rsvp_code: str) -> None:
+        self._unknown.set(rsvp_code.upper(), True)
+
+    def is_unknown_party(self, rsvp_code: str) -> bool:
+        return self._unknown_parties.get(rsvp_code.upper(), False)
+
+    def mark_unknown_party(self, rsvp_code: str) -> None:
+        self._unknown_parties.set(rsvp_code.upper(), True)
+
+    async def lookup(self, db: AsyncSession, rsvp_code: str) -> Optional[GuestSnapshot]:
+        """Snapshot for ``rsvp_code`` (any case), or None if no guest has it."""
+        code = rsvp_code.upper()
+        if self._by_code is not None:
+            snapshot = self._by_code.get(code)
+            if snapshot is not None:
+                self.hits += 1
+                return snapshot
+        self.misses += 1
+        if self._unknown.get(code, False):
+            return None
+
+        row = (await db.execute(_SNAPSHOT_QUERY.where(Guest.rsvp_code == code))).one_or_none()
+        if row is None:
+            self._unknown.set(code, True)
+            return None
+        snapshot = GuestSnapshot.of(row)
+        if self._by_code is not None and code not in self._by_code:
+            # A write-through that landed while we were querying is newer.
+            self._store(code, snapshot)
+        return snapshot
+
+    def party(self, rsvp_code: str) -> Optional[tuple[PartyEntry, list[GuestSnapshot]]]:
+        """The party invited under ``rsvp_code`` (uppercased) and its members, or None if not known here."""
+        if self._by_code is None:
+            return None
+        guest = self._by_code.get(rsvp_code)
+        if guest is not None and guest.party_id is None:
+            return PartyEntry(None, f"{guest.first_name} {guest.last_name}", rsvp_code, (rsvp_code,)), [guest]
+        party_code = rsvp_code if guest is None else self._party_codes.get(guest.party_id)
+        party = self._parties.get(party_code) if party_code is not None else None
+        if party is None:
+            return None
+        members = [self._by_code.get(code) for code in party.member_codes]
+        if any(member is None or member.party_id != party.id for member in members):
+            # A member was changed elsewhere and evicted; read the party again.
+            return None
+        return party, members
+
+    def store_party(self, rsvp_code: str, rows) -> tuple[PartyEntry, list[GuestSnapshot]]:
+        """Remember a party read from the database and return it as ``party()`` does.
+
+        ``rows`` are its members, carrying ``GuestSnapshot``'s fields,
+        ``rsvp_code``, ``party_name`` and ``party_code``.
+        """
+        members = [GuestSnapshot.of(row) for row in rows]
+        first = rows[0]
+        if first.party_id is None:
+            party = PartyEntry(None, f"{first.first_name} {first.last_name}", rsvp_code, (rsvp_code,))
+        else:
+            party = PartyEntry(first.party_id, first.party_name, first.party_code, tuple(row.rsvp_code for row in rows))
+        if self._by_code is None:
+            return party, members
+        for row, member in zip(rows, members):
+            if row.rsvp_code not in self._by_code:
+                self._store(row.rsvp_code, member)
+        if party.id is not None:
+            self._party_codes[party.id] = party.rsvp_code
+            self._parties.set(party.rsvp_code, party)
+        return party, members
+
+    async def refresh_forever(self, interval: float) -> None:
+        """Reload every ``interval`` seconds; errors are reported and retried."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                print(f"RSVP index refresh failed: {e!r}")
+
+
+rsvp_index = RSVPIndex()
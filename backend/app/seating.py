@@ -0,0 +1,222 @@
+"""Seating plan solver: assigns attending guests to tables.
+
+Guests are seated by party: everyone sharing a ``group_name`` (a family, a
+group of friends) is one unit, kept at one table, needing one seat per guest
+plus one per attending plus-one. ``solve_seating``
+
+1. seats pinned guests at their table -- pins always win, even over capacity;
+   the unpinned members of a partly pinned group try to join them first;
+2. places the other units largest first, each at the fullest table that still
+   has room for it and seats none of the guests it must be kept apart from
+   (best fit keeps whole tables free for the large families that come later);
+3. repairs a unit that fits nowhere by moving one seated unit from a table to
+   another table with room, freeing enough seats;
+4. as a last resort splits a group that cannot sit together (larger than any
+   table, or no table has room left for all of it) across tables guest by
+   guest, and reports it in ``SeatingPlan.warnings``.
+
+It runs in memory over the attending guests only -- a few milliseconds for a
+thousand guests (see ``benchmarks.bench_seating``).
+"""
+from collections import defaultdict
+from typing import Hashable, Iterable, NamedTuple, Optional
+
+
+class SeatingGuest(NamedTuple):
+    """An attending guest, as the solver sees them."""
+
+    id: Hashable
+    name: str
+    group_name: Optional[str] = None
+    seats: int = 1
+    pinned_table: Optional[int] = None
+
+
+class SeatingPlan(NamedTuple):
+    assignments: dict[Hashable, int]
+    unseated: list[Hashable]
+    warnings: list[str]
+
+
+class _Unit:
+    """Guests that should sit at the same table."""
+
+    def __init__(self, label: str, members: list[SeatingGuest], partners: dict[Hashable, set], pinned=None, preferred=None):
+        self.label = label
+        self.members = members
+        self.seats = sum(guest.seats for guest in members)
+        self.pinned = pinned
+        self.preferred = preferred
+        self.avoid = set().union(*(partners.get(guest.id, ()) for guest in members))
+
+    def split(self, partners: dict[Hashable, set]) -> list["_Unit"]:
+        return [_Unit(guest.name, [guest], partners, preferred=self.preferred) for guest in self.members]
+
+
+class _Table:
+    def __init__(self, number: int, capacity: int):
+        self.number = number
+        self.capacity = capacity
+        self.used = 0
+        self.guests: set = set()
+        self.units: list[_Unit] = []
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.used
+
+    def fits(self, unit: _Unit) -> bool:
+        return unit.seats <= self.free and self.guests.isdisjoint(unit.avoid)
+
+
+class _Room:
+    """The tables, indexed by free seats so best fit does not scan them all."""
+
+    def __init__(self, capacities: dict[int, int]):
+        self.tables = {number: _Table(number, capacity) for number, capacity in sorted(capacities.items())}
+        self._by_free: dict[int, dict[int, _Table]] = defaultdict(dict)
+        for table in self.tables.values():
+            self._by_free[table.free][table.number] = table
+        self._max_free = max(capacities.values(), default=0)
+
+    def add(self, table: _Table, unit: _Unit) -> None:
+        del self._by_free[table.free][table.number]
+        table.units.append(unit)
+        table.used += unit.seats
+        table.guests.update(guest.id for guest in unit.members)
+        self._by_free[table.free][table.number] = table
+
+    def remove(self, table: _Table, unit: _Unit) -> None:
+        del self._by_free[table.free][table.number]
+        table.units.remove(unit)
+        table.used -= unit.seats
+        table.guests.difference_update(guest.id for guest in unit.members)
+        self._by_free[table.free][table.number] = table
+
+    def best_fit(self, unit: _Unit, exclude: Optional[_Table] = None) -> Optional[_Table]:
+        """The fullest table ``unit`` fits at."""
+        for free in range(max(unit.seats, 0), self._max_free + 1):
+            for table in self._by_free.get(free, {}).values():
+                if table is not exclude and table.guests.isdisjoint(unit.avoid):
+                    return table
+        return None
+
+
+def _units(guests: Iterable[SeatingGuest], partners: dict[Hashable, set], warnings: list[str]) -> list[_Unit]:
+    groups: dict[tuple, list[SeatingGuest]] = defaultdict(list)
+    for guest in guests:
+        groups[("group", guest.group_name) if guest.group_name else ("guest", guest.id)].append(guest)
+
+    units = []
+    for (kind, key), members in groups.items():
+        label = f"group {key!r}" if kind == "group" else members[0].name
+        pinned: dict[int, list[SeatingGuest]] = defaultdict(list)
+        for guest in members:
+            if guest.pinned_table is not None:
+                pinned[guest.pinned_table].append(guest)
+        unpinned = [guest for guest in members if guest.pinned_table is None]
+        preferred = max(pinned, key=lambda table: (sum(g.seats for g in pinned[table]), -table)) if pinned else None
+
+        group_units = [_Unit(label, tablemates, partners, pinned=table) for table, tablemates in sorted(pinned.items())]
+        if unpinned:
+            unit = _Unit(label, unpinned, partners, preferred=preferred)
+            if unit.avoid & {guest.id for guest in unpinned}:
+                warnings.append(f"{label} contains guests to keep apart; seating them individually")
+                group_units.extend(unit.split(partners))
+            else:
+                group_units.append(unit)
+        units.extend(group_units)
+    return units
+
+
+def _place(unit: _Unit, room: _Room) -> bool:
+    """Seat ``unit`` at its preferred table if it fits there, else at the best-fitting table."""
+    table = room.tables.get(unit.preferred)
+    if table is None or not table.fits(unit):
+        table = room.best_fit(unit)
+        if table is None:
+            return False
+    room.add(table, unit)
+    return True
+
+
+def _make_room(unit: _Unit, room: _Room) -> bool:
+    """Seat ``unit`` by moving one movable unit away from a table to free enough seats."""
+    for table in sorted(room.tables.values(), key=lambda t: (-t.free, t.number)):
+        if table.capacity < unit.seats or not table.guests.isdisjoint(unit.avoid):
+            continue
+        missing = unit.seats - table.free
+        for moved in sorted(table.units, key=lambda u: u.seats):
+            if moved.pinned is not None or moved.seats < missing:
+                continue
+            destination = room.best_fit(moved, exclude=table)
+            if destination is not None:
+                room.remove(table, moved)
+                room.add(destination, moved)
+                room.add(table, unit)
+                return True
+    return False
+
+
+def solve_seating(
+    guests: Iterable[SeatingGuest],
+    capacities: dict[int, int],
+    keep_apart: Iterable[tuple[Hashable, Hashable]] = (),
+) -> SeatingPlan:
+    """Assign each guest a table number from ``capacities`` (table number -> seats).
+
+    Raises ``ValueError`` if a guest is pinned to a table that is not in ``capacities``.
+    """
+    partners: dict[Hashable, set] = defaultdict(set)
+    for a, b in keep_apart:
+        if a != b:
+            partners[a].add(b)
+            partners[b].add(a)
+
+    room = _Room(capacities)
+    tables = room.tables
+    warnings: list[str] = []
+    units = _units(guests, partners, warnings)
+
+    for unit in units:
+        if unit.pinned is None:
+            continue
+        if unit.pinned not in tables:
+            names = ", ".join(guest.name for guest in unit.members)
+            raise ValueError(f"{names} pinned to table {unit.pinned}, which is not in the plan")
+        table = tables[unit.pinned]
+        if not table.guests.isdisjoint(unit.avoid):
+            warnings.append(f"{unit.label} is pinned to table {table.number} with a guest to keep apart from")
+        room.add(table, unit)
+    for table in tables.values():
+        if table.free < 0:
+            warnings.append(f"table {table.number} is over capacity by {-table.free} because of pinned guests")
+
+    # Most constrained first: large units, then units with many guests to avoid.
+    pending = sorted(
+        (unit for unit in units if unit.pinned is None),
+        key=lambda unit: (-unit.seats, -len(unit.avoid), unit.label),
+    )
+    unplaced = [unit for unit in pending if not _place(unit, room)]
+    unplaced = [unit for unit in unplaced if not _make_room(unit, room)]
+
+    unseated = []
+    for unit in unplaced:
+        if len(unit.members) > 1:
+            warnings.append(f"{unit.label} ({unit.seats} seats) does not fit at one table; splitting it")
+            pieces = unit.split(partners)
+        else:
+            pieces = [unit]
+        for piece in pieces:
+            if not (_place(piece, room) or _make_room(piece, room)):
+                unseated.extend(guest.id for guest in piece.members)
+    if unseated:
+        warnings.append(f"{len(unseated)} guests could not be seated: not enough free seats")
+
+    assignments = {
+        guest.id: table.number
+        for table in tables.values()
+        for unit in table.units
+        for guest in unit.members
+    }
+    return SeatingPlan(assignments, unseated, warnings)
@@ -0,0 +1,262 @@
+"""Streaming readers and writers for guest spreadsheets (CSV and XLSX).
+
+Readers yield one ``(row_number, {column: value})`` pair at a time so an
+upload is never fully materialised in memory. Header cells are normalised to
+``snake_case`` ("First name" -> ``first_name``) and empty cells are dropped,
+letting model defaults apply.
+
+Writers consume an async iterator of row chunks and yield encoded bytes as
+soon as each chunk is written, so exports start sending before the query has
+finished and use constant memory.
+"""
+import csv
+import enum
+import io
+import zipfile
+from datetime import date, datetime
+from typing import AsyncIterator, BinaryIO, Iterable, Iterator, Optional, Sequence
+from xml.sax.saxutils import escape as xml_escape
+
+import openpyxl
+
+CSV_MEDIA_TYPE = "text/csv"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+Row = tuple[int, dict[str, object]]
+
+
+class UnsupportedFormat(ValueError):
+    pass
+
+
+def _normalize_header(cell: object) -> str:
+    return "_".join(str(cell or "").strip().lower().split())
+
+
+def _clean(headers: list[str], values) -> dict[str, object]:
+    row = {}
+    for header, value in zip(headers, values):
+        if isinstance(value, str):
+            value = value.strip()
+        if header and value not in (None, ""):
+            row[header] = value
+    return row
+
+
+def iter_csv_rows(fileobj: BinaryIO) -> Iterator[Row]:
+    """Rows of a UTF-8 (optionally BOM-prefixed) CSV; ``,`` ``;`` or tab separated."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(text, dialect)
+    headers = [_normalize_header(h) for h in next(reader, [])]
+    for values in reader:
+        if any(v.strip() for v in values):
+            yield reader.line_num, _clean(headers, values)
+
+
+def _xlsx_text(value: object) -> object:
+    """A cell as the text a CSV would hold: whole numbers without ``.0``, dates in ISO format."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def iter_xlsx_rows(fileobj: BinaryIO) -> Iterator[Row]:
+    """Rows of the first worksheet, read in openpyxl's streaming read-only mode.
+
+    Numbers and dates come back as text, as they would from a CSV, so string
+    fields such as phone numbers validate.
+    """
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = [_normalize_header(h) for h in next(rows, ())]
+        for row_number, values in enumerate(rows, start=2):
+            if any(v not in (None, "") for v in values):
+                yield row_number, _clean(headers, [_xlsx_text(v) for v in values])
+    finally:
+        workbook.close()
+
+
+def iter_table_rows(fileobj: BinaryIO, filename: Optional[str], content_type: Optional[str]) -> Iterator[Row]:
+    name = (filename or "").lower()
+    if name.endswith(".xlsx") or content_type == XLSX_MEDIA_TYPE:
+        return iter_xlsx_rows(fileobj)
+    if name.endswith(".csv") or content_type in (CSV_MEDIA_TYPE, "application/csv"):
+        return iter_csv_rows(fileobj)
+    raise UnsupportedFormat("Upload a .csv or .xlsx file")
+
+
+# --- writers -----------------------------------------------------------------
+
+_XML_ILLEGAL = dict.fromkeys(c for c in range(32) if c not in (9, 10, 13))
+# Leading characters that make spreadsheet apps read a cell as a formula.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def cell_text(value: object) -> str:
+    """Spreadsheet-friendly text for a database value.
+
+    Free text starting like a formula (guests fill in RSVP messages and
+    names) is prefixed with ``'`` so spreadsheet apps show it as text
+    instead of evaluating it.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return str(value.value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, str):
+        return "'" + value if value.startswith(_FORMULA_PREFIXES) else value
+    return str(value)
+
+
+async def stream_csv(header: Sequence[str], chunks: AsyncIterator[Sequence[Sequence]]) -> AsyncIterator[bytes]:
+    """Encode row chunks as UTF-8 CSV (with BOM so Excel detects the encoding)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield b"\xef\xbb\xbf" + buffer.getvalue().encode("utf-8")
+    async for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([cell_text(v) for v in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable file that hands written bytes back on ``drain``.
+
+    ``zipfile`` falls back to data descriptors on unseekable output, which is
+    what lets an archive be streamed while it is still being written.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class StreamingZip:
+    """Incrementally built ZIP archive; call ``drain`` to collect finished bytes."""
+
+    def __init__(self, compression: int = zipfile.ZIP_DEFLATED):
+        self._sink = _ChunkSink()
+        self._zip = zipfile.ZipFile(self._sink, "w", compression=compression)
+
+    def writestr(self, name: str, data) -> None:
+        self._zip.writestr(name, data)
+
+    def open(self, name: str):
+        return self._zip.open(name, "w", force_zip64=True)
+
+    def drain(self) -> bytes:
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._zip.close()
+        return self.drain()
+
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def _xlsx_workbook(sheet_name: str) -> str:
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{xml_escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    )
+
+
+def _xlsx_cell(value: object) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)) and not isinstance(value, enum.Enum):
+        return f"<c><v>{value}</v></c>"
+    text = cell_text(value).translate(_XML_ILLEGAL)
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{xml_escape(text)}</t></is></c>'
+
+
+def _xlsx_row(values: Iterable) -> str:
+    return "<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>"
+
+
+async def stream_xlsx(
+    header: Sequence[str],
+    chunks: AsyncIterator[Sequence[Sequence]],
+    sheet_name: str = "Sheet1",
+) -> AsyncIterator[bytes]:
+    """Encode row chunks as a single-sheet XLSX workbook, streamed as it is built.
+
+    Cells are written as inline strings/numbers so no shared-strings table has
+    to be held in memory.
+    """
+    archive = StreamingZip()
+    for name, content in _XLSX_STATIC_PARTS.items():
+        archive.writestr(name, content)
+    archive.writestr("xl/workbook.xml", _xlsx_workbook(sheet_name))
+    with archive.open("xl/worksheets/sheet1.xml") as sheet:
+        sheet.write(
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        )
+        sheet.write(_xlsx_row(header).encode("utf-8"))
+        yield archive.drain()
+        async for rows in chunks:
+            sheet.write("".join(_xlsx_row(row) for row in rows).encode("utf-8"))
+            yield archive.drain()
+        sheet.write(b"</sheetData></worksheet>")
+    yield archive.close()
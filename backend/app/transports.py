@@ -0,0 +1,238 @@
+"""Delivery transports for the dispatch queue: SMTP email and an HTTP SMS gateway.
+
+A transport sends a batch of messages and reports, for each one, ``None``
+(delivered) or a ``DeliveryError`` -- ``permanent`` when retrying cannot
+help, such as a refused recipient. Both transports here drive blocking
+standard-library clients from their own thread pool, whose size is their
+concurrency limit, so the event loop only awaits results. Other transports
+(a provider SDK, a test double) plug in with ``register_transport``.
+"""
+import asyncio
+import json
+import smtplib
+import ssl
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from typing import NamedTuple, Optional, Sequence
+
+from app.config import settings
+from app.db.models import NotificationChannel
+
+
+class OutgoingMessage(NamedTuple):
+    recipient: str
+    subject: Optional[str]
+    body: str
+
+
+class DeliveryError(Exception):
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+class Transport:
+    """Sends messages over one channel."""
+
+    async def send_many(self, messages: Sequence[OutgoingMessage]) -> list[Optional[DeliveryError]]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class ThreadedTransport(Transport):
+    """Runs the blocking ``send`` of each message in at most ``concurrency`` threads."""
+
+    def __init__(self, concurrency: int, name: str):
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=name)
+
+    def send(self, message: OutgoingMessage) -> None:
+        raise NotImplementedError
+
+    def _attempt(self, message: OutgoingMessage) -> Optional[DeliveryError]:
+        try:
+            self.send(message)
+        except DeliveryError as e:
+            return e
+        except Exception as e:
+            # Timeouts, refused connections, dropped sessions: worth retrying.
+            return DeliveryError(f"{type(e).__name__}: {e}")
+        return None
+
+    async def send_many(self, messages: Sequence[OutgoingMessage]) -> list[Optional[DeliveryError]]:
+        loop = asyncio.get_running_loop()
+        return list(await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self._attempt, message) for message in messages)
+        ))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SMTPTransport(ThreadedTransport):
+    """Email over SMTP; each thread keeps its connection open across messages."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = False,
+        timeout: float = 10.0,
+        concurrency: int = 4,
+    ):
+        super().__init__(concurrency, "smtp")
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections: set[smtplib.SMTP] = set()
+        self._lock = threading.Lock()
+
+    def _connection(self) -> smtplib.SMTP:
+        smtp = getattr(self._local, "smtp", None)
+        if smtp is None:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            self._local.smtp = smtp
+            with self._lock:
+                self._connections.add(smtp)
+        return smtp
+
+    def _drop_connection(self) -> None:
+        smtp = self._local.smtp
+        self._local.smtp = None
+        with self._lock:
+            self._connections.discard(smtp)
+        try:
+            smtp.close()
+        except OSError:
+            pass
+
+    def send(self, message: OutgoingMessage) -> None:
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message.recipient
+        email["Subject"] = message.subject or ""
+        email["Date"] = formatdate()
+        email["Message-ID"] = make_msgid()
+        email.set_content(message.body)
+        reconnected = False
+        while True:
+            smtp = self._connection()
+            try:
+                smtp.send_message(email)
+                return
+            except smtplib.SMTPServerDisconnected:
+                # The server closed the idle connection: reconnect once.
+                self._drop_connection()
+                if reconnected:
+                    raise
+                reconnected = True
+            except smtplib.SMTPRecipientsRefused as e:
+                raise DeliveryError(f"SMTP recipient refused: {', '.join(e.recipients)}", permanent=True)
+            except smtplib.SMTPResponseException as e:
+                error = e.smtp_error.decode("utf-8", "replace") if isinstance(e.smtp_error, bytes) else e.smtp_error
+                raise DeliveryError(f"SMTP {e.smtp_code}: {error}", permanent=500 <= e.smtp_code < 600)
+
+    def close(self) -> None:
+        super().close()
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for smtp in connections:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+
+class SMSGatewayTransport(ThreadedTransport):
+    """SMS through an HTTP gateway: one JSON ``POST`` per message."""
+
+    def __init__(
+        self,
+        url: str,
+        token: Optional[str] = None,
+        sender: Optional[str] = None,
+        timeout: float = 10.0,
+        concurrency: int = 4,
+    ):
+        super().__init__(concurrency, "sms")
+        self.url = url
+        self.sender = sender
+        self.timeout = timeout
+        self._headers = {"Content-Type": "application/json"}
+        if token:
+            self._headers["Authorization"] = f"Bearer {token}"
+
+    def send(self, message: OutgoingMessage) -> None:
+        payload = json.dumps({"to": message.recipient, "from": self.sender, "body": message.body}).encode("utf-8")
+        request = urllib.request.Request(self.url, data=payload, headers=self._headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            permanent = 400 <= e.code < 500 and e.code not in (408, 429)
+            raise DeliveryError(f"SMS gateway HTTP {e.code}", permanent=permanent)
+
+
+def _from_settings(channel: NotificationChannel) -> Optional[Transport]:
+    if channel == NotificationChannel.EMAIL and settings.SMTP_HOST:
+        return SMTPTransport(
+            settings.SMTP_HOST,
+            settings.SMTP_PORT,
+            settings.SMTP_FROM,
+            username=settings.SMTP_USERNAME,
+            password=settings.SMTP_PASSWORD,
+            starttls=settings.SMTP_STARTTLS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+            concurrency=settings.SMTP_CONCURRENCY,
+        )
+    if channel == NotificationChannel.SMS and settings.SMS_GATEWAY_URL:
+        return SMSGatewayTransport(
+            settings.SMS_GATEWAY_URL,
+            token=settings.SMS_GATEWAY_TOKEN,
+            sender=settings.SMS_SENDER,
+            timeout=settings.SMS_TIMEOUT_SECONDS,
+            concurrency=settings.SMS_CONCURRENCY,
+        )
+    return None
+
+
+_transports: dict[NotificationChannel, Optional[Transport]] = {}
+
+
+def register_transport(channel: NotificationChannel, transport: Optional[Transport]) -> None:
+    """Use ``transport`` for ``channel`` (``None`` disables it) instead of the configured one."""
+    previous = _transports.get(channel)
+    if previous is not None and previous is not transport:
+        previous.close()
+    _transports[channel] = transport
+
+
+def get_transport(channel: NotificationChannel) -> Optional[Transport]:
+    """The transport for ``channel``, built from the settings on first use; ``None`` if not configured."""
+    if channel not in _transports:
+        _transports[channel] = _from_settings(channel)
+    return _transports[channel]
+
+
+def close_transports() -> None:
+    for transport in _transports.values():
+        if transport is not None:
+            transport.close()
+    _transports.clear()
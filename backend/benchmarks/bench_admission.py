@@ -0,0 +1,108 @@
+"""Admin latency while the public RSVP endpoints are flooded.
+
+Simulates ``--clients`` public clients, each with its own IP, submitting RSVPs
+as fast as they can for ``--seconds``, while one admin client pages through
+``GET /api/guests``. Runs the flood with admission control disabled and
+enabled and reports admin latency percentiles plus the public status codes.
+Prints one JSON document.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_admission [--clients 200] [--seconds 10]
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+import httpx
+from sqlalchemy import select, text
+
+from benchmarks.common import load_guests, summarize
+from app.admission import rsvp_admission
+from app.auth import passwords
+from app.db.database import async_session_maker, engine
+from app.db.models import Guest, User
+from app.main import app
+
+EMAIL = "bench-admin@wedding.local"
+PASSWORD = "bench-password"
+
+
+async def _seed() -> list[str]:
+    await load_guests(5000)
+    async with async_session_maker() as session:
+        await session.execute(text("DELETE FROM users WHERE email = :email"), {"email": EMAIL})
+        session.add(User(email=EMAIL, password_hash=passwords.hash_password(PASSWORD), name="Bench"))
+        await session.commit()
+        return list((await session.execute(select(Guest.rsvp_code))).scalars())
+
+
+def _client(ip: str) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, client=(ip, 40000))
+    return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60)
+
+
+async def _flood(ip: str, codes: list[str], deadline: float, statuses: Counter) -> None:
+    async with _client(ip) as client:
+        i = 0
+        while time.monotonic() < deadline:
+            code = codes[i % len(codes)]
+            response = await client.post(
+                "/api/rsvp/submit",
+                json={"rsvp_code": code, "rsvp_status": "attending" if i % 2 else "not_attending"},
+            )
+            statuses[response.status_code] += 1
+            i += 1
+            if response.status_code in (429, 503):
+                await asyncio.sleep(0.01)
+
+
+async def _admin(token: str, deadline: float) -> list[float]:
+    samples = []
+    async with _client("10.0.0.1") as client:
+        client.headers["Authorization"] = f"Bearer {token}"
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            (await client.get("/api/guests", params={"limit": 50})).raise_for_status()
+            samples.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.05)
+    return samples
+
+
+async def _scenario(token: str, codes: list[str], clients: int, seconds: float) -> dict:
+    statuses: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    floods = [
+        asyncio.create_task(_flood(f"198.51.{i // 250}.{i % 250 + 1}", codes[i::clients], deadline, statuses))
+        for i in range(clients)
+    ]
+    admin = await _admin(token, deadline)
+    await asyncio.gather(*floods)
+    return {"admin": summarize(admin), "public_status_codes": dict(sorted(statuses.items()))}
+
+
+async def main(clients: int, seconds: float) -> None:
+    codes = await _seed()
+    async with _client("10.0.0.1") as client:
+        response = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        token = response.json()["access_token"]
+    report = {
+        "benchmark": "admission",
+        "clients": clients,
+        "seconds": seconds,
+        "results": {"idle": {"admin": summarize(await _admin(token, time.monotonic() + 2))}},
+    }
+    rsvp_admission.enabled = False
+    report["results"]["flood_without_admission"] = await _scenario(token, codes, clients, seconds)
+    rsvp_admission.enabled = True
+    report["results"]["flood_with_admission"] = await _scenario(token, codes, clients, seconds)
+    await engine.dispose()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.seconds))
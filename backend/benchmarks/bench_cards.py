@@ -0,0 +1,147 @@
+"""Invitation cards: render N guests' cards inline vs through POST /api/guests/cards.
+
+Times, for N generated guests (a quarter of them Arabic):
+
+- ``inline``: ``render_card`` for every guest in a loop on the event loop,
+  as an endpoint without the pool would (the loop is blocked throughout);
+- ``cold``: the first ``POST /api/guests/cards``, which also spawns the pool;
+- ``uncached``: the same after emptying ``invitation_cards``;
+- ``reprint``: again with every card stored;
+- ``changed``: after renaming ``--changed`` of the guests.
+
+Each download reports its total time, the cards rendered and the worst
+event-loop stall seen meanwhile (a ticker that should wake every 10 ms).
+On a single CPU the pool cannot render faster than the inline loop; what
+it buys there is an event loop that keeps serving requests. Prints one JSON
+document.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_cards [--guests 800] [--workers 2]
+"""
+import argparse
+import asyncio
+import io
+import json
+import time
+import zipfile
+
+import httpx
+from sqlalchemy import select, text
+
+from benchmarks.common import engine, load_guests
+from app.auth import passwords
+from app.cards import CardFields, close_card_renderer, render_card
+from app.config import settings
+from app.db.database import async_session_maker
+from app.db.models import Guest, User
+from app.main import app
+from app.messages import rsvp_link
+
+EMAIL = "bench-admin@wedding.local"
+PASSWORD = "bench-password"
+
+
+async def _seed(count: int) -> None:
+    await load_guests(count)
+    async with async_session_maker() as session:
+        await session.execute(text("DELETE FROM users WHERE email = :email"), {"email": EMAIL})
+        session.add(User(email=EMAIL, password_hash=passwords.hash_password(PASSWORD), name="Bench"))
+        await session.commit()
+
+
+async def _cards() -> list[CardFields]:
+    async with async_session_maker() as session:
+        rows = (await session.execute(
+            select(
+                Guest.id, Guest.first_name, Guest.last_name, Guest.plus_one_allowed, Guest.plus_one_name,
+                Guest.language, Guest.rsvp_code,
+            ).order_by(Guest.last_name, Guest.first_name, Guest.id)
+        )).all()
+    return [CardFields(str(row.id), *row[1:], rsvp_link(row.rsvp_code)) for row in rows]
+
+
+class StallMeter:
+    """Largest lateness of a 10 ms ticker, i.e. the longest the event loop was blocked."""
+
+    def __init__(self):
+        self.worst = 0.0
+        self._task = None
+
+    async def _tick(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            self.worst = max(self.worst, time.perf_counter() - started - 0.01)
+
+    def __enter__(self):
+        self._task = asyncio.create_task(self._tick())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+async def _download(client: httpx.AsyncClient) -> dict:
+    with StallMeter() as stalls:
+        started = time.perf_counter()
+        response = await client.post("/api/guests/cards", json={})
+        response.raise_for_status()
+        body = response.content
+        total = time.perf_counter() - started
+    cards = len(zipfile.ZipFile(io.BytesIO(body)).namelist())
+    return {
+        "cards": cards,
+        "rendered": int(response.headers["X-Cards-Rendered"]),
+        "total_ms": round(total * 1000, 1),
+        "zip_kb": round(len(body) / 1024, 1),
+        "worst_loop_stall_ms": round(stalls.worst * 1000, 1),
+    }
+
+
+async def main(count: int, workers: int, changed: float) -> None:
+    settings.CARD_RENDER_WORKERS = workers
+    await _seed(count)
+    cards = await _cards()
+
+    with StallMeter() as stalls:
+        started = time.perf_counter()
+        await asyncio.sleep(0)
+        for card in cards:
+            render_card(card)
+        await asyncio.sleep(0.02)
+        inline_ms = (time.perf_counter() - started) * 1000
+    results = {"inline": {
+        "cards": len(cards), "total_ms": round(inline_ms, 1), "worst_loop_stall_ms": round(stalls.worst * 1000, 1),
+    }}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            response = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            response.raise_for_status()
+            client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+            results["cold"] = await _download(client)
+            async with async_session_maker() as session:
+                await session.execute(text("TRUNCATE invitation_cards"))
+                await session.commit()
+            results["uncached"] = await _download(client)
+            results["reprint"] = await _download(client)
+            async with async_session_maker() as session:
+                await session.execute(text(
+                    "UPDATE guests SET first_name = first_name || 'e' "
+                    "WHERE id IN (SELECT id FROM guests ORDER BY id LIMIT :n)"
+                ), {"n": int(count * changed)})
+                await session.commit()
+            results["changed"] = await _download(client)
+    close_card_renderer()
+    await engine.dispose()
+    print(json.dumps({"benchmark": "cards", "guests": count, "workers": workers, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guests", type=int, default=800)
+    parser.add_argument("--workers", type=int, default=2, help="CARD_RENDER_WORKERS")
+    parser.add_argument("--changed", type=float, default=0.05, help="fraction of guests renamed before the last run")
+    args = parser.parse_args()
+    asyncio.run(main(args.guests, args.workers, args.changed))
@@ -0,0 +1,165 @@
+"""Invitation dispatch: queue N invitations and drain them through a local SMTP stand-in.
+
+Loads N guests, all with an email address (``--reject`` of them at a domain
+the stand-in refuses), starts ``benchmarks.smtp_sink`` as a slow, flaky
+relay (``--delay`` per message, ``--fail-rate`` answered 451) and plugs an
+``SMTPTransport`` for it into the app. Then, with the app's lifespan (and so
+its dispatch workers) running, it times ``POST /api/notifications`` for
+every guest and the drain of the queue. An admin client keeps calling the
+guest list and stats endpoints throughout, and their latency is compared
+with an idle queue's. The stand-in runs on its own thread and event loop.
+Prints one JSON document.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_dispatch [--invitations 2000]
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+from sqlalchemy import func, select, text
+
+from benchmarks.common import engine, load_guests, summarize
+from benchmarks.smtp_sink import SMTPSink
+from app.auth import passwords
+from app.config import settings
+from app.db.database import async_session_maker
+from app.db.models import Notification, NotificationChannel, User
+from app.main import app
+from app.transports import SMTPTransport, register_transport
+
+EMAIL = "bench-admin@wedding.local"
+PASSWORD = "bench-password"
+REJECTED_DOMAIN = "rejected.invalid"
+
+
+async def _seed(count: int, reject: float) -> None:
+    await load_guests(count)
+    async with async_session_maker() as session:
+        await session.execute(text(
+            "UPDATE guests SET email = 'guest' || n || CASE WHEN n <= :rejected "
+            "THEN '@" + REJECTED_DOMAIN + "' ELSE '@example.com' END "
+            "FROM (SELECT id, row_number() OVER (ORDER BY id) AS n FROM guests) AS numbered "
+            "WHERE guests.id = numbered.id"
+        ), {"rejected": int(count * reject)})
+        await session.execute(text("TRUNCATE notifications"))
+        await session.execute(text("DELETE FROM users WHERE email = :email"), {"email": EMAIL})
+        session.add(User(email=EMAIL, password_hash=passwords.hash_password(PASSWORD), name="Bench"))
+        await session.commit()
+
+
+def _serve(sink: SMTPSink) -> tuple[asyncio.AbstractEventLoop, asyncio.AbstractServer]:
+    """Run ``sink`` on its own event loop and thread, as a real relay would not share the app's."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop, asyncio.run_coroutine_threadsafe(sink.start(), loop).result()
+
+
+async def _probe(client: httpx.AsyncClient, samples: list[float], stop: asyncio.Event) -> None:
+    """Admin requests back to back until ``stop`` is set."""
+    paths = ["/api/guests/stats", "/api/guests?limit=50"]
+    i = 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(paths[i % len(paths)])
+        response.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+        i += 1
+        await asyncio.sleep(0.005)
+
+
+async def _pending() -> int:
+    async with async_session_maker() as session:
+        return (await session.execute(
+            select(func.count()).where(Notification.status.in_(["QUEUED", "SENDING"]))
+        )).scalar_one()
+
+
+async def _status_counts() -> dict[str, int]:
+    async with async_session_maker() as session:
+        rows = (await session.execute(
+            select(Notification.status, func.count()).group_by(Notification.status)
+        )).all()
+    return {status.value: count for status, count in rows}
+
+
+async def main(count: int, delay: float, fail_rate: float, reject: float, concurrency: int, workers: int, batch: int) -> None:
+    settings.NOTIFICATION_WORKERS = workers
+    settings.NOTIFICATION_BATCH_SIZE = batch
+    settings.NOTIFICATION_RETRY_BASE_SECONDS = 0.2
+    settings.NOTIFICATION_RETRY_MAX_SECONDS = 2.0
+    settings.NOTIFICATION_POLL_SECONDS = 0.2
+
+    sink = SMTPSink(delay=delay, fail_rate=fail_rate, reject_domain=REJECTED_DOMAIN)
+    loop, server = _serve(sink)
+    host, port = server.sockets[0].getsockname()[:2]
+    register_transport(NotificationChannel.EMAIL, SMTPTransport(host, port, "bench@wedding.local", concurrency=concurrency))
+    await _seed(count, reject)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            response = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            response.raise_for_status()
+            client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+            idle: list[float] = []
+            stop = asyncio.Event()
+            probe = asyncio.create_task(_probe(client, idle, stop))
+            await asyncio.sleep(2)
+            stop.set()
+            await probe
+
+            busy: list[float] = []
+            stop = asyncio.Event()
+            probe = asyncio.create_task(_probe(client, busy, stop))
+            started = time.perf_counter()
+            response = await client.post("/api/notifications", json={"kind": "invitation", "channel": "email"})
+            enqueue_ms = (time.perf_counter() - started) * 1000
+            response.raise_for_status()
+            queued = response.json()["queued"]
+            while await _pending():
+                await asyncio.sleep(0.1)
+            drain_seconds = time.perf_counter() - started
+            stop.set()
+            await probe
+
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    await engine.dispose()
+    print(json.dumps({
+        "benchmark": "dispatch",
+        "invitations": queued,
+        "smtp": {"delay_ms": delay * 1000, "fail_rate": fail_rate, "concurrency": concurrency},
+        "workers": workers,
+        "batch_size": batch,
+        "enqueue_ms": round(enqueue_ms, 2),
+        "drain_seconds": round(drain_seconds, 2),
+        "messages_per_second": round(len(sink.messages) / drain_seconds, 1),
+        "sink": {
+            "delivered": len(sink.messages),
+            "transient_failures": sink.transient_failures,
+            "rejected": sink.rejected,
+            "connections": sink.connections,
+        },
+        "jobs": await _status_counts(),
+        "api_latency_idle": summarize(idle),
+        "api_latency_while_sending": summarize(busy),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--invitations", type=int, default=2000)
+    parser.add_argument("--delay", type=float, default=0.02, help="SMTP stand-in seconds per message")
+    parser.add_argument("--fail-rate", type=float, default=0.05, help="fraction of messages answered 451")
+    parser.add_argument("--reject", type=float, default=0.01, help="fraction of guests with a refused address")
+    parser.add_argument("--concurrency", type=int, default=8, help="SMTP connections")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(
+        args.invitations, args.delay, args.fail_rate, args.reject, args.concurrency, args.workers, args.batch,
+    ))
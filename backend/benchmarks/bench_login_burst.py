@@ -0,0 +1,90 @@
+"""RSVP lookup latency while a burst of logins is being hashed.
+
+Measures ``GET /api/rsvp/lookup/{code}`` latency through the ASGI app three
+ways: idle, during a login burst with bcrypt on the worker pool (current
+code), and during the same burst with bcrypt called inline on the event loop
+(the previous behaviour). Prints one JSON document.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_login_burst [--logins 40] [--lookups 200]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from sqlalchemy import select, text
+
+from benchmarks.common import load_guests, summarize
+from app.auth import passwords
+from app.db.database import async_session_maker, engine
+from app.db.models import Guest, User
+from app.main import app
+
+EMAIL = "bench-admin@wedding.local"
+PASSWORD = "bench-password"
+
+
+async def _seed() -> list[str]:
+    await load_guests(1000)
+    async with async_session_maker() as session:
+        await session.execute(text("DELETE FROM users WHERE email = :email"), {"email": EMAIL})
+        session.add(User(email=EMAIL, password_hash=passwords.hash_password(PASSWORD), name="Bench"))
+        await session.commit()
+        return list((await session.execute(select(Guest.rsvp_code).limit(200))).scalars())
+
+
+async def _lookups(client: httpx.AsyncClient, codes: list[str], count: int) -> list[float]:
+    samples = []
+    for i in range(count):
+        started = time.perf_counter()
+        response = await client.get(f"/api/rsvp/lookup/{codes[i % len(codes)]}")
+        response.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.005)
+    return samples
+
+
+async def _phase(client, codes, lookups: int, logins: int) -> dict:
+    burst = [
+        asyncio.create_task(client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD}))
+        for _ in range(logins)
+    ]
+    samples = await _lookups(client, codes, lookups)
+    statuses = [r.status_code for r in await asyncio.gather(*burst)]
+    return {
+        **summarize(samples),
+        "logins": logins,
+        "login_ok": statuses.count(200),
+        "login_503": statuses.count(503),
+    }
+
+
+async def _inline(func, *args):
+    return func(*args)
+
+
+async def main(logins: int, lookups: int) -> None:
+    codes = await _seed()
+    transport = httpx.ASGITransport(app=app)
+    report = {"benchmark": "login_burst", "bcrypt_rounds": passwords.settings.BCRYPT_ROUNDS, "results": {}}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await _lookups(client, codes, 20)  # warm up
+        report["results"]["idle"] = await _phase(client, codes, lookups, 0)
+        report["results"]["burst_worker_pool"] = await _phase(client, codes, lookups, logins)
+        pooled = passwords._run_in_pool
+        passwords._run_in_pool = _inline
+        try:
+            report["results"]["burst_inline_bcrypt"] = await _phase(client, codes, lookups, logins)
+        finally:
+            passwords._run_in_pool = pooled
+    await engine.dispose()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.lookups))
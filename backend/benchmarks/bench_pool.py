@@ -0,0 +1,121 @@
+"""Connection pool and asyncpg settings: cold start and steady-state throughput.
+
+For each configuration below, builds a fresh engine with ``build_engine``
+(the app's own factory) and measures:
+
+* ``cold_start`` -- pool warm-up time (when ``DB_POOL_WARMUP`` is on) and the
+  latency of the first wave of ``--concurrency`` simultaneous requests, i.e.
+  what the first guests after a deploy see;
+* ``steady_state`` -- requests per second and latency percentiles with
+  ``--concurrency`` clients looping for ``--seconds``.
+
+A "request" is the read mix of the admin list page: one guest page, one RSVP
+code lookup and the stats row, on one pooled session. Prints one JSON
+document.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_pool [--concurrency 20] [--seconds 10]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from benchmarks.common import engine as bench_engine, load_guests, summarize
+from app.config import settings
+from app.db.database import build_engine, warm_up_pool
+from app.db.models import GUEST_COLUMNS, Guest
+from app.db.stats import read_guest_stats
+from app.main import WARMUP_STATEMENTS
+
+CONFIGURATIONS = {
+    "default": {},
+    "pre_ping_always": {"DB_POOL_PRE_PING": "always"},
+    "pre_ping_never": {"DB_POOL_PRE_PING": "never"},
+    "no_warmup": {"DB_POOL_WARMUP": False},
+    "no_statement_cache": {"DB_STATEMENT_CACHE_SIZE": 0},
+    "pgbouncer_mode": {"DB_PGBOUNCER": True},
+    "small_pool": {"DB_POOL_SIZE": 5, "DB_MAX_OVERFLOW": 0},
+}
+
+_PAGE = select(*GUEST_COLUMNS).order_by(Guest.last_name, Guest.first_name, Guest.id).limit(50)
+
+
+async def _request(sessions: async_sessionmaker, codes: list[str], rng: random.Random) -> float:
+    started = time.perf_counter()
+    async with sessions() as session:
+        (await session.execute(_PAGE)).all()
+        (await session.execute(select(*GUEST_COLUMNS).where(Guest.rsvp_code == rng.choice(codes)))).one_or_none()
+        await read_guest_stats(session)
+    return (time.perf_counter() - started) * 1000
+
+
+async def _steady(sessions: async_sessionmaker, codes: list[str], concurrency: int, seconds: float) -> dict:
+    deadline = time.monotonic() + seconds
+    samples: list[float] = []
+
+    async def client(i: int) -> None:
+        rng = random.Random(i)
+        while time.monotonic() < deadline:
+            samples.append(await _request(sessions, codes, rng))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"requests_per_second": round(len(samples) / elapsed, 1), **summarize(samples)}
+
+
+async def measure(name: str, overrides: dict, codes: list[str], concurrency: int, seconds: float) -> dict:
+    config = settings.model_copy(update=overrides)
+    engine: AsyncEngine = build_engine(config)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        warmup_ms = None
+        if config.DB_POOL_WARMUP:
+            started = time.perf_counter()
+            await warm_up_pool(engine, config.DB_POOL_SIZE, WARMUP_STATEMENTS)
+            warmup_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        started = time.perf_counter()
+        first_wave = await asyncio.gather(*(
+            _request(sessions, codes, random.Random(i)) for i in range(concurrency)
+        ))
+        cold = {
+            "warmup_ms": warmup_ms,
+            "first_wave_ms": round((time.perf_counter() - started) * 1000, 1),
+            **summarize(list(first_wave)),
+        }
+        steady = await _steady(sessions, codes, concurrency, seconds)
+    finally:
+        await engine.dispose()
+    return {"configuration": name, "settings": overrides, "cold_start": cold, "steady_state": steady}
+
+
+async def main(guests: int, concurrency: int, seconds: float, configurations: list[str]) -> None:
+    await load_guests(guests)
+    async with bench_engine.connect() as conn:
+        codes = list((await conn.execute(select(Guest.rsvp_code))).scalars())
+    await bench_engine.dispose()
+    results = [
+        await measure(name, CONFIGURATIONS[name], codes, concurrency, seconds)
+        for name in configurations
+    ]
+    print(json.dumps({
+        "benchmark": "pool",
+        "guests": guests,
+        "concurrency": concurrency,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--configurations", default=",".join(CONFIGURATIONS))
+    args = parser.parse_args()
+    asyncio.run(main(args.guests, args.concurrency, args.seconds, args.configurations.split(",")))
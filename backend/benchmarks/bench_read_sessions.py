@@ -0,0 +1,119 @@
+"""Read-only sessions: the RSVP lookup query through get_db vs get_read_db, and replica fallback.
+
+Loads N guests, then ``--clients`` concurrent tasks each run ``--requests``
+lookups of a random RSVP code, every lookup in a fresh session from the
+dependency under test, as a request would:
+
+- ``get_db``: a read-write transaction on the primary, committed at the end
+  (BEGIN, SELECT, COMMIT);
+- ``get_read_db_primary``: ``get_read_db`` without a replica, a READ ONLY
+  transaction in the main pool, rolled back (BEGIN READ ONLY, SELECT,
+  ROLLBACK);
+- ``get_read_db_replica``: ``get_read_db`` routed to a "replica" that is the
+  same database, an autocommit session with read-only transactions
+  (SELECT only).
+
+Then reports where reads go when that replica is in sync, when it lags more
+than ``DB_REPLICA_MAX_LAG_SECONDS`` (simulated with a negative limit), and
+when it is unreachable, with the time each check took. Prints one JSON
+document.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_read_sessions [--guests 2000] [--clients 16]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from sqlalchemy import select
+
+from benchmarks.common import BENCH_DATABASE_URL, engine, load_guests, summarize
+from app.config import settings
+from app.db import database
+from app.db.database import REPLICA, ReadRouter, build_engine, get_db, get_read_db, read_only_engine
+from app.db.models import GUEST_COLUMNS, Guest
+
+UNREACHABLE_URL = "postgresql+asyncpg://wedding@127.0.0.1:1/wedding"
+
+
+async def _codes() -> list[str]:
+    async for session in get_db():
+        return list((await session.execute(select(Guest.rsvp_code))).scalars())
+
+
+async def _run(dependency, codes: list[str], clients: int, requests: int) -> dict:
+    samples: list[float] = []
+
+    async def client(seed: int) -> None:
+        rng = random.Random(seed)
+        for _ in range(requests):
+            started = time.perf_counter()
+            async for session in dependency():
+                (await session.execute(select(*GUEST_COLUMNS).where(Guest.rsvp_code == rng.choice(codes)))).one()
+            samples.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(seed) for seed in range(clients)))
+    elapsed = time.perf_counter() - started
+    return {"requests_per_second": round(len(samples) / elapsed, 1), "latency_ms": summarize(samples)}
+
+
+async def _route(router: ReadRouter) -> dict:
+    started = time.perf_counter()
+    await router.check()
+    return {
+        "reads_go_to": router.target,
+        "lag_seconds": router.lag,
+        "check_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+async def main(count: int, clients: int, requests: int) -> None:
+    await load_guests(count)
+    codes = await _codes()
+
+    replica = ReadRouter(read_only_engine(engine), build_engine(url=BENCH_DATABASE_URL, read_only=True))
+    routing = {"in_sync": await _route(replica)}
+    primary_only = database.read_router
+
+    async def read_from(router: ReadRouter, count: int) -> dict:
+        database.read_router = router
+        try:
+            return await _run(get_read_db, codes, clients, count)
+        finally:
+            database.read_router = primary_only
+
+    # Warm the pools and their statement caches before timing.
+    await _run(get_db, codes, clients, 5)
+    await read_from(replica, 5)
+    results = {
+        "get_db": await _run(get_db, codes, clients, requests),
+        "get_read_db_primary": await read_from(primary_only, requests),
+        "get_read_db_replica": await read_from(replica, requests),
+    }
+
+    max_lag = settings.DB_REPLICA_MAX_LAG_SECONDS
+    settings.DB_REPLICA_MAX_LAG_SECONDS = -1
+    routing["lagging"] = await _route(replica)
+    settings.DB_REPLICA_MAX_LAG_SECONDS = max_lag
+    unreachable = ReadRouter(read_only_engine(engine), build_engine(url=UNREACHABLE_URL, read_only=True))
+    routing["unreachable"] = await _route(unreachable)
+    results["routing"] = routing
+
+    for router in (replica, unreachable):
+        await router.engines[REPLICA].dispose()
+    await engine.dispose()
+    print(json.dumps({
+        "benchmark": "read_sessions", "guests": count, "clients": clients, "requests_per_client": requests,
+        **results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="lookups per client")
+    args = parser.parse_args()
+    asyncio.run(main(args.guests, args.clients, args.requests))
@@ -0,0 +1,88 @@
+"""Response analytics: chart cost as the RSVP response log grows.
+
+For each history size, fills ``rsvp_responses`` with N generated responses
+spread over ``--days`` days (the last ones a few minutes old), then times
+``response_counts`` -- the first call folds the whole history into the hourly
+rollups, later calls only the open tail -- next to the same daily chart
+computed with ``date_trunc`` over the whole log. Prints one JSON document.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_response_timeline [--responses 10000,100000,1000000]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import func, select, text
+
+from benchmarks.common import engine, summarize
+from app.db.database import async_session_maker
+from app.db.models import RSVPResponseLog
+from app.db.responses import response_counts
+
+FILL = text(
+    "INSERT INTO rsvp_responses (guest_id, source, old_status, new_status, plus_one_attending, responded_at) "
+    "SELECT gen_random_uuid(), 'rsvp', "
+    "CASE WHEN i % 7 = 0 THEN 'ATTENDING'::rsvpstatus ELSE 'PENDING' END, "
+    "CASE WHEN i % 4 = 0 THEN 'NOT_ATTENDING'::rsvpstatus ELSE 'ATTENDING' END, i % 3 = 0, "
+    "now() - make_interval(secs => i * CAST(:span AS double precision) / :count) "
+    "FROM generate_series(1, :count) AS i"
+)
+
+
+async def _fill(count: int, days: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("TRUNCATE rsvp_responses, rsvp_response_rollups"))
+        await conn.execute(FILL, {"count": count, "span": days * 86400.0})
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE rsvp_responses"))
+        await conn.commit()
+
+
+async def _chart(session) -> None:
+    await response_counts(session, "day", "UTC")
+    await session.commit()
+
+
+async def _full_scan(session) -> None:
+    bucket = func.date_trunc("day", RSVPResponseLog.responded_at, "UTC").label("bucket")
+    await session.execute(
+        select(bucket, RSVPResponseLog.old_status, RSVPResponseLog.new_status, func.count())
+        .group_by(bucket, RSVPResponseLog.old_status, RSVPResponseLog.new_status)
+    )
+
+
+async def _time(call, session, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call(session)
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+async def main(sizes: list[int], days: int, repeat: int) -> None:
+    results = []
+    for count in sizes:
+        await _fill(count, days)
+        async with async_session_maker() as session:
+            started = time.perf_counter()
+            await _chart(session)
+            first_ms = (time.perf_counter() - started) * 1000
+            results.append({
+                "responses": count,
+                "first_call_ms": round(first_ms, 2),
+                "rollup": await _time(_chart, session, repeat),
+                "full_scan": await _time(_full_scan, session, repeat),
+            })
+    await engine.dispose()
+    print(json.dumps({"benchmark": "response_timeline", "days": days, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--responses", default="10000,100000,1000000")
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main([int(s) for s in args.responses.split(",")], args.days, args.repeat))
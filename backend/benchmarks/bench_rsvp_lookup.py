@@ -0,0 +1,61 @@
+"""Public RSVP lookup: in-memory index versus a database query per request.
+
+Loads generated guests, warms the RSVP index and times ``rsvp_index.lookup``
+for known codes and for unknown codes (negative cache), next to the query the
+lookup endpoint used to run on every call. Prints one JSON document.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_rsvp_lookup [--guests 10000] [--lookups 2000]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from sqlalchemy import select
+
+from benchmarks.common import engine, load_guests, summarize
+from app.db.database import async_session_maker
+from app.db.models import Guest
+from app.rsvp_index import rsvp_index
+
+
+async def _time(lookup, codes: list[str], lookups: int, rng: random.Random) -> dict:
+    samples = []
+    for _ in range(lookups):
+        code = rng.choice(codes)
+        started = time.perf_counter()
+        await lookup(code)
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+async def main(guests: int, lookups: int) -> None:
+    await load_guests(guests)
+    await rsvp_index.reload()
+    rng = random.Random(guests)
+    async with async_session_maker() as session:
+        codes = list((await session.execute(select(Guest.rsvp_code))).scalars())
+        unknown = [f"ZZ{i:06d}" for i in range(50)]
+
+        async def database(code):
+            (await session.execute(select(Guest).where(Guest.rsvp_code == code))).scalar_one_or_none()
+
+        async def index(code):
+            await rsvp_index.lookup(session, code)
+
+        results = {
+            "database": await _time(database, codes, lookups, rng),
+            "index_hit": await _time(index, codes, lookups, rng),
+            "index_unknown": await _time(index, unknown, lookups, rng),
+        }
+    await engine.dispose()
+    print(json.dumps({"benchmark": "rsvp_lookup", "guests": guests, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guests", type=int, default=10000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.guests, args.lookups))
@@ -0,0 +1,53 @@
+"""Guest search latency versus guest-list size.
+
+Loads 1k, 10k and 100k generated guests and times the exact query
+``GET /api/guests?search=...`` builds, in both search modes, with a mix of
+prefixes, accent-free spellings and typos. Prints one JSON document; with the
+trigram index in place the per-size percentiles should stay roughly flat.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_search [--sizes 1000,10000] [--queries 200]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.common import engine, load_guests, summarize
+from app.api.guests import SearchMode, build_guest_query
+
+TERMS = {
+    SearchMode.CONTAINS: ["dup", "helene", "HELENE", "lefevre", "smith", "احمد", "alaoui", "@example.com"],
+    SearchMode.FUZZY: ["Helen Dupon", "Francois", "Mohammed", "Jhonson", "Berrda", "محمد العلوى", "Yasmin"],
+}
+PAGE_SIZE = 50
+
+
+async def time_queries(mode: SearchMode, queries: int, rng: random.Random) -> dict:
+    samples = []
+    async with engine.connect() as conn:
+        for _ in range(queries):
+            query = build_guest_query(search=rng.choice(TERMS[mode]), search_mode=mode).limit(PAGE_SIZE)
+            started = time.perf_counter()
+            (await conn.execute(query)).all()
+            samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+async def main(sizes: list[int], queries: int) -> None:
+    report = {"benchmark": "guest_search", "page_size": PAGE_SIZE, "results": []}
+    for size in sizes:
+        await load_guests(size)
+        for mode in SearchMode:
+            stats = await time_queries(mode, queries, random.Random(size))
+            report["results"].append({"guests": size, "mode": mode.value, **stats})
+    await engine.dispose()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main([int(s) for s in args.sizes.split(",")], args.queries))
@@ -0,0 +1,84 @@
+"""Seating solver: time to plan a wedding of N attending guests.
+
+Generates N guests in family groups (see ``benchmarks.common``), all
+attending, seats ``1 + plus-one`` each, and sizes the room to ``--slack``
+times the seats needed at ``--capacity`` per table. ``--pinned`` of the
+guests are pinned to random tables and ``--keep-apart`` random pairs must sit
+apart. Runs ``solve_seating`` ``--repeat`` times per size and prints one JSON
+document; ``under_one_second`` checks the target for a 1,000-guest plan.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_seating [--guests 1000,5000,20000]
+"""
+import argparse
+import json
+import math
+import random
+import time
+
+from benchmarks.common import generate_guests, summarize
+from app.seating import SeatingGuest, solve_seating
+
+
+def _scenario(count: int, capacity: int, slack: float, pinned: float, keep_apart: int, seed: int):
+    rng = random.Random(seed)
+    records = list(generate_guests(count, seed))
+    seats = sum(2 if record[10] else 1 for record in records)
+    table_count = math.ceil(seats * slack / capacity)
+    guests = [
+        SeatingGuest(
+            id=record[0],
+            name=f"{record[1]} {record[2]}",
+            group_name=record[5],
+            seats=2 if record[10] else 1,
+            pinned_table=rng.randint(1, table_count) if rng.random() < pinned else None,
+        )
+        for record in records
+    ]
+    pairs = [tuple(guest.id for guest in rng.sample(guests, 2)) for _ in range(keep_apart)]
+    return guests, dict.fromkeys(range(1, table_count + 1), capacity), pairs, seats
+
+
+def main(sizes: list[int], capacity: int, slack: float, pinned: float, keep_apart: int, repeat: int, seed: int) -> None:
+    results = []
+    for count in sizes:
+        guests, capacities, pairs, seats = _scenario(count, capacity, slack, pinned, keep_apart, seed)
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            plan = solve_seating(guests, capacities, pairs)
+            samples.append((time.perf_counter() - started) * 1000)
+        apart_violations = sum(plan.assignments.get(a, -1) == plan.assignments.get(b, -2) for a, b in pairs)
+        results.append({
+            "guests": count,
+            "seats": seats,
+            "tables": len(capacities),
+            "seated": len(plan.assignments),
+            "unseated": len(plan.unseated),
+            "warnings": len(plan.warnings),
+            "keep_apart_violations": apart_violations,
+            **summarize(samples),
+        })
+    target = next((result for result in results if result["guests"] == 1000), None)
+    print(json.dumps({
+        "benchmark": "seating",
+        "capacity": capacity,
+        "slack": slack,
+        "results": results,
+        "under_one_second": None if target is None else target["p99_ms"] < 1000,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guests", default="1000,5000,20000")
+    parser.add_argument("--capacity", type=int, default=10)
+    parser.add_argument("--slack", type=float, default=1.1, help="seats available / seats needed")
+    parser.add_argument("--pinned", type=float, default=0.02, help="fraction of guests pinned to a table")
+    parser.add_argument("--keep-apart", type=int, default=50, help="random pairs to keep apart")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(
+        [int(s) for s in args.guests.split(",")], args.capacity, args.slack,
+        args.pinned, args.keep_apart, args.repeat, args.seed,
+    )
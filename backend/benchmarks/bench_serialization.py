@@ -0,0 +1,84 @@
+"""Guest list read path: ORM + Pydantic versus Core rows + orjson.
+
+For each page size, builds the ``GET /api/guests`` response body both ways
+and reports rows per second and, from a separate tracemalloc pass, the peak
+memory allocated while serving one request:
+
+* ``orm_pydantic`` -- the previous path: ``select(Guest)`` hydrated into ORM
+  objects, copied into ``GuestResponse`` models, validated again as the
+  ``response_model`` and rendered with ``json.dumps`` (what FastAPI does);
+* ``core_orjson`` -- the current path: the response columns as Core rows,
+  encoded by ``app.encoding.dumps``.
+
+Prints one JSON document.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.bench_serialization [--sizes 50,500,5000] [--requests 50]
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from benchmarks.common import engine, load_guests
+from app.api.guests import GUEST_RESPONSE_COLUMNS, GuestResponse, NAME_ORDER, _guest_to_response
+from app.db.database import async_session_maker
+from app.db.models import Guest
+from app.encoding import dumps
+
+_response_adapter = TypeAdapter(list[GuestResponse])
+
+
+async def orm_pydantic(limit: int) -> bytes:
+    async with async_session_maker() as session:
+        guests = (await session.execute(select(Guest).order_by(*NAME_ORDER).limit(limit))).scalars().all()
+        content = [_guest_to_response(g) for g in guests]
+        validated = _response_adapter.validate_python(content, from_attributes=True)
+        payload = _response_adapter.dump_python(validated, mode="json")
+        return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+async def core_orjson(limit: int) -> bytes:
+    async with async_session_maker() as session:
+        rows = (await session.execute(select(*GUEST_RESPONSE_COLUMNS).order_by(*NAME_ORDER).limit(limit))).all()
+        return dumps([row._asdict() for row in rows])
+
+
+async def measure(path, limit: int, requests: int) -> dict:
+    await path(limit)  # warm up statement caches
+    started = time.perf_counter()
+    for _ in range(requests):
+        await path(limit)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    await path(limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "rows_per_second": round(limit * requests / elapsed),
+        "ms_per_request": round(elapsed / requests * 1000, 3),
+        "peak_kib_per_request": round(peak / 1024, 1),
+    }
+
+
+async def main(sizes: list[int], requests: int) -> None:
+    await load_guests(max(sizes))
+    assert await orm_pydantic(50) == await core_orjson(50), "paths must produce identical JSON"
+    results = []
+    for limit in sizes:
+        for path in (orm_pydantic, core_orjson):
+            results.append({"page_size": limit, "path": path.__name__, **await measure(path, limit, requests)})
+    await engine.dispose()
+    print(json.dumps({"benchmark": "guest_serialization", "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="50,500,5000")
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main([int(s) for s in args.sizes.split(",")], args.requests))
@@ -0,0 +1,83 @@
+"""Check that a card archive survives guests being deleted while it streams.
+
+Renders every card of a small dataset through ``stream_card_archive`` and,
+once the first cards are in the archive, deletes a guest whose card has not
+been saved yet -- as an admin removing a guest mid-download would. The
+archive must still complete as a valid ZIP of every card, the deleted guest
+must have no stored card and every other guest must. Prints one JSON
+document and exits with status 1 on any failure.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.check_cards [--guests 60]
+"""
+import argparse
+import asyncio
+import io
+import json
+import sys
+import zipfile
+
+from sqlalchemy import delete, func, select, text
+
+from benchmarks.bench_cards import _cards
+from benchmarks.common import engine, load_guests
+from app.cards import close_card_renderer, stream_card_archive
+from app.db.database import async_session_maker
+from app.db.models import Guest, InvitationCard
+
+
+async def main(count: int) -> int:
+    await load_guests(count)
+    async with async_session_maker() as session:
+        await session.execute(text("TRUNCATE invitation_cards"))
+        await session.commit()
+    cards = await _cards()
+    # Cards are saved every CARD_DB_CHUNK cards or at the end, so the last
+    # guest's card is still unsaved once the first cards are streamed.
+    removed = cards[-1].guest_id
+    deleted_at = None
+
+    body = io.BytesIO()
+    failures = []
+    try:
+        async for chunk in stream_card_archive(cards, {}):
+            body.write(chunk)
+            if deleted_at is None and body.tell():
+                async with async_session_maker() as session:
+                    await session.execute(delete(Guest).where(Guest.id == removed))
+                    await session.commit()
+                deleted_at = body.tell()
+    except Exception as e:
+        failures.append(f"archive failed: {e!r}")
+    finally:
+        close_card_renderer()
+
+    try:
+        entries = len(zipfile.ZipFile(body).namelist())
+    except zipfile.BadZipFile as e:
+        entries = 0
+        failures.append(f"archive is not a valid ZIP: {e}")
+    if entries != len(cards):
+        failures.append(f"archive has {entries} cards, expected {len(cards)}")
+    async with async_session_maker() as session:
+        stored = (await session.execute(select(func.count()).select_from(InvitationCard))).scalar_one()
+        orphan = (await session.execute(
+            select(func.count()).select_from(InvitationCard).where(InvitationCard.guest_id == removed)
+        )).scalar_one()
+    if orphan:
+        failures.append("a card was stored for the deleted guest")
+    if stored != len(cards) - 1:
+        failures.append(f"{stored} cards stored, expected {len(cards) - 1}")
+    await engine.dispose()
+
+    print(json.dumps({
+        "benchmark": "check_cards", "guests": count, "deleted_after_bytes": deleted_at,
+        "archive_cards": entries, "stored_cards": stored, "failures": failures,
+    }, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guests", type=int, default=60, help="fewer than CARD_DB_CHUNK")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.guests)))
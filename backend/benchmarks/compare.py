@@ -0,0 +1,64 @@
+"""Compare two ``benchmarks.load_test`` reports, e.g. from two commits.
+
+For every (scenario, guests, endpoint) present in both reports, prints the
+p95 latency and queries per request before and after as one JSON document.
+An endpoint regresses when its p95 grows by more than ``--threshold`` (and by
+at least ``--min-ms``, so sub-millisecond noise is ignored) or when it runs
+more queries per request; exits with status 1 if anything regressed.
+
+    python -m benchmarks.compare base.json head.json [--threshold 0.2] [--min-ms 2]
+"""
+import argparse
+import json
+import sys
+
+
+def _endpoints(report: dict) -> dict[tuple[str, int, str], dict]:
+    return {
+        (result["scenario"], result["guests"], endpoint): stats
+        for result in report["results"]
+        for endpoint, stats in {"overall": result["overall"], **result["endpoints"]}.items()
+    }
+
+
+def compare(base: dict, head: dict, threshold: float, min_ms: float) -> list[dict]:
+    before, after = _endpoints(base), _endpoints(head)
+    rows = []
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        p95_change = new["p95_ms"] - old["p95_ms"]
+        slower = p95_change > max(min_ms, old["p95_ms"] * threshold)
+        more_queries = new["queries_per_request"] > old["queries_per_request"]
+        scenario, guests, endpoint = key
+        rows.append({
+            "scenario": scenario,
+            "guests": guests,
+            "endpoint": endpoint,
+            "p95_ms": [old["p95_ms"], new["p95_ms"]],
+            "p95_change": round(p95_change / old["p95_ms"], 3) if old["p95_ms"] else None,
+            "queries_per_request": [old["queries_per_request"], new["queries_per_request"]],
+            "regressed": slower or more_queries,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative p95 increase")
+    parser.add_argument("--min-ms", type=float, default=2.0, help="ignore p95 increases below this")
+    args = parser.parse_args()
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    rows = compare(base, head, args.threshold, args.min_ms)
+    regressions = [row for row in rows if row["regressed"]]
+    print(json.dumps({
+        "base": base.get("commit"),
+        "head": head.get("commit"),
+        "regressions": len(regressions),
+        "endpoints": rows,
+    }, indent=2))
+    sys.exit(1 if regressions else 0)
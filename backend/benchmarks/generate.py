@@ -0,0 +1,51 @@
+"""Load a synthetic guest list (and the event programme) into the bench database.
+
+Guests come in family groups with French/English/Arabic names, languages,
+RSVP statuses and plus-ones following the weights in ``benchmarks.common``;
+the same ``--seed`` always produces the same guests. Prints the resulting
+distribution as one JSON document.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.generate [--guests 10000] [--seed 42]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import text
+
+from benchmarks.common import engine, load_events, load_guests
+
+
+async def _distribution(column: str) -> dict[str, int]:
+    async with engine.connect() as conn:
+        rows = await conn.execute(text(f"SELECT {column}::text, count(*) FROM guests GROUP BY 1 ORDER BY 1"))
+        return {value: count for value, count in rows}
+
+
+async def main(guests: int, seed: int) -> None:
+    started = time.perf_counter()
+    await load_guests(guests, seed)
+    await load_events()
+    elapsed = time.perf_counter() - started
+    async with engine.connect() as conn:
+        groups = (await conn.execute(text("SELECT count(DISTINCT group_name) FROM guests"))).scalar_one()
+    report = {
+        "guests": guests,
+        "seed": seed,
+        "load_seconds": round(elapsed, 2),
+        "groups": groups,
+        "rsvp_status": await _distribution("rsvp_status"),
+        "language": await _distribution("language"),
+        "plus_one_allowed": await _distribution("plus_one_allowed"),
+    }
+    await engine.dispose()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guests", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(main(args.guests, args.seed))
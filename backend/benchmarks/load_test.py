@@ -0,0 +1,299 @@
+"""Scripted traffic mixes against the ASGI app, reported per endpoint.
+
+Starts the app's lifespan once; then for every dataset size and scenario,
+reloads the generated guests (see ``benchmarks.generate``) and has ``--users``
+virtual users send ``--requests`` requests in total, each picking its next
+operation from the scenario's weighted mix with its own seeded RNG:
+
+* ``invitation_surge`` -- invitations just went out: guests open their RSVP
+  link, answer it and glance at the timeline, each from their own device;
+* ``admin_browsing`` -- the couple pages through, searches, filters and
+  edits the guest list and checks the stats;
+* ``wedding_day`` -- check-in desk: search a guest by name, open them and
+  record their arrival, with the dashboard and timeline open on the side.
+
+Reports p50/p95/p99 latency, throughput, status codes and queries per
+request (overall and per endpoint) as one JSON document, which
+``benchmarks.compare`` diffs across commits. ``nfr_2_met`` records whether
+every endpoint's p95 stays under SPEC NFR-2's 200ms.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.load_test \\
+        [--guests 1000,10000,100000] [--scenarios invitation_surge,...] \\
+        [--users 20] [--requests 2000] [--seed 42] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+import httpx
+from sqlalchemy import select, text
+
+from benchmarks.common import engine, load_events, load_guests, summarize
+from app.auth import passwords
+from app.db.database import async_session_maker
+from app.db.instrumentation import track_queries
+from app.db.models import Guest, User
+from app.live import guest_hub
+from app.main import app
+from app.rsvp_index import rsvp_index
+
+EMAIL = "bench-admin@wedding.local"
+PASSWORD = "bench-password"
+NFR_2_P95_MS = 200
+# A guest's device makes a handful of requests; give each its own client IP
+# so per-IP admission limits behave as they would in production.
+REQUESTS_PER_DEVICE = 5
+
+
+@dataclass
+class Dataset:
+    codes: list[str]
+    guest_ids: list[str]
+    last_names: list[str]
+    token: str
+
+
+@dataclass
+class VirtualUser:
+    index: int
+    rng: random.Random
+    dataset: Dataset
+    admin: httpx.AsyncClient
+    device: Optional[httpx.AsyncClient] = None
+    device_requests: int = 0
+    devices: int = 0
+
+    async def public(self) -> httpx.AsyncClient:
+        """The current guest device's client, switching devices every few requests."""
+        if self.device is None or self.device_requests >= REQUESTS_PER_DEVICE:
+            if self.device is not None:
+                await self.device.aclose()
+            self.devices += 1
+            host = self.index * 10_000 + self.devices
+            self.device = _client(f"10.{host >> 16 & 255}.{host >> 8 & 255}.{host & 255}")
+            self.device_requests = 0
+        self.device_requests += 1
+        return self.device
+
+    async def close(self) -> None:
+        if self.device is not None:
+            await self.device.aclose()
+
+
+Operation = Callable[[VirtualUser], Awaitable[httpx.Response]]
+
+
+async def rsvp_lookup(user: VirtualUser) -> httpx.Response:
+    code = user.rng.choice(user.dataset.codes)
+    return await (await user.public()).get(f"/api/rsvp/lookup/{code}")
+
+
+async def rsvp_submit(user: VirtualUser) -> httpx.Response:
+    attending = user.rng.random() < 0.8
+    return await (await user.public()).post("/api/rsvp/submit", json={
+        "rsvp_code": user.rng.choice(user.dataset.codes),
+        "rsvp_status": "attending" if attending else "not_attending",
+        "plus_one_attending": attending and user.rng.random() < 0.3,
+        "dietary_restrictions": "Vegetarian" if user.rng.random() < 0.1 else None,
+    })
+
+
+async def timeline(user: VirtualUser) -> httpx.Response:
+    lang = user.rng.choice(["fr", "en", "ar"])
+    return await (await user.public()).get("/api/events", params={"lang": lang})
+
+
+async def guest_list(user: VirtualUser) -> httpx.Response:
+    params = {"limit": 50}
+    status = user.rng.choice([None, None, "attending", "pending", "not_attending"])
+    if status:
+        params["rsvp_status"] = status
+    return await user.admin.get("/api/guests", params=params)
+
+
+async def guest_search(user: VirtualUser) -> httpx.Response:
+    name = user.rng.choice(user.dataset.last_names)
+    return await user.admin.get("/api/guests", params={"search": name[:4], "limit": 50})
+
+
+async def guest_stats(user: VirtualUser) -> httpx.Response:
+    return await user.admin.get("/api/guests/stats")
+
+
+async def guest_detail(user: VirtualUser) -> httpx.Response:
+    return await user.admin.get(f"/api/guests/{user.rng.choice(user.dataset.guest_ids)}")
+
+
+async def guest_update(user: VirtualUser) -> httpx.Response:
+    return await user.admin.patch(
+        f"/api/guests/{user.rng.choice(user.dataset.guest_ids)}",
+        json={"table_number": user.rng.randint(1, 40)},
+    )
+
+
+async def guest_check_in(user: VirtualUser) -> httpx.Response:
+    return await user.admin.patch(
+        f"/api/guests/{user.rng.choice(user.dataset.guest_ids)}",
+        json={"notes": f"Checked in {user.rng.randint(17, 23)}h{user.rng.randint(0, 59):02d}"},
+    )
+
+
+async def events_all(user: VirtualUser) -> httpx.Response:
+    return await user.admin.get("/api/events/all")
+
+
+SCENARIOS: dict[str, list[tuple[Operation, int]]] = {
+    "invitation_surge": [(rsvp_lookup, 60), (rsvp_submit, 25), (timeline, 15)],
+    "admin_browsing": [
+        (guest_list, 35), (guest_search, 20), (guest_stats, 20),
+        (guest_detail, 15), (guest_update, 5), (events_all, 5),
+    ],
+    "wedding_day": [
+        (guest_search, 40), (guest_detail, 25), (guest_check_in, 20),
+        (guest_stats, 10), (timeline, 5),
+    ],
+}
+
+
+def _client(ip: str, token: Optional[str] = None) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, client=(ip, 40000))
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    return httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=60)
+
+
+@dataclass
+class Samples:
+    latency_ms: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+
+    def report(self) -> dict:
+        return {
+            **summarize(self.latency_ms),
+            "queries_per_request": round(sum(self.queries) / len(self.queries), 2),
+            "max_queries": max(self.queries),
+            "status_codes": {str(code): n for code, n in sorted(self.statuses.items())},
+        }
+
+
+async def _seed(guests: int, seed: int) -> Dataset:
+    await load_guests(guests, seed)
+    await load_events()
+    async with async_session_maker() as session:
+        await session.execute(text("DELETE FROM users WHERE email = :email"), {"email": EMAIL})
+        session.add(User(email=EMAIL, password_hash=passwords.hash_password(PASSWORD), name="Bench"))
+        await session.commit()
+        rows = (await session.execute(select(Guest.rsvp_code, Guest.id, Guest.last_name))).all()
+    # The tables were replaced behind the app's back: rebuild its per-worker state.
+    await rsvp_index.reload()
+    await guest_hub.stop()
+    guest_hub.start()
+    async with _client("10.255.0.1") as client:
+        response = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        response.raise_for_status()
+    return Dataset(
+        codes=[row.rsvp_code for row in rows],
+        guest_ids=[str(row.id) for row in rows],
+        last_names=sorted({row.last_name for row in rows}),
+        token=response.json()["access_token"],
+    )
+
+
+async def _run_user(user: VirtualUser, mix, requests: int, warmup: int, samples: dict) -> None:
+    operations, weights = zip(*mix)
+    for i in range(warmup + requests):
+        operation = user.rng.choices(operations, weights)[0]
+        with track_queries() as queries:
+            started = time.perf_counter()
+            response = await operation(user)
+            elapsed = (time.perf_counter() - started) * 1000
+        if i < warmup:
+            continue
+        for key in (operation.__name__, "overall"):
+            samples[key].latency_ms.append(elapsed)
+            samples[key].queries.append(queries.count)
+            samples[key].statuses[response.status_code] += 1
+
+
+async def run_scenario(name: str, guests: int, users: int, requests: int, warmup: int, seed: int) -> dict:
+    dataset = await _seed(guests, seed)
+    samples: dict[str, Samples] = defaultdict(Samples)
+    async with _client("10.255.0.1", dataset.token) as admin:
+        virtual_users = [
+            VirtualUser(index=i, rng=random.Random(f"{seed}-{name}-{i}"), dataset=dataset, admin=admin)
+            for i in range(users)
+        ]
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _run_user(user, SCENARIOS[name], requests // users, warmup, samples)
+            for user in virtual_users
+        ))
+        elapsed = time.perf_counter() - started
+        for user in virtual_users:
+            await user.close()
+
+    overall = samples.pop("overall")
+    endpoints = {endpoint: samples[endpoint].report() for endpoint in sorted(samples)}
+    return {
+        "scenario": name,
+        "guests": guests,
+        "users": users,
+        "requests": len(overall.latency_ms),
+        "throughput_rps": round((len(overall.latency_ms) + users * warmup) / elapsed, 1),
+        "overall": overall.report(),
+        "endpoints": endpoints,
+        "nfr_2_met": all(report["p95_ms"] < NFR_2_P95_MS for report in endpoints.values()),
+    }
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main(sizes: list[int], scenarios: list[str], users: int, requests: int, warmup: int, seed: int, output: str) -> None:
+    results = []
+    async with app.router.lifespan_context(app):
+        for guests in sizes:
+            for name in scenarios:
+                results.append(await run_scenario(name, guests, users, requests, warmup, seed))
+    await engine.dispose()
+    report = json.dumps({
+        "benchmark": "load_test",
+        "commit": _commit(),
+        "seed": seed,
+        "results": results,
+    }, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guests", default="1000,10000,100000")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per user first")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    asyncio.run(main(
+        [int(s) for s in args.guests.split(",")], args.scenarios.split(","),
+        args.users, args.requests, args.warmup, args.seed, args.output,
+    ))
@@ -0,0 +1,120 @@
+"""Check every endpoint against its query budget.
+
+Seeds a small dataset, calls each endpoint in ``BUDGETS`` once to warm the
+per-worker caches (principal cache, RSVP index, timeline), then again inside
+``assert_max_queries``. Prints one JSON document and exits with status 1 if
+any endpoint ran more statements than its budget -- e.g. an authenticated
+call that starts loading the user again, or stats that aggregate the guests
+table. Lower a budget when an endpoint gets cheaper.
+
+    BENCH_DATABASE_URL=... python -m benchmarks.query_budgets
+"""
+import asyncio
+import json
+import sys
+
+import httpx
+from sqlalchemy import select, text
+
+from benchmarks.common import engine, load_events, load_guests
+from app.auth import passwords
+from app.db.database import async_session_maker
+from app.db.instrumentation import assert_max_queries
+from app.db.models import Event, Guest, NotificationChannel, User
+from app.main import app
+from app.transports import Transport, register_transport
+
+EMAIL = "bench-admin@wedding.local"
+PASSWORD = "bench-password"
+
+# (method, path template, request body, max statements on a warm worker)
+BUDGETS = [
+    ("GET", "/api/auth/me", None, 0),
+    ("GET", "/api/guests?limit=50", None, 1),
+    ("GET", "/api/guests?search=dupo&limit=50", None, 1),
+    ("GET", "/api/guests/stats", None, 1),
+    ("GET", "/api/guests/facets", None, 1),
+    ("GET", "/api/guests/facets?search=a&rsvp_status=attending&group_name=Budget", None, 1),
+    ("GET", "/api/guests/stats/responses", None, 2),
+    ("GET", "/api/guests/{guest_id}", None, 1),
+    ("GET", "/api/guests/{guest_id}/responses", None, 1),
+    ("PATCH", "/api/guests/{guest_id}", {"table_number": 7}, 1),
+    ("POST", "/api/guests", {"first_name": "Budget", "last_name": "Check"}, 4),
+    ("POST", "/api/guests/seating", {"table_count": 30, "table_capacity": 10}, 3),
+    ("POST", "/api/guests/batch", {"ids": ["{guest_id}"], "update": {"group_name": "Budget"}}, 1),
+    ("POST", "/api/guests/batch", {"filter": {"group_name": "Budget"}, "update": {"table_number": 3}}, 1),
+    ("POST", "/api/guests/cards", {"ids": ["{guest_id}"]}, 2),
+    ("GET", "/api/events", None, 0),
+    ("GET", "/api/events/all", None, 1),
+    ("PATCH", "/api/events/{event_id}", {"location": "Riad Example"}, 1),
+    ("POST", "/api/events/batch", {"ids": ["{event_id}"], "update": {"is_visible": True}}, 1),
+    ("POST", "/api/events/reorder", {"ids": ["{event_id}"]}, 1),
+    ("GET", "/api/rsvp/lookup/{rsvp_code}", None, 0),
+    ("POST", "/api/rsvp/submit", {"rsvp_code": "{rsvp_code}", "rsvp_status": "attending"}, 1),
+    ("GET", "/api/rsvp/party/{rsvp_code}", None, 0),
+    ("POST", "/api/rsvp/party/submit",
+     {"rsvp_code": "{rsvp_code}", "members": [{"guest_id": "{guest_id}", "rsvp_status": "attending"}]}, 1),
+    ("GET", "/api/parties", None, 1),
+    ("POST", "/api/notifications", {"kind": "invitation", "guest_ids": ["{guest_id}"]}, 1),
+    ("GET", "/api/notifications?status=queued", None, 1),
+    ("GET", "/api/notifications/summary", None, 1),
+    ("POST", "/api/notifications/retry", {}, 1),
+]
+
+
+async def _seed() -> dict[str, str]:
+    await load_guests(200)
+    await load_events()
+    async with async_session_maker() as session:
+        await session.execute(text("DELETE FROM users WHERE email = :email"), {"email": EMAIL})
+        session.add(User(email=EMAIL, password_hash=passwords.hash_password(PASSWORD), name="Bench"))
+        await session.commit()
+        guest = (await session.execute(select(Guest.id, Guest.rsvp_code).limit(1))).one()
+        event_id = (await session.execute(select(Event.id).limit(1))).scalar_one()
+    return {"guest_id": str(guest.id), "rsvp_code": guest.rsvp_code, "event_id": str(event_id)}
+
+
+class _DiscardTransport(Transport):
+    """Accepts every message, so queuing email works without an SMTP server."""
+
+    async def send_many(self, messages):
+        return [None] * len(messages)
+
+
+def _fill(value, ids: dict[str, str]):
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, ids) for item in value]
+    return value
+
+
+async def main() -> int:
+    ids = await _seed()
+    register_transport(NotificationChannel.EMAIL, _DiscardTransport())
+    results = []
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            response = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+            for method, path, body, budget in BUDGETS:
+                url, payload = _fill(path, ids), _fill(body, ids)
+                (await client.request(method, url, json=payload)).raise_for_status()
+                result = {"endpoint": f"{method} {path}", "budget": budget}
+                try:
+                    with assert_max_queries(budget) as tracker:
+                        (await client.request(method, url, json=payload)).raise_for_status()
+                except AssertionError as e:
+                    result["error"] = str(e)
+                result["queries"] = tracker.count
+                results.append(result)
+    await engine.dispose()
+    failures = [result for result in results if "error" in result]
+    print(json.dumps({"benchmark": "query_budgets", "failures": len(failures), "results": results}, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
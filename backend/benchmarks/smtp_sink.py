@@ -0,0 +1,135 @@
+"""A local stand-in SMTP server that accepts and counts messages without delivering them.
+
+Speaks just enough ESMTP for ``smtplib`` (EHLO/HELO, MAIL, RCPT, DATA, RSET,
+NOOP, QUIT) and can act like a slow or flaky relay: ``--delay`` seconds per
+message, ``--fail-rate`` of messages answered with a transient ``451``, and
+recipients at ``--reject-domain`` refused with a permanent ``550``. Used by
+``benchmarks.bench_dispatch``; run it on its own to try the dispatch queue
+locally (``SMTP_HOST=127.0.0.1 SMTP_PORT=1025``) -- it prints one line per
+message:
+
+    python -m benchmarks.smtp_sink [--port 1025] [--delay 0.02] [--fail-rate 0.05]
+"""
+import argparse
+import asyncio
+import random
+from email import message_from_bytes, policy
+from typing import Callable, NamedTuple, Optional
+
+
+class SinkMessage(NamedTuple):
+    sender: str
+    recipients: list[str]
+    data: bytes
+
+    @property
+    def subject(self) -> str:
+        return str(message_from_bytes(self.data, policy=policy.default)["Subject"] or "")
+
+
+class SMTPSink:
+    def __init__(
+        self,
+        delay: float = 0.0,
+        fail_rate: float = 0.0,
+        reject_domain: Optional[str] = None,
+        seed: int = 42,
+        on_message: Optional[Callable[[SinkMessage], None]] = None,
+    ):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.reject_domain = reject_domain
+        self.on_message = on_message
+        self.messages: list[SinkMessage] = []
+        self.transient_failures = 0
+        self.rejected = 0
+        self.connections = 0
+        self._rng = random.Random(seed)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        """Listen on ``host:port`` (0: any free port, see ``server.sockets``)."""
+        return await asyncio.start_server(self._session, host, port)
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+
+        def reply(text: str) -> None:
+            writer.write(text.encode("ascii") + b"\r\n")
+
+        reply("220 smtp-sink ESMTP")
+        sender, recipients = "", []
+        try:
+            while line := await reader.readline():
+                command, _, argument = line.decode("utf-8", "replace").strip().partition(" ")
+                command = command.upper()
+                if command == "EHLO":
+                    reply("250-smtp-sink\r\n250-8BITMIME\r\n250 SMTPUTF8")
+                elif command == "HELO":
+                    reply("250 smtp-sink")
+                elif command == "MAIL":
+                    sender, recipients = argument.partition(":")[2].strip().split(" ")[0].strip("<>"), []
+                    reply("250 OK")
+                elif command == "RCPT":
+                    recipient = argument.partition(":")[2].strip().strip("<>")
+                    if self.reject_domain and recipient.endswith("@" + self.reject_domain):
+                        self.rejected += 1
+                        reply("550 No such user")
+                    else:
+                        recipients.append(recipient)
+                        reply("250 OK")
+                elif command == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    data = bytearray()
+                    while (chunk := await reader.readline()) not in (b".\r\n", b""):
+                        data += chunk[1:] if chunk.startswith(b"..") else chunk
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                    if self._rng.random() < self.fail_rate:
+                        self.transient_failures += 1
+                        reply("451 Try again later")
+                    else:
+                        message = SinkMessage(sender, recipients, bytes(data))
+                        self.messages.append(message)
+                        if self.on_message:
+                            self.on_message(message)
+                        reply("250 Queued")
+                    sender, recipients = "", []
+                elif command in ("RSET", "NOOP"):
+                    sender, recipients = ("", []) if command == "RSET" else (sender, recipients)
+                    reply("250 OK")
+                elif command == "QUIT":
+                    reply("221 Bye")
+                    break
+                else:
+                    reply("502 Command not implemented")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def main(host: str, port: int, delay: float, fail_rate: float, reject_domain: Optional[str]) -> None:
+    sink = SMTPSink(
+        delay, fail_rate, reject_domain,
+        on_message=lambda message: print(f"{', '.join(message.recipients)}: {message.subject}", flush=True),
+    )
+    server = await sink.start(host, port)
+    print(f"smtp-sink listening on {host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to hold each message")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of messages answered 451")
+    parser.add_argument("--reject-domain", help="refuse recipients at this domain with 550")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.host, args.port, args.delay, args.fail_rate, args.reject_domain))
+    except KeyboardInterrupt:
+        pass
@@ -1,6 +1,6 @@
 import axios from 'axios'
 
-const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
+export const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
 
 export const api = axios.create({
   baseURL: API_URL,
@@ -83,6 +83,14 @@ export const guestsAPI = {
     const response = await api.get('/api/guests/stats')
     return response.data
   },
+  facets: async (filters?: { search?: string; rsvp_status?: string; group_name?: string }) => {
+    const response = await api.get('/api/guests/facets', { params: filters })
+    return response.data
+  },
+  cards: async (filter?: { search?: string; rsvp_status?: string; group_name?: string }) => {
+    const response = await api.post('/api/guests/cards', { filter }, { responseType: 'blob' })
+    return response.data as Blob
+  },
 }
 
 export const eventsAPI = {
@@ -124,4 +132,23 @@ export const rsvpAPI = {
     const response = await api.post('/api/rsvp/submit', data)
     return response.data
   },
+  // Whole household for a party code or any member's own code.
+  lookupParty: async (code: string) => {
+    const response = await api.get(`/api/rsvp/party/${code}`)
+    return response.data
+  },
+  submitParty: async (data: {
+    rsvp_code: string
+    message?: string
+    members: {
+      guest_id: string
+      rsvp_status: string
+      plus_one_name?: string
+      plus_one_attending?: boolean
+      dietary_restrictions?: string
+    }[]
+  }) => {
+    const response = await api.post('/api/rsvp/party/submit', data)
+    return response.data
+  },
 }
@@ -31,6 +31,7 @@ const resources = {
       'actions': 'Actions',
       'search': 'Search...',
       'add_guest': 'Add Guest',
+      'print_cards': 'Print cards',
       'edit': 'Edit',
       'delete': 'Delete',
       'save': 'Save',
@@ -90,6 +91,7 @@ const resources = {
       'actions': 'Actions',
       'search': 'Rechercher...',
       'add_guest': 'Ajouter un invite',
+      'print_cards': 'Imprimer les cartes',
       'edit': 'Modifier',
       'delete': 'Supprimer',
       'save': 'Enregistrer',
@@ -149,6 +151,7 @@ const resources = {
       'actions': 'إجراءات',
       'search': 'بحث...',
       'add_guest': 'إضافة مدعو',
+      'print_cards': 'طباعة البطاقات',
       'edit': 'تعديل',
       'delete': 'حذف',
       'save': 'حفظ',
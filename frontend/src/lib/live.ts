@@ -0,0 +1,33 @@
+import { useEffect } from 'react'
+import { useQueryClient } from '@tanstack/react-query'
+import { API_URL } from './api'
+
+/**
+ * Subscribe to GET /api/guests/live (Server-Sent Events) while mounted.
+ *
+ * `stats` events replace the cached guest stats, `guest` events mark guest
+ * lists stale, and `resync` refetches both. EventSource reconnects by itself.
+ */
+export function useLiveGuestUpdates() {
+  const queryClient = useQueryClient()
+
+  useEffect(() => {
+    const token = localStorage.getItem('auth_token')
+    if (!token) return
+
+    const source = new EventSource(
+      `${API_URL}/api/guests/live?access_token=${encodeURIComponent(token)}`
+    )
+    source.addEventListener('stats', (event) => {
+      queryClient.setQueryData(['guest-stats'], JSON.parse((event as MessageEvent).data))
+    })
+    source.addEventListener('guest', () => {
+      queryClient.invalidateQueries({ queryKey: ['guests'] })
+    })
+    source.addEventListener('resync', () => {
+      queryClient.invalidateQueries({ queryKey: ['guests'] })
+    })
+
+    return () => source.close()
+  }, [queryClient])
+}
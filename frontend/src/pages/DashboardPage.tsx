@@ -1,6 +1,7 @@
 import { useQuery } from '@tanstack/react-query'
 import { useTranslation } from 'react-i18next'
 import { guestsAPI } from '../lib/api'
+import { useLiveGuestUpdates } from '../lib/live'
 import {
   UsersIcon,
   CheckCircleIcon,
@@ -12,6 +13,7 @@ import {
 
 export default function DashboardPage() {
   const { t } = useTranslation()
+  useLiveGuestUpdates()
   const { data: stats, isLoading } = useQuery({
     queryKey: ['guest-stats'],
     queryFn: guestsAPI.stats,
@@ -2,7 +2,8 @@ import { useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { useTranslation } from 'react-i18next'
 import { guestsAPI } from '../lib/api'
-import { PlusIcon, PencilIcon, TrashIcon } from '@heroicons/react/24/outline'
+import { useLiveGuestUpdates } from '../lib/live'
+import { PlusIcon, PencilIcon, TrashIcon, PrinterIcon } from '@heroicons/react/24/outline'
 
 interface Guest {
   id: string
@@ -23,6 +24,20 @@ interface Guest {
   notes: string | null
 }
 
+interface FacetCount {
+  value: string | number | null
+  count: number
+}
+
+interface GuestFacets {
+  total: number
+  rsvp_status: FacetCount[]
+  group_name: FacetCount[]
+}
+
+const facetCount = (facets: FacetCount[] | undefined, value: string) =>
+  facets?.find((facet) => facet.value === value)?.count ?? 0
+
 const statusColors: Record<string, string> = {
   attending: 'bg-green-100 text-green-800',
   not_attending: 'bg-red-100 text-red-800',
@@ -32,8 +47,10 @@ const statusColors: Record<string, string> = {
 export default function GuestsPage() {
   const { t } = useTranslation()
   const queryClient = useQueryClient()
+  useLiveGuestUpdates()
   const [search, setSearch] = useState('')
   const [filterStatus, setFilterStatus] = useState('')
+  const [filterGroup, setFilterGroup] = useState('')
   const [showModal, setShowModal] = useState(false)
   const [editingGuest, setEditingGuest] = useState<Guest | null>(null)
   const [form, setForm] = useState({
@@ -49,14 +66,42 @@ export default function GuestsPage() {
   })
 
   const { data: guests = [], isLoading } = useQuery({
-    queryKey: ['guests', search, filterStatus],
+    queryKey: ['guests', search, filterStatus, filterGroup],
     queryFn: () =>
       guestsAPI.list({
         search: search || undefined,
         rsvp_status: filterStatus || undefined,
+        group_name: filterGroup || undefined,
+      }),
+  })
+
+  const { data: facets } = useQuery<GuestFacets>({
+    queryKey: ['guests', 'facets', search, filterStatus, filterGroup],
+    queryFn: () =>
+      guestsAPI.facets({
+        search: search || undefined,
+        rsvp_status: filterStatus || undefined,
+        group_name: filterGroup || undefined,
       }),
   })
 
+  const cardsMutation = useMutation({
+    mutationFn: () =>
+      guestsAPI.cards({
+        search: search || undefined,
+        rsvp_status: filterStatus || undefined,
+        group_name: filterGroup || undefined,
+      }),
+    onSuccess: (blob) => {
+      const url = URL.createObjectURL(blob)
+      const link = document.createElement('a')
+      link.href = url
+      link.download = 'invitations.zip'
+      link.click()
+      URL.revokeObjectURL(url)
+    },
+  })
+
   const createMutation = useMutation({
     mutationFn: guestsAPI.create,
     onSuccess: () => {
@@ -152,13 +197,23 @@ export default function GuestsPage() {
     <div className="p-6">
       <div className="flex items-center justify-between mb-6">
         <h1 className="text-2xl font-serif font-bold text-gray-900">{t('guests')}</h1>
-        <button
-          onClick={openCreate}
-          className="inline-flex items-center px-4 py-2 border border-transparent rounded-lg shadow-sm text-sm font-medium text-white bg-primary-700 hover:bg-primary-800"
-        >
-          <PlusIcon className="h-5 w-5 mr-1" />
-          {t('add_guest')}
-        </button>
+        <div className="flex gap-3">
+          <button
+            onClick={() => cardsMutation.mutate()}
+            disabled={cardsMutation.isPending}
+            className="inline-flex items-center px-4 py-2 border border-gray-300 rounded-lg shadow-sm text-sm font-medium text-gray-700 bg-white hover:bg-gray-50 disabled:opacity-50"
+          >
+            <PrinterIcon className="h-5 w-5 mr-1" />
+            {t('print_cards')}
+          </button>
+          <button
+            onClick={openCreate}
+            className="inline-flex items-center px-4 py-2 border border-transparent rounded-lg shadow-sm text-sm font-medium text-white bg-primary-700 hover:bg-primary-800"
+          >
+            <PlusIcon className="h-5 w-5 mr-1" />
+            {t('add_guest')}
+          </button>
+        </div>
       </div>
 
       {/* Filters */}
@@ -176,9 +231,25 @@ export default function GuestsPage() {
           className="rounded-lg border-gray-300 shadow-sm focus:border-primary-500 focus:ring-primary-500 text-sm"
         >
           <option value="">{t('status')} - All</option>
-          <option value="pending">{t('pending')}</option>
-          <option value="attending">{t('attending')}</option>
-          <option value="not_attending">{t('not_attending')}</option>
+          {['pending', 'attending', 'not_attending'].map((status) => (
+            <option key={status} value={status}>
+              {t(status)} ({facetCount(facets?.rsvp_status, status)})
+            </option>
+          ))}
+        </select>
+        <select
+          value={filterGroup}
+          onChange={(e) => setFilterGroup(e.target.value)}
+          className="rounded-lg border-gray-300 shadow-sm focus:border-primary-500 focus:ring-primary-500 text-sm"
+        >
+          <option value="">{t('group')} - All</option>
+          {facets?.group_name
+            .filter((facet) => facet.value !== null)
+            .map((facet) => (
+              <option key={String(facet.value)} value={String(facet.value)}>
+                {facet.value} ({facet.count})
+              </option>
+            ))}
         </select>
       </div>
 
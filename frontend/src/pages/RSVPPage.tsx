@@ -3,7 +3,7 @@ import { useParams } from 'react-router-dom'
 import { useTranslation } from 'react-i18next'
 import { rsvpAPI } from '../lib/api'
 
-interface GuestInfo {
+interface MemberInfo {
   id: string
   first_name: string
   last_name: string
@@ -16,21 +16,37 @@ interface GuestInfo {
   language: string
 }
 
+interface PartyInfo {
+  party_id: string | null
+  name: string
+  rsvp_code: string
+  members: MemberInfo[]
+}
+
+interface MemberAnswer {
+  rsvp_status: string
+  plus_one_name: string
+  plus_one_attending: boolean
+  dietary_restrictions: string
+}
+
 export default function RSVPPage() {
   const { code: urlCode } = useParams()
   const { t, i18n } = useTranslation()
   const [code, setCode] = useState(urlCode || '')
-  const [guest, setGuest] = useState<GuestInfo | null>(null)
+  const [party, setParty] = useState<PartyInfo | null>(null)
   const [error, setError] = useState('')
   const [loading, setLoading] = useState(false)
   const [submitted, setSubmitted] = useState(false)
 
-  const [rsvpStatus, setRsvpStatus] = useState('')
-  const [plusOneName, setPlusOneName] = useState('')
-  const [plusOneAttending, setPlusOneAttending] = useState(false)
-  const [dietary, setDietary] = useState('')
+  // One answer per party member, in the order of party.members.
+  const [answers, setAnswers] = useState<MemberAnswer[]>([])
   const [message, setMessage] = useState('')
 
+  const setAnswer = (index: number, changes: Partial<MemberAnswer>) => {
+    setAnswers((current) => current.map((a, i) => (i === index ? { ...a, ...changes } : a)))
+  }
+
   useEffect(() => {
     if (urlCode) {
       handleLookup(urlCode)
@@ -44,37 +60,44 @@ export default function RSVPPage() {
     setLoading(true)
 
     try {
-      const data = await rsvpAPI.lookup(c.trim())
-      setGuest(data)
-      setRsvpStatus(data.rsvp_status)
-      setPlusOneName(data.plus_one_name || '')
-      setPlusOneAttending(data.plus_one_attending)
-      setDietary(data.dietary_restrictions || '')
-      setMessage(data.message || '')
-      if (data.language) {
-        i18n.changeLanguage(data.language)
+      const data: PartyInfo = await rsvpAPI.lookupParty(c.trim())
+      setParty(data)
+      setAnswers(
+        data.members.map((m) => ({
+          rsvp_status: m.rsvp_status === 'pending' ? '' : m.rsvp_status,
+          plus_one_name: m.plus_one_name || '',
+          plus_one_attending: m.plus_one_attending,
+          dietary_restrictions: m.dietary_restrictions || '',
+        }))
+      )
+      setMessage(data.members.find((m) => m.message)?.message || '')
+      if (data.members[0]?.language) {
+        i18n.changeLanguage(data.members[0].language)
       }
     } catch {
       setError('Code not found')
-      setGuest(null)
+      setParty(null)
     } finally {
       setLoading(false)
     }
   }
 
   const handleSubmit = async () => {
-    if (!guest || !rsvpStatus) return
+    if (!party || !allAnswered) return
     setLoading(true)
     setError('')
 
     try {
-      await rsvpAPI.submit({
+      await rsvpAPI.submitParty({
         rsvp_code: code.trim().toUpperCase(),
-        rsvp_status: rsvpStatus,
-        plus_one_name: plusOneName || undefined,
-        plus_one_attending: plusOneAttending,
-        dietary_restrictions: dietary || undefined,
         message: message || undefined,
+        members: party.members.map((m, i) => ({
+          guest_id: m.id,
+          rsvp_status: answers[i].rsvp_status,
+          plus_one_name: answers[i].plus_one_name || undefined,
+          plus_one_attending: answers[i].plus_one_attending,
+          dietary_restrictions: answers[i].dietary_restrictions || undefined,
+        })),
       })
       setSubmitted(true)
     } catch {
@@ -84,13 +107,16 @@ export default function RSVPPage() {
     }
   }
 
+  const allAnswered = answers.length > 0 && answers.every((a) => a.rsvp_status)
+  const anyAttending = answers.some((a) => a.rsvp_status === 'attending')
+
   if (submitted) {
     return (
       <div className="min-h-screen flex items-center justify-center bg-gradient-to-br from-primary-50 to-primary-100">
         <div className="max-w-md w-full mx-4 text-center">
           <div className="bg-white rounded-2xl shadow-xl p-10">
             <div className="text-5xl mb-4">
-              {rsvpStatus === 'attending' ? '\u2764\uFE0F' : '\uD83D\uDC8C'}
+              {anyAttending ? '\u2764\uFE0F' : '\uD83D\uDC8C'}
             </div>
             <h2 className="text-2xl font-serif font-bold text-primary-900 mb-3">
               {t('rsvp_success')}
@@ -116,7 +142,7 @@ export default function RSVPPage() {
             </div>
           )}
 
-          {!guest ? (
+          {!party ? (
             <div className="space-y-4">
               <input
                 type="text"
@@ -138,73 +164,81 @@ export default function RSVPPage() {
           ) : (
             <div className="space-y-6">
               <div className="text-center">
-                <p className="text-lg font-medium text-gray-900">
-                  {guest.first_name} {guest.last_name}
-                </p>
+                <p className="text-lg font-medium text-gray-900">{party.name}</p>
               </div>
 
-              {/* RSVP Choice */}
-              <div className="grid grid-cols-2 gap-3">
-                <button
-                  onClick={() => setRsvpStatus('attending')}
-                  className={`py-4 px-4 rounded-xl border-2 text-sm font-medium transition-all ${
-                    rsvpStatus === 'attending'
-                      ? 'border-green-500 bg-green-50 text-green-700'
-                      : 'border-gray-200 text-gray-600 hover:border-gray-300'
-                  }`}
-                >
-                  {t('rsvp_attending')}
-                </button>
-                <button
-                  onClick={() => setRsvpStatus('not_attending')}
-                  className={`py-4 px-4 rounded-xl border-2 text-sm font-medium transition-all ${
-                    rsvpStatus === 'not_attending'
-                      ? 'border-red-500 bg-red-50 text-red-700'
-                      : 'border-gray-200 text-gray-600 hover:border-gray-300'
-                  }`}
-                >
-                  {t('rsvp_not_attending')}
-                </button>
-              </div>
+              {party.members.map((member, i) => (
+                <div key={member.id} className="space-y-3 border-t border-gray-100 pt-4 first:border-0 first:pt-0">
+                  {party.members.length > 1 && (
+                    <p className="text-sm font-medium text-gray-900">
+                      {member.first_name} {member.last_name}
+                    </p>
+                  )}
 
-              {rsvpStatus === 'attending' && (
-                <>
-                  {/* Plus one */}
-                  {guest.plus_one_allowed && (
-                    <div className="space-y-3">
-                      <label className="flex items-center">
-                        <input
-                          type="checkbox"
-                          checked={plusOneAttending}
-                          onChange={(e) => setPlusOneAttending(e.target.checked)}
-                          className="rounded border-gray-300 text-primary-600 focus:ring-primary-500"
-                        />
-                        <span className="ml-2 text-sm text-gray-700">{t('plus_one')}</span>
-                      </label>
-                      {plusOneAttending && (
+                  {/* RSVP Choice */}
+                  <div className="grid grid-cols-2 gap-3">
+                    <button
+                      onClick={() => setAnswer(i, { rsvp_status: 'attending' })}
+                      className={`py-4 px-4 rounded-xl border-2 text-sm font-medium transition-all ${
+                        answers[i]?.rsvp_status === 'attending'
+                          ? 'border-green-500 bg-green-50 text-green-700'
+                          : 'border-gray-200 text-gray-600 hover:border-gray-300'
+                      }`}
+                    >
+                      {t('rsvp_attending')}
+                    </button>
+                    <button
+                      onClick={() => setAnswer(i, { rsvp_status: 'not_attending' })}
+                      className={`py-4 px-4 rounded-xl border-2 text-sm font-medium transition-all ${
+                        answers[i]?.rsvp_status === 'not_attending'
+                          ? 'border-red-500 bg-red-50 text-red-700'
+                          : 'border-gray-200 text-gray-600 hover:border-gray-300'
+                      }`}
+                    >
+                      {t('rsvp_not_attending')}
+                    </button>
+                  </div>
+
+                  {answers[i]?.rsvp_status === 'attending' && (
+                    <>
+                      {/* Plus one */}
+                      {member.plus_one_allowed && (
+                        <div className="space-y-3">
+                          <label className="flex items-center">
+                            <input
+                              type="checkbox"
+                              checked={answers[i].plus_one_attending}
+                              onChange={(e) => setAnswer(i, { plus_one_attending: e.target.checked })}
+                              className="rounded border-gray-300 text-primary-600 focus:ring-primary-500"
+                            />
+                            <span className="ml-2 text-sm text-gray-700">{t('plus_one')}</span>
+                          </label>
+                          {answers[i].plus_one_attending && (
+                            <input
+                              placeholder={t('plus_one_name')}
+                              value={answers[i].plus_one_name}
+                              onChange={(e) => setAnswer(i, { plus_one_name: e.target.value })}
+                              className="block w-full rounded-lg border-gray-300 shadow-sm focus:border-primary-500 focus:ring-primary-500 text-sm"
+                            />
+                          )}
+                        </div>
+                      )}
+
+                      {/* Dietary */}
+                      <div>
+                        <label className="block text-sm font-medium text-gray-700 mb-1">
+                          {t('dietary_restrictions')}
+                        </label>
                         <input
-                          placeholder={t('plus_one_name')}
-                          value={plusOneName}
-                          onChange={(e) => setPlusOneName(e.target.value)}
+                          value={answers[i].dietary_restrictions}
+                          onChange={(e) => setAnswer(i, { dietary_restrictions: e.target.value })}
                           className="block w-full rounded-lg border-gray-300 shadow-sm focus:border-primary-500 focus:ring-primary-500 text-sm"
                         />
-                      )}
-                    </div>
+                      </div>
+                    </>
                   )}
-
-                  {/* Dietary */}
-                  <div>
-                    <label className="block text-sm font-medium text-gray-700 mb-1">
-                      {t('dietary_restrictions')}
-                    </label>
-                    <input
-                      value={dietary}
-                      onChange={(e) => setDietary(e.target.value)}
-                      className="block w-full rounded-lg border-gray-300 shadow-sm focus:border-primary-500 focus:ring-primary-500 text-sm"
-                    />
-                  </div>
-                </>
-              )}
+                </div>
+              ))}
 
               {/* Message */}
               <div>
@@ -223,7 +257,7 @@ export default function RSVPPage() {
               {/* Submit */}
               <button
                 onClick={handleSubmit}
-                disabled={loading || !rsvpStatus}
+                disabled={loading || !allAnswered}
                 className="w-full py-3 px-4 border border-transparent rounded-lg shadow-sm text-sm font-medium text-white bg-primary-700 hover:bg-primary-800 disabled:opacity-50"
               >
                 {loading ? '...' : t('rsvp_submit')}